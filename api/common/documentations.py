@@ -1,6 +1,13 @@
+from drf_yasg import openapi
 from rest_framework.serializers import Serializer, IntegerField, BooleanField, CharField, ListField, URLField
 
 
+idempotency_key_parameter = openapi.Parameter(
+    'Idempotency-Key', openapi.IN_HEADER, type=openapi.TYPE_STRING, required=False,
+    description='재시도 시 같은 값을 보내면 요청을 다시 처리하지 않고 처음 응답을 반환 (24시간 보관)'
+)
+
+
 class IdResponse(Serializer):
     id = IntegerField()
 
@@ -51,3 +58,14 @@ def get_paginated_response(serializer, code=200):
         results = serializer
 
     return get_response(PaginatedResponse(), code)
+
+def get_cursor_paginated_response(serializer, code=200):
+    class CursorPaginatedResponse(Serializer):
+        class Meta:
+            ref_name = None
+
+        next = URLField(allow_null=True)
+        previous = URLField(allow_null=True)
+        results = serializer
+
+    return get_response(CursorPaginatedResponse(), code)
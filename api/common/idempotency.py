@@ -0,0 +1,77 @@
+import json
+from datetime import timedelta
+from functools import wraps
+from hashlib import sha256
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError
+from django.db.transaction import atomic, set_rollback
+from django.utils import timezone
+
+from rest_framework.response import Response
+from rest_framework.status import HTTP_400_BAD_REQUEST, HTTP_409_CONFLICT, HTTP_422_UNPROCESSABLE_ENTITY
+
+from .models import IdempotencyKey
+from .utils import get_response
+
+IDEMPOTENCY_KEY_HEADER = 'Idempotency-Key'
+IDEMPOTENCY_KEY_TTL = timedelta(hours=24)
+MAXIMUM_IDEMPOTENCY_KEY_LENGTH = 100
+
+
+def get_request_hash(request):
+    body = json.dumps(
+        {'method': request.method, 'path': request.path, 'data': request.data},
+        sort_keys=True, cls=DjangoJSONEncoder, default=str
+    )
+
+    return sha256(body.encode()).hexdigest()
+
+
+def _replay(record, request_hash):
+    if record.request_hash != request_hash:
+        return get_response(status=HTTP_422_UNPROCESSABLE_ENTITY, message='Idempotency-Key is already used for a different request.')
+    elif record.status_code is None:
+        return get_response(status=HTTP_409_CONFLICT, message='A request with the same Idempotency-Key is in progress.')
+
+    return Response(record.response, status=record.status_code, headers={'Idempotent-Replayed': 'true'})
+
+
+# 같은 키로 재시도된 요청은 뷰를 실행하지 않고 저장된 응답을 반환
+# 키 예약, 뷰 실행, 응답 저장을 한 트랜잭션에서 처리하여 부수 효과가 커밋된 키는 항상 응답과 함께 커밋됨
+def idempotent(view_method):
+    @wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        key = request.headers.get(IDEMPOTENCY_KEY_HEADER)
+        if key is None:
+            return view_method(self, request, *args, **kwargs)
+        elif len(key) > MAXIMUM_IDEMPOTENCY_KEY_LENGTH:
+            return get_response(status=HTTP_400_BAD_REQUEST, message='Idempotency-Key is too long.')
+
+        request_hash = get_request_hash(request)
+        with atomic():
+            try:
+                with atomic():
+                    record = IdempotencyKey.objects.create(user_id=request.user.id, key=key, request_hash=request_hash)
+            except IntegrityError:
+                # 같은 키를 처리 중인 트랜잭션이 끝난 뒤 커밋된 응답을 읽음
+                record = IdempotencyKey.objects.select_for_update().get(user_id=request.user.id, key=key)
+                return _replay(record, request_hash)
+
+            response = view_method(self, request, *args, **kwargs)
+
+            # 서버 오류는 저장하지 않고 키와 함께 롤백하여 재시도할 수 있도록 함
+            if response.status_code >= 500:
+                set_rollback(True)
+            else:
+                record.status_code = response.status_code
+                record.response = response.data
+                record.save(update_fields=['status_code', 'response'])
+
+        return response
+
+    return wrapper
+
+
+def purge_expired_idempotency_keys():
+    return IdempotencyKey.objects.filter(created_at__lt=timezone.now() - IDEMPOTENCY_KEY_TTL).delete()[0]
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from common.idempotency import purge_expired_idempotency_keys
+
+
+class Command(BaseCommand):
+    help = 'Delete idempotency keys older than their TTL.'
+
+    def handle(self, *args, **options):
+        purged_count = purge_expired_idempotency_keys()
+
+        self.stdout.write(self.style.SUCCESS(f'Done. {purged_count} idempotency keys purged.'))
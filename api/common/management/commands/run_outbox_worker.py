@@ -0,0 +1,40 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from common.outbox import process_outbox_events, purge_processed_events
+
+
+class Command(BaseCommand):
+    help = 'Process outbox events written by requests. Runs until stopped unless --once is given.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100, help='Number of events locked in one transaction.')
+        parser.add_argument('--sleep', type=float, default=1.0, help='Seconds to wait when there is no pending event.')
+        parser.add_argument('--once', action='store_true', help='Exit when there is no pending event.')
+        parser.add_argument('--purge-days', type=int, default=7, help='Days to keep processed events.')
+
+    def handle(self, *args, **options):
+        started_at = timezone.now()
+        total_processed = 0
+        total_failed = 0
+
+        purged_count = purge_processed_events(options['purge_days'])
+        self.stdout.write(f'{purged_count} processed events purged.')
+
+        while True:
+            events = process_outbox_events(options['batch_size'])
+            if not events:
+                if options['once']:
+                    break
+                time.sleep(options['sleep'])
+                continue
+
+            failed_count = len([event for event in events if event.processed_at is None])
+            total_processed += len(events) - failed_count
+            total_failed += failed_count
+            self.stdout.write(f'{total_processed} events processed, {total_failed} failed.')
+
+        seconds = (timezone.now() - started_at).total_seconds()
+        self.stdout.write(self.style.SUCCESS(f'Done in {seconds:.1f}s. {total_processed} processed, {total_failed} failed.'))
@@ -0,0 +1,17 @@
+# Generated by Django 4.0.2 on 2026-10-20 03:28
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('common', '0012_idempotency_key_locked_at'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='idempotencykey',
+            name='locked_at',
+        ),
+    ]
@@ -1,4 +1,8 @@
-from django.db.models import Model, AutoField, ForeignKey, DO_NOTHING, CharField, DateField
+from django.db.models import (
+    Model, Manager, AutoField, BigAutoField, ForeignKey, DO_NOTHING, CharField, DateField, DateTimeField,
+    IntegerField, TextField, JSONField, Index
+)
+from django.utils import timezone
 
 
 class TemporaryImage(Model):
@@ -32,3 +36,41 @@ class SettingItem(Model):
         db_table = 'setting_item'
         unique_together = (('group', 'name'))
         ordering = ['id']
+
+
+class OutboxManager(Manager):
+    def publish(self, topic, payload):
+        return self.create(topic=topic, payload=payload)
+
+
+class Outbox(Model):
+    id = BigAutoField(primary_key=True)
+    topic = CharField(max_length=50)
+    payload = JSONField()
+    attempts = IntegerField(default=0)
+    last_error = TextField(null=True)
+    available_at = DateTimeField(default=timezone.now)
+    created_at = DateTimeField(auto_now_add=True)
+    processed_at = DateTimeField(null=True)
+
+    objects = OutboxManager()
+
+    class Meta:
+        db_table = 'outbox'
+        ordering = ['id']
+        indexes = [Index(fields=['processed_at', 'available_at'], name='outbox_pending_idx')]
+
+
+class IdempotencyKey(Model):
+    id = BigAutoField(primary_key=True)
+    user = ForeignKey('user.User', DO_NOTHING)
+    key = CharField(max_length=100)
+    request_hash = CharField(max_length=64)
+    status_code = IntegerField(null=True)
+    response = JSONField(null=True)
+    created_at = DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'idempotency_key'
+        unique_together = (('user', 'key'),)
+        indexes = [Index(fields=['created_at'], name='idempotency_key_created_at_idx')]
@@ -0,0 +1,56 @@
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db.transaction import atomic
+from django.utils import timezone
+
+from .models import Outbox
+
+MAXIMUM_OUTBOX_ATTEMPTS = 5
+
+_handlers = defaultdict(list)
+
+
+def handler(topic):
+    def decorator(function):
+        _handlers[topic].append(function)
+        return function
+
+    return decorator
+
+
+def publish(topic, payload):
+    return Outbox.objects.publish(topic, payload)
+
+
+def get_pending_events():
+    return Outbox.objects.filter(processed_at=None, attempts__lt=MAXIMUM_OUTBOX_ATTEMPTS, available_at__lte=timezone.now())
+
+
+def process_outbox_events(batch_size=100):
+    with atomic():
+        # 여러 워커가 동시에 실행되어도 같은 이벤트를 처리하지 않도록 잠긴 행은 건너뜀
+        events = list(get_pending_events().select_for_update(skip_locked=True).order_by('id')[:batch_size])
+
+        for event in events:
+            try:
+                if event.topic not in _handlers:
+                    raise KeyError(f'No handler is registered for {event.topic}.')
+
+                # 같은 토픽의 핸들러는 모두 성공하거나 모두 롤백됨
+                with atomic():
+                    for function in _handlers[event.topic]:
+                        function(event.payload)
+                event.processed_at = timezone.now()
+            except Exception as error:
+                event.attempts += 1
+                event.last_error = repr(error)
+                event.available_at = timezone.now() + timedelta(seconds=30 * 2 ** event.attempts)
+
+        Outbox.objects.bulk_update(events, ['attempts', 'last_error', 'available_at', 'processed_at'])
+
+    return events
+
+
+def purge_processed_events(days):
+    return Outbox.objects.filter(processed_at__lt=timezone.now() - timedelta(days=days)).delete()[0]
@@ -0,0 +1,85 @@
+# 가격 계산 규칙
+# DB를 조회하지 않으며, 이미 조회된 상품/쿠폰 객체의 속성만 사용
+
+PRICE_MULTIPLES = [
+    {'min_price': 0, 'multiple': 2.3},
+    {'min_price': 40000, 'multiple': 2},
+    {'min_price': 80000, 'multiple': 1.8},
+]
+
+
+def get_price_multiple(price):
+    multiple = PRICE_MULTIPLES[0]['multiple']
+    for data in PRICE_MULTIPLES:
+        if price < data['min_price']:
+            break
+        multiple = data['multiple']
+
+    return multiple
+
+
+def get_sale_price(price):
+    return round(price * get_price_multiple(price)) // 100 * 100
+
+
+def get_base_discounted_price(sale_price, base_discount_rate):
+    base_discount_price = int(sale_price * base_discount_rate / 100) // 100 * 100
+
+    return sale_price - base_discount_price
+
+
+def get_membership_discount_price(product, membership_discount_rate, count):
+    return product.base_discounted_price * membership_discount_rate // 100 * count
+
+
+def get_coupon_discount_price(coupon, product, maximum_discount_price):
+    if coupon.discount_rate is not None:
+        result = product.base_discounted_price * coupon.discount_rate // 100
+        result = min(result, coupon.maximum_discount_price) if coupon.maximum_discount_price is not None else result
+    elif coupon.discount_price is not None:
+        result = coupon.discount_price
+
+    return min(result, maximum_discount_price)
+
+
+# items: [{'product': 상품, 'count': 수량, 'coupon': 쿠폰 또는 None}, ...]
+def calculate_item_prices(items, membership_discount_rate):
+    results = []
+    for item in items:
+        product = item['product']
+        count = item['count']
+        result = {
+            'sale_price': product.sale_price * count,
+            'base_discounted_price': product.base_discounted_price * count,
+            'membership_discount_price': get_membership_discount_price(product, membership_discount_rate, count),
+            'coupon_discount_price': 0,
+        }
+        result['base_discount_price'] = result['sale_price'] - result['base_discounted_price']
+
+        median_payment_price = result['base_discounted_price'] - result['membership_discount_price']
+        if item.get('coupon') is not None:
+            result['coupon_discount_price'] = get_coupon_discount_price(item['coupon'], product, median_payment_price // count)
+        result['payment_price'] = median_payment_price - result['coupon_discount_price']
+
+        results.append(result)
+
+    return results
+
+
+# 담을 때 저장한 가격과 현재 가격 비교, 저장된 가격이 없으면 변경되지 않은 것으로 봄
+def is_price_changed(saved_base_discounted_price, product):
+    return saved_base_discounted_price is not None and saved_base_discounted_price != product.base_discounted_price
+
+
+# 결제 금액 비율로 나누고 나머지는 첫 번째 항목에 더함
+def distribute_point(payment_prices, point):
+    total_payment_price = sum(payment_prices)
+    results = [int(payment_price * point / total_payment_price) if total_payment_price else 0 for payment_price in payment_prices]
+    if results:
+        results[0] += point - sum(results)
+
+    return results
+
+
+def get_earned_point(actual_payment_price):
+    return actual_payment_price // 100
@@ -3,6 +3,7 @@ from unittest.mock import patch
 from PIL import Image
 from tempfile import NamedTemporaryFile
 
+from django.core.cache import cache
 from django.utils.module_loading import import_string
 
 from rest_framework.test import APISimpleTestCase, APITestCase
@@ -33,7 +34,14 @@ class FunctionTestCase(APISimpleTestCase):
         return self._function(*args, **kwargs)
 
 
-class ModelTestCase(APITestCase):
+class CacheClearedTestCase(APITestCase):
+    # 테스트 데이터는 롤백되지만 캐시는 남아있으므로 매 테스트 전에 비움
+    def _pre_setup(self):
+        super()._pre_setup()
+        cache.clear()
+
+
+class ModelTestCase(CacheClearedTestCase):
     _model_class = None
     test_create = None
 
@@ -60,7 +68,7 @@ class ModelTestCase(APITestCase):
         return self._get_default_model_after_creation(self._test_data)
 
 
-class SerializerTestCase(APITestCase):
+class SerializerTestCase(CacheClearedTestCase):
     _serializer_class = None
 
     def __init__(self, *args, **kwargs):
@@ -123,7 +131,7 @@ class ListSerializerTestCase(SerializerTestCase):
         return self._serializer_class(many=True, *args, **kwargs)
 
 
-class ViewTestCase(APITestCase):
+class ViewTestCase(CacheClearedTestCase):
     _url = None
     _view_class = None
     _test_data = {}
@@ -0,0 +1,78 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from user.test.factories import UserFactory
+
+from ..models import Outbox, IdempotencyKey
+from ..idempotency import IDEMPOTENCY_KEY_TTL
+from ..outbox import MAXIMUM_OUTBOX_ATTEMPTS, handler, publish
+
+TEST_TOPIC = 'test_topic'
+FAILURE_TOPIC = 'test_failure_topic'
+handled_payloads = []
+
+
+@handler(TEST_TOPIC)
+def handle_test_topic(payload):
+    handled_payloads.append(payload)
+
+
+@handler(FAILURE_TOPIC)
+def handle_failure_topic(payload):
+    raise ValueError('failure')
+
+
+class RunOutboxWorkerTestCase(TestCase):
+    def setUp(self):
+        handled_payloads.clear()
+
+    def __run(self, **options):
+        call_command('run_outbox_worker', once=True, batch_size=2, stdout=StringIO(), **options)
+
+    def test_process(self):
+        payloads = [{'value': i} for i in range(3)]
+        for payload in payloads:
+            publish(TEST_TOPIC, payload)
+        self.__run()
+
+        self.assertListEqual(handled_payloads, payloads)
+        self.assertFalse(Outbox.objects.filter(processed_at=None).exists())
+
+    def test_retry_failure(self):
+        event = publish(FAILURE_TOPIC, {})
+        self.__run()
+        event.refresh_from_db()
+
+        self.assertIsNone(event.processed_at)
+        self.assertEqual(event.attempts, 1)
+        self.assertIn('failure', event.last_error)
+        self.assertGreater(event.available_at, event.created_at)
+
+    def test_stop_retrying_after_maximum_attempts(self):
+        event = publish(FAILURE_TOPIC, {})
+        Outbox.objects.filter(id=event.id).update(attempts=MAXIMUM_OUTBOX_ATTEMPTS)
+        self.__run()
+        event.refresh_from_db()
+
+        self.assertEqual(event.attempts, MAXIMUM_OUTBOX_ATTEMPTS)
+
+    def test_purge(self):
+        publish(TEST_TOPIC, {})
+        self.__run()
+        self.__run(purge_days=-1)
+
+        self.assertFalse(Outbox.objects.exists())
+
+
+class PurgeIdempotencyKeysTestCase(TestCase):
+    def test_purge(self):
+        user = UserFactory()
+        expired_key = IdempotencyKey.objects.create(user=user, key='expired', request_hash='')
+        IdempotencyKey.objects.filter(id=expired_key.id).update(created_at=timezone.now() - IDEMPOTENCY_KEY_TTL)
+        key = IdempotencyKey.objects.create(user=user, key='key', request_hash='')
+        call_command('purge_idempotency_keys', stdout=StringIO())
+
+        self.assertListEqual(list(IdempotencyKey.objects.values_list('id', flat=True)), [key.id])
@@ -0,0 +1,104 @@
+from types import SimpleNamespace
+
+from coupon.test.factories import CouponFactory
+from product.test.factories import ProductFactory
+from .test_cases import FunctionTestCase
+from ..pricing import get_sale_price, get_base_discounted_price, get_coupon_discount_price, calculate_item_prices, is_price_changed, distribute_point
+
+
+class GetSalePriceTestCase(FunctionTestCase):
+    _function = get_sale_price
+
+    def test_get_sale_price(self):
+        self.assertEqual(self._call_function(10000), 23000)
+        self.assertEqual(self._call_function(40000), 80000)
+        self.assertEqual(self._call_function(80100), 144100)
+
+
+class GetBaseDiscountedPriceTestCase(FunctionTestCase):
+    _function = get_base_discounted_price
+
+    def test_get_base_discounted_price(self):
+        self.assertEqual(self._call_function(23000, 15), 19600)
+
+
+class GetCouponDiscountPriceTestCase(FunctionTestCase):
+    _function = get_coupon_discount_price
+
+    def setUp(self):
+        self.__product = ProductFactory.build()
+        self.__maximum_discount_price = self.__product.base_discounted_price + 1
+
+    def test_discount_rate(self):
+        coupon = CouponFactory.build(maximum_discount_price=None)
+
+        self.assertEqual(
+            self._call_function(coupon, self.__product, self.__maximum_discount_price),
+            self.__product.base_discounted_price * coupon.discount_rate // 100
+        )
+
+    def test_coupon_maximum_discount_price(self):
+        coupon = CouponFactory.build(maximum_discount_price=None)
+        coupon.maximum_discount_price = self.__product.base_discounted_price * coupon.discount_rate // 100 - 1
+
+        self.assertEqual(self._call_function(coupon, self.__product, self.__maximum_discount_price), coupon.maximum_discount_price)
+
+    def test_discount_price(self):
+        coupon = CouponFactory.build(discount_price=True)
+
+        self.assertEqual(self._call_function(coupon, self.__product, self.__maximum_discount_price), coupon.discount_price)
+
+    def test_maximum_discount_price(self):
+        coupon = CouponFactory.build(discount_price=True)
+        maximum_discount_price = coupon.discount_price - 1
+
+        self.assertEqual(self._call_function(coupon, self.__product, maximum_discount_price), maximum_discount_price)
+
+
+class CalculateItemPricesTestCase(FunctionTestCase):
+    _function = calculate_item_prices
+
+    def test_calculate(self):
+        product = SimpleNamespace(sale_price=20000, base_discounted_price=18000)
+        coupon = SimpleNamespace(discount_rate=10, discount_price=None, maximum_discount_price=1000)
+        prices = self._call_function([
+            {'product': product, 'count': 2, 'coupon': None},
+            {'product': product, 'count': 1, 'coupon': coupon},
+        ], 3)
+
+        self.assertListEqual(prices, [{
+            'sale_price': 40000,
+            'base_discounted_price': 36000,
+            'base_discount_price': 4000,
+            'membership_discount_price': 1080,
+            'coupon_discount_price': 0,
+            'payment_price': 34920,
+        }, {
+            'sale_price': 20000,
+            'base_discounted_price': 18000,
+            'base_discount_price': 2000,
+            'membership_discount_price': 540,
+            'coupon_discount_price': 1000,
+            'payment_price': 16460,
+        }])
+
+
+class IsPriceChangedTestCase(FunctionTestCase):
+    _function = is_price_changed
+
+    def test_is_price_changed(self):
+        product = SimpleNamespace(base_discounted_price=18000)
+
+        self.assertListEqual(
+            [self._call_function(saved_price, product) for saved_price in [18000, 20000, None]], [False, True, False]
+        )
+
+
+class DistributePointTestCase(FunctionTestCase):
+    _function = distribute_point
+
+    def test_distribute(self):
+        self.assertListEqual(self._call_function([10000, 20000, 30000], 1000), [167, 333, 500])
+
+    def test_distribute_to_zero_payment_price(self):
+        self.assertListEqual(self._call_function([0, 0], 0), [0, 0])
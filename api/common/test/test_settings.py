@@ -0,0 +1,23 @@
+import sys
+from importlib.util import spec_from_file_location, module_from_spec
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+
+from config import settings
+from ..utils import is_shared_cache
+
+
+# 테스트 실행 시에는 설정이 바뀌므로 서버 실행 시의 설정을 다시 읽어서 확인
+def load_server_settings():
+    spec = spec_from_file_location('server_settings', settings.__file__)
+    module = module_from_spec(spec)
+    with patch.object(sys, 'argv', ['gunicorn']):
+        spec.loader.exec_module(module)
+
+    return module
+
+
+class ServerSettingsTestCase(SimpleTestCase):
+    def test_shared_cache(self):
+        self.assertTrue(is_shared_cache(load_server_settings().CACHES))
@@ -1,8 +1,11 @@
 import json
+from io import StringIO
 from datetime import date, datetime, timedelta
 
+from django.core.management.color import no_style
 from django.http import QueryDict
 from django.http import JsonResponse
+from django.test import override_settings
 
 from rest_framework.response import Response
 from rest_framework.exceptions import APIException
@@ -10,7 +13,7 @@ from rest_framework.exceptions import APIException
 from .test_cases import FunctionTestCase
 from ..utils import (
     BASE_IMAGE_URL, get_response_body, get_response, querydict_to_dict, gmt_to_kst, datetime_to_iso, levenshtein,
-    check_integer_format, get_full_image_url,
+    check_integer_format, get_full_image_url, is_shared_cache, warn_if_process_local_cache,
 )
 
 
@@ -173,4 +176,31 @@ class GetFullImageUrlTestCase(FunctionTestCase):
     def test(self):
         test_data = 'test.png'
 
-        self.assertTrue(self._call_function(test_data), BASE_IMAGE_URL+test_data)
\ No newline at end of file
+        self.assertTrue(self._call_function(test_data), BASE_IMAGE_URL+test_data)
+
+
+class IsSharedCacheTestCase(FunctionTestCase):
+    _function = is_shared_cache
+
+    def test_shared_cache(self):
+        self.assertTrue(self._call_function({'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache'}}))
+
+    def test_process_local_cache(self):
+        self.assertTrue(not self._call_function({'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}))
+
+
+class WarnIfProcessLocalCacheTestCase(FunctionTestCase):
+    _function = warn_if_process_local_cache
+
+    def __call_function(self):
+        stderr = StringIO()
+        self._call_function(stderr, no_style())
+
+        return stderr.getvalue()
+
+    def test_process_local_cache(self):
+        self.assertIn('The cache is local to this process', self.__call_function())
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache'}})
+    def test_shared_cache(self):
+        self.assertEqual(self.__call_function(), '')
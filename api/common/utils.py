@@ -1,6 +1,7 @@
 from datetime import date, datetime, timedelta
 import re
 
+from django.conf import settings
 from django.http import JsonResponse
 
 from rest_framework.response import Response
@@ -15,6 +16,12 @@ DATETIME_WITHOUT_MILISECONDS_FORMAT = '%Y%m%d%H%M%S'
 IMAGE_DATETIME_FORMAT = '%Y%m%d_%H%M%S%f'
 REQUEST_DATE_FORMAT = '%Y-%m-%d'
 
+# 프로세스마다 따로 저장되어 다른 프로세스의 캐시를 삭제할 수 없는 backend
+PROCESS_LOCAL_CACHE_BACKENDS = [
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+]
+
 def get_response_body(code, message='success', data=None):
     if int(code / 100) == 2:
         if message != 'success':
@@ -112,4 +119,14 @@ def check_integer_format(value):
 
 
 def get_full_image_url(image_url):
-    return BASE_IMAGE_URL + image_url
\ No newline at end of file
+    return BASE_IMAGE_URL + image_url
+
+
+def is_shared_cache(cache_settings):
+    return cache_settings['default']['BACKEND'] not in PROCESS_LOCAL_CACHE_BACKENDS
+
+
+# 캐시를 삭제하는 관리 명령에서 사용, 프로세스별 캐시라면 API 서버에 저장된 캐시는 만료될 때까지 남아있음
+def warn_if_process_local_cache(stderr, style):
+    if not is_shared_cache(settings.CACHES):
+        stderr.write(style.WARNING('The cache is local to this process. Caches of API servers are not cleared.'))
@@ -95,6 +95,18 @@ DATABASES = {
     }
 }
 
+
+# Cache
+# https://docs.djangoproject.com/en/4.0/topics/cache/
+# gunicorn worker와 관리 명령이 같은 캐시를 사용해야 캐시 삭제가 모든 프로세스에 반영됨
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ.get('CACHE_LOCATION', 'redis://127.0.0.1:6379'),
+    }
+}
+
 if 'test' in sys.argv:
     DATABASES['default'] = {
         'ENGINE': os.environ.get('DB_ENGINE'),
@@ -102,6 +114,9 @@ if 'test' in sys.argv:
         'PASSWORD': os.environ.get('TEST_DB_PASSWORD'),
         'HOST': os.environ.get('TEST_DB_HOST'),
     }
+    CACHES['default'] = {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
 
 
 # Internationalization
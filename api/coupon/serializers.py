@@ -1,15 +1,22 @@
+from collections import defaultdict
 from datetime import date
 
+from django.core.cache import cache
+from django.db.models import Q
+
 from rest_framework.serializers import (
     ModelSerializer, PrimaryKeyRelatedField,
 )
 from rest_framework.exceptions import ValidationError
 
 from product.models import Product, SubCategory
-from .models import CouponClassification, Coupon
+from .models import CouponClassification, Coupon, CouponSubCategory
 
 COUPON_PRODUCT_MAX_LENGTH = 1000
 COUPON_SUBCATEGORY_MAX_LENGTH = 20
+# 날짜가 바뀌면 다른 키를 사용하므로 만료된 쿠폰은 자동으로 빠짐
+ACTIVE_COUPONS_CACHE_KEY = 'active_coupons:{0}'
+ACTIVE_COUPONS_CACHE_TIMEOUT = 60 * 60 * 24
 
 
 class CouponClassificationSerializer(ModelSerializer):
@@ -119,4 +126,34 @@ class CouponSerializer(ModelSerializer):
 
     # todo
     # is_auto_issue 자동 발급
-    # transaction
\ No newline at end of file
+    # transaction
+
+
+# 발급 가능한 쿠폰 목록과 상품, 서브 카테고리별 적용 쿠폰 id 목록
+def get_active_coupons():
+    cache_key = ACTIVE_COUPONS_CACHE_KEY.format(date.today().isoformat())
+    active_coupons = cache.get(cache_key)
+    if active_coupons is not None:
+        return active_coupons
+
+    coupons = Coupon.objects.filter(Q(end_date__gte=date.today()) | Q(end_date__isnull=True), is_auto_issue=False)
+    product_coupons = defaultdict(list)
+    for product_id, coupon_id in Coupon.products.through.objects.filter(coupon__in=coupons).values_list('product_id', 'coupon_id'):
+        product_coupons[product_id].append(coupon_id)
+
+    sub_category_coupons = defaultdict(list)
+    for sub_category_id, coupon_id in CouponSubCategory.objects.filter(coupon__in=coupons).values_list('sub_category_id', 'coupon_id'):
+        sub_category_coupons[sub_category_id].append(coupon_id)
+
+    active_coupons = {
+        'coupons': [dict(coupon) for coupon in CouponSerializer(coupons, many=True).data],
+        'product_coupons': dict(product_coupons),
+        'sub_category_coupons': dict(sub_category_coupons),
+    }
+    cache.set(cache_key, active_coupons, ACTIVE_COUPONS_CACHE_TIMEOUT)
+
+    return active_coupons
+
+
+def clear_active_coupons():
+    cache.delete(ACTIVE_COUPONS_CACHE_KEY.format(date.today().isoformat()))
@@ -116,3 +116,47 @@ class CouponViewSetTestCase(ViewTestCase):
 
         self._assert_success()
         self.assertListEqual(self._response_data['results'], serializer.data)
+
+    def test_list_cached(self):
+        self._set_shopper()
+        self._set_authentication()
+        self._get()
+
+        with self.assertNumQueries(0):
+            self._get()
+
+        self._assert_success()
+
+    def test_list_after_create(self):
+        self._get()
+        coupon = CouponFactory(classification=self.__coupon_classification, is_auto_issue=False)
+
+        self._user = self.__admin_user
+        self._test_data = {
+            'name': 'super coupon',
+            'discount_price': 10000,
+            'start_date': date.today(),
+            'end_date': date.today() + timedelta(weeks=1),
+            'is_auto_issue': False,
+            'classification': self.__coupon_classification.id,
+        }
+        self._set_authentication()
+        self._post()
+        self._unset_authentication()
+        self._test_data = {}
+        self._get()
+
+        coupon_ids = [coupon['id'] for coupon in self._response_data['results']]
+        self.assertIn(coupon.id, coupon_ids)
+        self.assertIn(Coupon.objects.get(name='super coupon').id, coupon_ids)
+
+    def test_list_owned_coupon_after_issuing(self):
+        self._set_shopper()
+        self._set_authentication()
+        coupon = Coupon.objects.filter(is_auto_issue=False, end_date=None).first()
+        self._get()
+
+        self.client.post('/users/shoppers/coupons', {'coupon': coupon.id})
+        self._get()
+
+        self.assertTrue(next(result for result in self._response_data['results'] if result['id'] == coupon.id)['coupon_owned'])
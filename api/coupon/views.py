@@ -1,6 +1,4 @@
-from datetime import date
-
-from django.db.models import Q, Prefetch
+from django.db.models import Prefetch
 from django.db import connection
 from django.shortcuts import get_object_or_404
 
@@ -11,9 +9,10 @@ from rest_framework.decorators import api_view, permission_classes
 from common.permissions import IsAdminUser
 from common.utils import get_response, check_integer_format
 from user.models import is_shopper
+from user.serializers import get_owned_coupon_ids
 from product.models import Product
 from .models import CouponClassification, Coupon
-from .serializers import CouponClassificationSerializer, CouponSerializer
+from .serializers import CouponClassificationSerializer, CouponSerializer, get_active_coupons, clear_active_coupons
 from .permissions import CouponPermission
 
 
@@ -34,44 +33,39 @@ class CouponViewSet(GenericViewSet):
     lookup_value_regex = r'[0-9]+'
 
     def get_queryset(self):
-        queryset = Coupon.objects.all()
-        if self.request.user.is_authenticated and self.request.user.is_admin:
-            return queryset
+        return Coupon.objects.all()
 
-        end_date_condition = Q(end_date__gte=date.today()) | Q(end_date__isnull=True)
-        queryset = queryset.filter(end_date_condition, is_auto_issue=False)
+    def __get_active_coupons(self, product_id):
+        active_coupons = get_active_coupons()
+        coupons = active_coupons['coupons']
 
-        product_id = self.request.query_params.get('product', None)
         if product_id is not None:
-            product = get_object_or_404(Product, id=product_id)
-            filter_condition = Q(products=product) | Q(sub_categories=product.sub_category_id)
-            queryset = queryset.filter(filter_condition)
+            product = get_object_or_404(Product.objects.only('id', 'sub_category_id'), id=product_id)
+            coupon_ids = set(active_coupons['product_coupons'].get(product.id, [])) \
+                | set(active_coupons['sub_category_coupons'].get(product.sub_category_id, []))
+            coupons = [coupon for coupon in coupons if coupon['id'] in coupon_ids]
+
+        owned_coupon_ids = get_owned_coupon_ids(self.request.user.id) if is_shopper(self.request.user) else set()
 
-        return queryset
+        return [dict(coupon, coupon_owned=coupon['id'] in owned_coupon_ids) for coupon in coupons]
 
     def list(self, request):
         product_id = self.request.query_params.get('product', None)
         if product_id is not None and not check_integer_format(product_id):
             return get_response(status=HTTP_400_BAD_REQUEST, message='Query parameter product must be id format.')
 
-        queryset = self.get_queryset()
-
-        context = {}
-        if is_shopper(request.user):
-            owned_coupon_id_list = list(request.user.shopper.coupons.all().values_list('id', flat=True))
-            context['owned_coupon_id_list']= owned_coupon_id_list
-
-        page = self.paginate_queryset(queryset)
-        serializer = self.get_serializer(page, many=True, context=context)
-
-        paginated_response = self.get_paginated_response(serializer.data)
+        if request.user.is_authenticated and request.user.is_admin:
+            page = self.get_serializer(self.paginate_queryset(self.get_queryset()), many=True).data
+        else:
+            page = self.paginate_queryset(self.__get_active_coupons(product_id))
 
-        return get_response(data=paginated_response.data)
+        return get_response(data=self.get_paginated_response(page).data)
 
     def create(self, requset):
         serializer = self.get_serializer(data=requset.data)
         serializer.is_valid(raise_exception=True)
         coupon = serializer.save()
+        clear_active_coupons()
 
         return get_response(status=HTTP_201_CREATED, data={'id': coupon.id})
 
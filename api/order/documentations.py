@@ -1,15 +1,19 @@
 from drf_yasg.utils import swagger_auto_schema
-from rest_framework.serializers import Serializer, IntegerField, ListField, ImageField, CharField, DateField
+from rest_framework.serializers import Serializer, IntegerField, ListField, ImageField, CharField, DateField, BooleanField, URLField, FileField
 from rest_framework.decorators import action
+from rest_framework.parsers import MultiPartParser
 
-from common.permissions import IsEasyAdminUser
-from common.documentations import get_response, get_ids_response, get_paginated_response
+from common.permissions import IsAdminUser, IsEasyAdminUser
+from common.documentations import get_response, get_ids_response, get_paginated_response, idempotency_key_parameter
 from product.serializers import OptionInOrderItemSerializer
 from .serializers import (
-    OrderSerializer, OrderWriteSerializer, OrderItemSerializer, OrderItemStatisticsSerializer,
-    StatusHistorySerializer, CancellationInformationSerializer, DeliverySerializer,
+    OrderSerializer, OrderWriteSerializer, OrderItemSerializer, OrderItemOptionChangeSerializer, OrderItemStatisticsSerializer,
+    StatusHistorySerializer, ExchangeInformationSerializer, DeliverySerializer, OrderConfirmJobSerializer,
+    OrderQuoteSerializer, SalesQuerySerializer, SalesRollupSerializer, DailySalesRollupSerializer, ProductSalesRollupSerializer,
+    StatusHistoryTimelineSerializer,
 )
-from .views import OrderViewSet, OrderItemViewSet, ClaimViewSet, StatusHistoryAPIView
+from .paginations import OrderCursorPagination
+from .views import OrderViewSet, OrderItemViewSet, OrderConfirmJobViewSet, SalesViewSet, ClaimViewSet, StatusHistoryAPIView
 
 
 class OrderQuerySerializer(Serializer):
@@ -18,6 +22,15 @@ class OrderQuerySerializer(Serializer):
     end_date = DateField(required=False, help_text='start_date와 함께 입력되지 않으면 무시\nformat="YYYY-mm-dd"')
 
 
+class StatusHistoryQuerySerializer(Serializer):
+    id = IntegerField(help_text='주문 항목 id - 여러 개 가능, 100개 이하')
+
+
+class OrderHistoryQuerySerializer(Serializer):
+    cursor = CharField(required=False, help_text='응답받은 next, previous url에 포함된 값')
+    since = CharField(required=False, help_text='응답받은 since 값\n입력하면 해당 시점 이후 변경된 주문만 반환')
+
+
 class OptionInOrderItemResponse(OptionInOrderItemSerializer):
     product_image_url = ImageField()
 
@@ -39,9 +52,17 @@ class OrderResponse(OrderSerializer):
         ref_name = 'Order'
 
 
+class OrderHistoryResponse(Serializer):
+    next = URLField(allow_null=True, help_text='since 입력 시 제외')
+    previous = URLField(allow_null=True, help_text='since 입력 시 제외')
+    since = CharField(allow_null=True)
+    has_more = BooleanField(help_text='since 입력 시에만 포함')
+    results = OrderResponse(many=True)
+
+
 class OrderCreateRequest(OrderWriteSerializer):
     class Meta(OrderWriteSerializer.Meta):
-        exclude = ['shopper', 'created_at']
+        exclude = ['shopper', 'created_at', 'updated_at']
 
 
 class OptionInOrderItemUpdate(Serializer):
@@ -64,6 +85,40 @@ class DeliveryResponse(Serializer):
     existed_invoice = ListField(child=IntegerField())
 
 
+class DeliveryImportRequest(Serializer):
+    file = FileField(help_text='csv 또는 ndjson 파일')
+
+
+class DeliveryImportResponse(DeliveryResponse):
+    invalid_rows = ListField(child=IntegerField(), help_text='형식이 잘못된 행 번호')
+
+
+class OrderQuoteItemResponse(Serializer):
+    option = IntegerField()
+    count = IntegerField()
+    shopper_coupon = IntegerField(allow_null=True)
+    sale_price = IntegerField()
+    base_discounted_price = IntegerField()
+    base_discount_price = IntegerField()
+    membership_discount_price = IntegerField()
+    coupon_discount_price = IntegerField()
+    payment_price = IntegerField(help_text='적립금 사용 전 금액')
+    used_point = IntegerField()
+    earned_point = IntegerField()
+
+
+class OrderQuoteResponse(Serializer):
+    items = OrderQuoteItemResponse(many=True)
+    total_sale_price = IntegerField()
+    total_base_discounted_price = IntegerField()
+    total_membership_discount_price = IntegerField()
+    total_coupon_discount_price = IntegerField()
+    total_payment_price = IntegerField()
+    used_point = IntegerField()
+    actual_payment_price = IntegerField()
+    earned_point = IntegerField()
+
+
 class DecoratedOrderViewSet(OrderViewSet):
     create_description = '''
         주문 생성
@@ -81,14 +136,45 @@ class DecoratedOrderViewSet(OrderViewSet):
     def list(self, *args, **kwargs):
         return super().list(*args, **kwargs)
 
-    @swagger_auto_schema(request_body=OrderCreateRequest, **get_response(code=201), operation_description=create_description)
+    history_description = '''
+        주문 목록 조회 (cursor pagination)
+
+        since 없이 조회하면 주문 최신순으로 반환
+        since를 입력하면 해당 시점 이후 생성되었거나 항목 상태 또는 배송지가 변경된 주문만 변경 순서대로 반환
+        has_more가 true이면 응답받은 since로 다시 조회
+        늦게 커밋되는 변경이 누락되지 않도록 최근 1분 이내에 변경된 주문은 1분이 지난 뒤의 조회에서 반환
+    '''
+
+    @swagger_auto_schema(query_serializer=OrderHistoryQuerySerializer, **get_response(OrderHistoryResponse()), operation_description=history_description)
+    @action(['get'], False, 'history', pagination_class=OrderCursorPagination)
+    def history(self, *args, **kwargs):
+        return super().history(*args, **kwargs)
+
+    @swagger_auto_schema(request_body=OrderCreateRequest, manual_parameters=[idempotency_key_parameter], **get_response(code=201), operation_description=create_description)
     def create(self, *args, **kwargs):
         return super().create(*args, **kwargs)
 
+    quote_description = '''
+        주문 가격 조회
+        주문 생성 시 검증과 같은 규칙으로 항목별 가격과 합계를 계산
+        응답받은 값을 그대로 주문 생성 요청에 사용 가능
+        최대 100개까지 조회 가능
+    '''
+
+    @swagger_auto_schema(request_body=OrderQuoteSerializer, **get_response(OrderQuoteResponse()), operation_description=quote_description)
+    @action(['post'], False)
+    def quote(self, *args, **kwargs):
+        return super().quote(*args, **kwargs)
+
     @swagger_auto_schema(**get_response(OrderResponse()), operation_description='주문 단건 조회')
     def retrieve(self, *args, **kwargs):
         return super().retrieve(*args, **kwargs)
 
+    @swagger_auto_schema(**get_response(StatusHistoryTimelineSerializer(many=True)), operation_description='주문의 모든 항목 상태 이력 일괄 조회')
+    @action(['get'], True, 'status-histories')
+    def get_status_histories(self, *args, **kwargs):
+        return super().get_status_histories(*args, **kwargs)
+
     @swagger_auto_schema(**get_response(), operation_description='주문 배송지 변경\n입금 대기, 결제 완료 상태인 주문만 배송지 변경 가능')
     @action(['put'], True, 'shipping-address')
     def update_shipping_address(self, *args, **kwargs):
@@ -104,26 +190,130 @@ class DecoratedOrderViewSet(OrderViewSet):
     def delivery(self, *args, **kwargs):
         return super().delivery(*args, **kwargs)
 
+    import_delivery_description = '''
+        이지어드민 기능
+        송장 일괄 입력 (파일)
+
+        csv: order,order_items,company,invoice_number,shipping_fee 헤더 포함, order_items는 "|"로 구분
+        ndjson: 한 줄에 송장 입력 요청 데이터 하나
+
+        500건 단위로 나누어 처리하며 형식이 잘못된 행은 invalid_rows에 행 번호로 반환
+    '''
+
+    @swagger_auto_schema(request_body=DeliveryImportRequest, **get_response(DeliveryImportResponse(), 201), security=[], operation_description=import_delivery_description)
+    @action(['post'], False, 'delivery/import', permission_classes=[IsEasyAdminUser], parser_classes=[MultiPartParser])
+    def import_delivery(self, *args, **kwargs):
+        return super().import_delivery(*args, **kwargs)
+
 class DecoratedOrderItemViewSet(OrderItemViewSet):
     @swagger_auto_schema(request_body=OptionInOrderItemUpdate, **get_response(), operation_description='주문 항목 옵션 변경\n입금 대기, 결제 완료 상태인 주문만 옵션 변경 가능')
     def partial_update(self, *args, **kwargs):
         return super().partial_update(*args, **kwargs)
 
+    update_options_description = '''
+        관리자 기능
+        여러 주문 항목의 옵션 일괄 변경
+        입금 대기, 결제 완료 상태인 항목만 같은 상품의 다른 옵션으로 변경 가능
+        변경 후 한 주문에 같은 옵션이 중복되면 에러 반환
+    '''
+
+    @swagger_auto_schema(request_body=OrderItemOptionChangeSerializer(many=True), **get_ids_response(), operation_description=update_options_description)
+    @action(['patch'], False, 'options', permission_classes=[IsAdminUser])
+    def update_options(self, *args, **kwargs):
+        return super().update_options(*args, **kwargs)
+
+    @swagger_auto_schema(query_serializer=StatusHistoryQuerySerializer, **get_response(StatusHistoryTimelineSerializer(many=True)), operation_description='여러 주문 항목의 상태 이력 일괄 조회\n사용자 소유가 아닌 주문 항목 id 전송 시 PermissionDenied(403) 반환')
+    @action(['get'], False, 'status-histories')
+    def get_status_histories(self, *args, **kwargs):
+        return super().get_status_histories(*args, **kwargs)
+
     @swagger_auto_schema(**get_response(OrderItemStatisticsSerializer(many=True)), operation_description='상태별 주문 개수 조회 (정상인 6개 상태)')
     @action(['get'], False, 'statistics')
     def get_statistics(self, *args, **kwargs):
         return super().get_statistics(*args, **kwargs)
 
+class OrderConfirmJobResult(OrderConfirmResponse):
+    locked = ListField(child=IntegerField(), help_text='다른 요청에서 처리 중이어서 건너뛴 항목')
+
+
+class OrderConfirmJobResponse(OrderConfirmJobSerializer):
+    result = OrderConfirmJobResult()
+
+    class Meta(OrderConfirmJobSerializer.Meta):
+        ref_name = 'OrderConfirmJob'
+
+
+class DecoratedOrderConfirmJobViewSet(OrderConfirmJobViewSet):
+    create_description = '''
+        이지어드민 기능
+        발주 확인 작업 등록 (대량)
+
+        등록된 작업은 일정 개수씩 나누어 처리되며 작업 조회로 진행 상황 확인
+    '''
+
+    @swagger_auto_schema(request_body=OrderItemList, **get_response(code=202), security=[], operation_description=create_description)
+    def create(self, *args, **kwargs):
+        return super().create(*args, **kwargs)
+
+    @swagger_auto_schema(**get_response(OrderConfirmJobResponse()), security=[], operation_description='이지어드민 기능\n발주 확인 작업 진행 상황 조회\nfinished_at이 null이 아니면 완료')
+    def retrieve(self, *args, **kwargs):
+        return super().retrieve(*args, **kwargs)
+
+class DecoratedSalesViewSet(SalesViewSet):
+    sales_description = '''
+        도매 기능
+        주문일 기준 상태별 판매 집계 조회
+        start_date, end_date 필수 (최대 366일)
+        주문 항목의 상태가 변경되면 수 초 이내에 반영됨
+    '''
+
+    @swagger_auto_schema(query_serializer=SalesQuerySerializer, **get_response(DailySalesRollupSerializer(many=True)), operation_description=sales_description + '일별 + 상태별')
+    def list(self, *args, **kwargs):
+        return super().list(*args, **kwargs)
+
+    @swagger_auto_schema(query_serializer=SalesQuerySerializer, **get_response(SalesRollupSerializer(many=True)), operation_description=sales_description + '기간 합계 (상태별)')
+    @action(['get'], False)
+    def summary(self, *args, **kwargs):
+        return super().summary(*args, **kwargs)
+
+    @swagger_auto_schema(query_serializer=SalesQuerySerializer, **get_response(ProductSalesRollupSerializer(many=True)), operation_description=sales_description + '상품별 + 상태별')
+    @action(['get'], False, 'products')
+    def get_products(self, *args, **kwargs):
+        return super().get_products(*args, **kwargs)
+
+
 class DecoratedClaimViewset(ClaimViewSet):
     cancel_description = '''
         주문 취소 기능
         하나의 주문에 있는 항목들에 대해서만 취소 가능
         입금 대기, 결제 완료 상태인 주문만 취소 가능
+        결제 완료 상태인 항목들의 결제 금액은 하나의 환불로 처리
+    '''
+    exchange_description = '''
+        교환 요청 기능
+        하나의 주문에 있는 배송 완료 상태인 항목들에 대해서만 요청 가능
+        options는 order_items와 같은 순서로 입력하며 같은 상품의 다른 옵션만 입력 가능
     '''
-    @swagger_auto_schema(request_body=OrderItemList, **get_ids_response(201), operation_description=cancel_description)
+    return_description = '''
+        반품 요청 기능
+        하나의 주문에 있는 배송 완료 상태인 항목들에 대해서만 요청 가능
+        항목들의 결제 금액은 하나의 환불로 처리
+    '''
+
+    @swagger_auto_schema(request_body=OrderItemList, manual_parameters=[idempotency_key_parameter], **get_ids_response(201), operation_description=cancel_description)
     @action(['post'], False)
     def cancel(self, *args, **kwargs):
-        super().cancel(*args, **kwargs)
+        return super().cancel(*args, **kwargs)
+
+    @swagger_auto_schema(request_body=ExchangeInformationSerializer, manual_parameters=[idempotency_key_parameter], **get_ids_response(201), operation_description=exchange_description)
+    @action(['post'], False)
+    def exchange(self, *args, **kwargs):
+        return super().exchange(*args, **kwargs)
+
+    @swagger_auto_schema(request_body=OrderItemList, manual_parameters=[idempotency_key_parameter], **get_ids_response(201), operation_description=return_description)
+    @action(['post'], False, 'return')
+    def return_order_items(self, *args, **kwargs):
+        return super().return_order_items(*args, **kwargs)
 
 
 decorated_status_history_view = swagger_auto_schema(
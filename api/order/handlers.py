@@ -0,0 +1,59 @@
+from collections import Counter, defaultdict
+
+from django.db.models import F
+from django.db.models.functions import TruncDate
+
+from common.outbox import handler
+
+from .models import SALES_ROLLUP_VALUE_FIELDS, OrderItem, OrderItemStatistics, WholesalerSalesRollup, ProductSalesRollup
+
+ORDER_ITEM_STATISTICS_TOPIC = 'order_item_statistics'
+
+
+# changes: [[order_item_id, 이전 상태(없으면 null), 변경된 상태], ...]
+@handler(ORDER_ITEM_STATISTICS_TOPIC)
+def apply_order_item_statistics(payload):
+    changes = payload['changes']
+    shopper_ids = dict(
+        OrderItem.objects.filter(id__in=[change[0] for change in changes], is_replacement=False).values_list('id', 'order__shopper_id')
+    )
+
+    counts = Counter()
+    for order_item_id, previous_status_id, status_id in changes:
+        if order_item_id not in shopper_ids:
+            continue
+
+        counts[(shopper_ids[order_item_id], status_id)] += 1
+        if previous_status_id is not None:
+            counts[(shopper_ids[order_item_id], previous_status_id)] -= 1
+
+    OrderItemStatistics.objects.apply_counts(counts)
+
+
+@handler(ORDER_ITEM_STATISTICS_TOPIC)
+def apply_sales_rollups(payload):
+    changes = payload['changes']
+    order_items = OrderItem.objects.filter(id__in=[change[0] for change in changes], is_replacement=False).annotate(
+        date=TruncDate('order__created_at'),
+        wholesaler_id=F('option__product_color__product__wholesaler_id'),
+        product_id=F('option__product_color__product_id'),
+    ).in_bulk(field_name='id')
+
+    wholesaler_deltas = defaultdict(Counter)
+    product_deltas = defaultdict(Counter)
+    for order_item_id, previous_status_id, status_id in changes:
+        if order_item_id not in order_items:
+            continue
+
+        order_item = order_items[order_item_id]
+        values = {field: getattr(order_item, field) for field in SALES_ROLLUP_VALUE_FIELDS}
+        for sign, status in [(1, status_id), (-1, previous_status_id)]:
+            if status is None:
+                continue
+
+            for field, value in values.items():
+                wholesaler_deltas[(order_item.date, order_item.wholesaler_id, status)][field] += sign * value
+                product_deltas[(order_item.date, order_item.wholesaler_id, order_item.product_id, status)][field] += sign * value
+
+    WholesalerSalesRollup.objects.apply_deltas(wholesaler_deltas)
+    ProductSalesRollup.objects.apply_deltas(product_deltas)
@@ -0,0 +1,72 @@
+from collections import defaultdict
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db.transaction import atomic
+from django.utils import timezone
+
+from order.models import DELIVERY_COMPLETION_STATUS, PURCHASE_CONFIRMATION_STATUS, StatusHistory, StatusHistoryArchive
+
+
+class Command(BaseCommand):
+    help = 'Move status histories of delivered or confirmed order items into status_history_archive.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000, help='Number of order items compacted in one transaction.')
+        parser.add_argument('--days', type=int, default=30, help='Compact only order items whose last status changed more than this many days ago.')
+
+    def __compact(self, order_item_ids, before):
+        histories = defaultdict(list)
+        for status_history in StatusHistory.objects.filter(order_item_id__in=order_item_ids).order_by('order_item_id', 'id'):
+            histories[status_history.order_item_id].append(status_history)
+
+        # 마지막 변경 이후 충분히 지나지 않은 항목은 이후 교환, 반품 요청이 있을 수 있으므로 제외
+        histories = {
+            order_item_id: status_histories for order_item_id, status_histories in histories.items()
+            if status_histories[-1].created_at < before
+        }
+        if not histories:
+            return 0
+
+        archives = StatusHistoryArchive.objects.select_for_update().in_bulk(list(histories))
+        new_archives = []
+        for order_item_id, status_histories in histories.items():
+            archive = archives.get(order_item_id)
+            if archive is None:
+                archive = StatusHistoryArchive(order_item_id=order_item_id)
+                new_archives.append(archive)
+
+            archive.histories += [
+                [status_history.id, status_history.status_id, status_history.created_at.isoformat()] for status_history in status_histories
+            ]
+
+        StatusHistoryArchive.objects.bulk_create(new_archives)
+        StatusHistoryArchive.objects.bulk_update(list(archives.values()), ['histories'])
+        StatusHistory.objects.filter(id__in=[status_history.id for status_histories in histories.values() for status_history in status_histories]).delete()
+
+        return len(histories)
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        before = timezone.now() - timedelta(days=options['days'])
+        last_order_item_id = 0
+        total_order_items = 0
+        total_compacted = 0
+
+        while True:
+            order_item_ids = list(
+                StatusHistory.objects.filter(
+                    order_item_id__gt=last_order_item_id, order_item__status_id__in=[DELIVERY_COMPLETION_STATUS, PURCHASE_CONFIRMATION_STATUS]
+                ).order_by('order_item_id').values_list('order_item_id', flat=True).distinct()[:chunk_size]
+            )
+            if not order_item_ids:
+                break
+
+            with atomic():
+                total_compacted += self.__compact(order_item_ids, before)
+
+            last_order_item_id = order_item_ids[-1]
+            total_order_items += len(order_item_ids)
+            self.stdout.write(f'{total_order_items} order items checked.')
+
+        self.stdout.write(self.style.SUCCESS(f'Done. {total_order_items} order items, {total_compacted} compacted.'))
@@ -0,0 +1,78 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from django.utils import timezone
+
+from order.models import OrderConfirmJob
+from order.serializers import confirm_order_items_in_chunks
+
+# 진행 상황을 저장할 때마다 갱신되는 점유 시각이 이보다 오래되면 실행이 종료된 것으로 보고 다른 실행이 가져감
+JOB_CLAIM_TIMEOUT = timedelta(minutes=10)
+
+
+class Command(BaseCommand):
+    help = 'Confirm paid order items in chunks. Without order item ids, unfinished confirm jobs are run.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('order_items', nargs='*', type=int, help='Order item ids to confirm.')
+        parser.add_argument('--chunk-size', type=int, default=500, help='Number of order items locked in one transaction.')
+
+    def handle(self, *args, **options):
+        if options['order_items']:
+            jobs = [OrderConfirmJob.objects.create(order_items=options['order_items'], claimed_at=timezone.now())]
+        else:
+            jobs = (job for job in OrderConfirmJob.objects.filter(finished_at=None) if self.__claim(job))
+
+        for job in jobs:
+            self.__run(job, options['chunk_size'])
+
+    # 조건부 update로 점유하여, 동시에 실행된 명령 중 하나만 작업을 처리함
+    def __claim(self, job):
+        now = timezone.now()
+        claimed = OrderConfirmJob.objects.filter(id=job.id, finished_at=None) \
+            .filter(Q(claimed_at=None) | Q(claimed_at__lt=now - JOB_CLAIM_TIMEOUT)).update(claimed_at=now)
+        if claimed:
+            job.refresh_from_db()
+
+        return bool(claimed)
+
+    # 다른 실행이 작업을 가져갔다면 저장하지 않고 False 반환
+    def __save_progress(self, job, **fields):
+        now = timezone.now()
+        saved = OrderConfirmJob.objects.filter(id=job.id, claimed_at=job.claimed_at).update(claimed_at=now, **fields)
+        if saved:
+            job.claimed_at = now
+            for key, value in fields.items():
+                setattr(job, key, value)
+        else:
+            self.stderr.write(self.style.WARNING(f'Job {job.id} was claimed by another run. Stopped.'))
+
+        return bool(saved)
+
+    def __run(self, job, chunk_size):
+        total_count = len(job.order_items)
+        offset = job.processed_count
+        started_at = timezone.now()
+
+        for processed_count, result in confirm_order_items_in_chunks(job.order_items[offset:], chunk_size, job.result or None):
+            if not self.__save_progress(job, processed_count=offset + processed_count, result=result):
+                return
+            self.stdout.write(f'Job {job.id}: {job.processed_count}/{total_count} order items processed.')
+
+        # 다른 트랜잭션이 잠그고 있어 건너뛴 항목은 마지막에 한번 더 시도
+        locked = job.result.get('locked', [])
+        if locked:
+            job.result['locked'] = []
+            for _, result in confirm_order_items_in_chunks(locked, chunk_size, job.result):
+                if not self.__save_progress(job, processed_count=total_count, result=result):
+                    return
+
+        if not self.__save_progress(job, finished_at=timezone.now()):
+            return
+
+        seconds = (job.finished_at - started_at).total_seconds()
+        self.stdout.write(self.style.SUCCESS(
+            f'Job {job.id} done in {seconds:.1f}s. '
+            + ', '.join(f'{key}: {len(value)}' for key, value in job.result.items())
+        ))
@@ -0,0 +1,51 @@
+from django.core.management.base import BaseCommand
+from django.db.transaction import atomic
+
+from order.models import SHIPPING_ADDRESS_CONTENT_FIELDS, ShippingAddress, get_shipping_address_hash
+
+
+class Command(BaseCommand):
+    help = 'Fill content hashes of shipping addresses written before hashes were recorded. Duplicated addresses are left empty.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000, help='Number of shipping addresses filled in one transaction.')
+
+    def __fill(self, shipping_addresses):
+        hashes = {}
+        for shipping_address in shipping_addresses:
+            content_hash = get_shipping_address_hash({field: getattr(shipping_address, field) for field in SHIPPING_ADDRESS_CONTENT_FIELDS})
+            hashes.setdefault(content_hash, shipping_address)
+
+        # 이미 같은 내용의 배송지가 있으면 가장 먼저 생성된 배송지만 해시를 가짐
+        existing_hashes = set(ShippingAddress.objects.filter(content_hash__in=hashes.keys()).values_list('content_hash', flat=True))
+        filled = []
+        for content_hash, shipping_address in hashes.items():
+            if content_hash not in existing_hashes:
+                shipping_address.content_hash = content_hash
+                filled.append(shipping_address)
+
+        ShippingAddress.objects.bulk_update(filled, ['content_hash'])
+
+        return len(filled)
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        last_id = 0
+        total_count = 0
+        total_filled = 0
+
+        while True:
+            shipping_addresses = list(
+                ShippingAddress.objects.filter(content_hash=None, id__gt=last_id).order_by('id')[:chunk_size]
+            )
+            if not shipping_addresses:
+                break
+
+            with atomic():
+                total_filled += self.__fill(shipping_addresses)
+
+            last_id = shipping_addresses[-1].id
+            total_count += len(shipping_addresses)
+            self.stdout.write(f'{total_count} shipping addresses checked.')
+
+        self.stdout.write(self.style.SUCCESS(f'Done. {total_filled} filled, {total_count - total_filled} duplicated.'))
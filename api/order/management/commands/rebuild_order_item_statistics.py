@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+from django.db.transaction import atomic
+
+from user.models import Shopper
+from order.models import OrderItemStatistics
+
+
+class Command(BaseCommand):
+    help = 'Rebuild per-shopper order item status counts from order_item.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000, help='Number of shoppers rebuilt in one transaction.')
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        last_shopper_id = 0
+        total_shoppers = 0
+        total_rows = 0
+
+        while True:
+            shopper_ids = list(
+                Shopper.objects.filter(pk__gt=last_shopper_id).order_by('pk').values_list('pk', flat=True)[:chunk_size]
+            )
+            if not shopper_ids:
+                break
+
+            with atomic():
+                total_rows += len(OrderItemStatistics.objects.rebuild(shopper_ids))
+
+            last_shopper_id = shopper_ids[-1]
+            total_shoppers += len(shopper_ids)
+            self.stdout.write(f'{total_shoppers} shoppers rebuilt.')
+
+        self.stdout.write(self.style.SUCCESS(f'Done. {total_shoppers} shoppers, {total_rows} rows.'))
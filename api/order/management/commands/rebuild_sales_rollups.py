@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+from django.db.transaction import atomic
+
+from user.models import Wholesaler
+from order.models import WholesalerSalesRollup, ProductSalesRollup
+
+
+class Command(BaseCommand):
+    help = 'Rebuild daily wholesaler and product sales rollups from order_item.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=100, help='Number of wholesalers rebuilt in one transaction.')
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        last_wholesaler_id = 0
+        total_wholesalers = 0
+        total_rows = 0
+
+        while True:
+            wholesaler_ids = list(
+                Wholesaler.objects.filter(pk__gt=last_wholesaler_id).order_by('pk').values_list('pk', flat=True)[:chunk_size]
+            )
+            if not wholesaler_ids:
+                break
+
+            with atomic():
+                total_rows += len(WholesalerSalesRollup.objects.rebuild(wholesaler_ids))
+                total_rows += len(ProductSalesRollup.objects.rebuild(wholesaler_ids))
+
+            last_wholesaler_id = wholesaler_ids[-1]
+            total_wholesalers += len(wholesaler_ids)
+            self.stdout.write(f'{total_wholesalers} wholesalers rebuilt.')
+
+        self.stdout.write(self.style.SUCCESS(f'Done. {total_wholesalers} wholesalers, {total_rows} rows.'))
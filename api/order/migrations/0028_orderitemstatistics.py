@@ -0,0 +1,28 @@
+# Generated by Django 4.0.2 on 2026-10-20 01:37
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0026_alter_membership_discount_rate'),
+        ('order', '0027_orderitem_coupon_discount_price_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderItemStatistics',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('count', models.IntegerField(default=0)),
+                ('shopper', models.ForeignKey(on_delete=django.db.models.deletion.DO_NOTHING, to='user.shopper')),
+                ('status', models.ForeignKey(on_delete=django.db.models.deletion.DO_NOTHING, to='order.status')),
+            ],
+            options={
+                'db_table': 'order_item_statistics',
+                'unique_together': {('shopper', 'status')},
+            },
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.0.2 on 2026-10-20 01:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('order', '0028_orderitemstatistics'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['shopper', 'created_at', 'id'], name='order_shopper_created_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='orderitem',
+            index=models.Index(fields=['order', 'status'], name='order_item_order_status_idx'),
+        ),
+    ]
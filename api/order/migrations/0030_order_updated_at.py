@@ -0,0 +1,23 @@
+# Generated by Django 4.0.2 on 2026-10-20 01:41
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('order', '0029_order_list_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='updated_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['shopper', 'updated_at', 'id'], name='order_shopper_updated_at_idx'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.0.2 on 2026-10-20 01:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('order', '0030_order_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderConfirmJob',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('order_items', models.JSONField()),
+                ('processed_count', models.IntegerField(default=0)),
+                ('result', models.JSONField(default=dict)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('finished_at', models.DateTimeField(null=True)),
+            ],
+            options={
+                'db_table': 'order_confirm_job',
+                'ordering': ['id'],
+            },
+        ),
+    ]
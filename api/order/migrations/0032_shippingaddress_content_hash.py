@@ -0,0 +1,18 @@
+# Generated by Django 4.0.2 on 2026-10-20 02:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('order', '0031_orderconfirmjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='shippingaddress',
+            name='content_hash',
+            field=models.CharField(max_length=64, null=True, unique=True),
+        ),
+    ]
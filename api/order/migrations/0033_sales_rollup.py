@@ -0,0 +1,62 @@
+# Generated by Django 4.0.2 on 2026-10-20 02:17
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0027_pointhistory_balance'),
+        ('product', '0044_delete_size_alter_option_size'),
+        ('order', '0032_shippingaddress_content_hash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductSalesRollup',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('date', models.DateField()),
+                ('count', models.IntegerField(default=0)),
+                ('sale_price', models.BigIntegerField(default=0)),
+                ('base_discount_price', models.BigIntegerField(default=0)),
+                ('membership_discount_price', models.BigIntegerField(default=0)),
+                ('coupon_discount_price', models.BigIntegerField(default=0)),
+                ('payment_price', models.BigIntegerField(default=0)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.DO_NOTHING, to='product.product')),
+                ('status', models.ForeignKey(on_delete=django.db.models.deletion.DO_NOTHING, to='order.status')),
+                ('wholesaler', models.ForeignKey(on_delete=django.db.models.deletion.DO_NOTHING, to='user.wholesaler')),
+            ],
+            options={
+                'db_table': 'product_sales_rollup',
+            },
+        ),
+        migrations.CreateModel(
+            name='WholesalerSalesRollup',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('date', models.DateField()),
+                ('count', models.IntegerField(default=0)),
+                ('sale_price', models.BigIntegerField(default=0)),
+                ('base_discount_price', models.BigIntegerField(default=0)),
+                ('membership_discount_price', models.BigIntegerField(default=0)),
+                ('coupon_discount_price', models.BigIntegerField(default=0)),
+                ('payment_price', models.BigIntegerField(default=0)),
+                ('status', models.ForeignKey(on_delete=django.db.models.deletion.DO_NOTHING, to='order.status')),
+                ('wholesaler', models.ForeignKey(on_delete=django.db.models.deletion.DO_NOTHING, to='user.wholesaler')),
+            ],
+            options={
+                'db_table': 'wholesaler_sales_rollup',
+                'unique_together': {('wholesaler', 'date', 'status')},
+            },
+        ),
+        migrations.AddIndex(
+            model_name='productsalesrollup',
+            index=models.Index(fields=['wholesaler', 'date'], name='product_sales_rollup_date_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='productsalesrollup',
+            unique_together={('product', 'date', 'status')},
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.0.2 on 2026-10-20 02:33
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('order', '0033_sales_rollup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StatusHistoryArchive',
+            fields=[
+                ('order_item', models.OneToOneField(on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, serialize=False, to='order.orderitem')),
+                ('histories', models.JSONField(default=list)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'db_table': 'status_history_archive',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='statushistory',
+            index=models.Index(fields=['order_item', 'id'], name='status_history_item_id_idx'),
+        ),
+    ]
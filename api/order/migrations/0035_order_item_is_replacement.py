@@ -0,0 +1,18 @@
+# Generated by Django 4.0.2 on 2026-10-20 03:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('order', '0034_status_history_archive'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='orderitem',
+            name='is_replacement',
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.0.2 on 2026-10-20 03:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('order', '0035_order_item_is_replacement'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='orderconfirmjob',
+            name='claimed_at',
+            field=models.DateTimeField(null=True),
+        ),
+    ]
@@ -1,11 +1,18 @@
+import json
 import random
 import string
 
+from datetime import timedelta
+from hashlib import sha256
+
 from django.db.models import (
-    Model, BigAutoField, AutoField, ForeignKey, OneToOneField,
-    IntegerField, BigIntegerField, CharField, BooleanField, DateTimeField,
-    DO_NOTHING
+    Model, Manager, BigAutoField, AutoField, ForeignKey, OneToOneField,
+    IntegerField, BigIntegerField, CharField, BooleanField, DateField, DateTimeField, JSONField,
+    DO_NOTHING, Q, F, Case, When, Value, Count, Sum, Exists, OuterRef, Index
 )
+from django.db.models.functions import TruncDate
+from django.db.models.query import QuerySet
+from django.db.transaction import atomic
 from django.utils import timezone
 
 from common.utils import DEFAULT_DATETIME_FORMAT
@@ -17,22 +24,46 @@ DELIVERY_PREPARING_STATUS = 200
 DELIVERY_PROGRESSING_STATUS = 201
 DELIVERY_COMPLETION_STATUS = 202
 PURCHASE_CONFIRMATION_STATUS = 203
+ORDER_CANCELLATION_STATUS = 102
+PAYMENT_CANCELLATION_STATUS = 103
+EXCHANGE_REQUEST_STATUS = 300
+RETURN_REQUEST_STATUS = 400
 BEFORE_DELIVERY_STATUS = [DEPOSIT_WAITING_STATUS, PAYMENT_COMPLETION_STATUS]
 NORMAL_STATUS = [
     DEPOSIT_WAITING_STATUS, PAYMENT_COMPLETION_STATUS, DELIVERY_PREPARING_STATUS, 
     DELIVERY_PROGRESSING_STATUS, DELIVERY_COMPLETION_STATUS, PURCHASE_CONFIRMATION_STATUS
 ]
 
+class OrderQuerySet(QuerySet):
+    def filter_by_item_status(self, status_id):
+        return self.filter(Exists(OrderItem.objects.filter(order_id=OuterRef('id'), status_id=status_id)))
+
+    def filter_by_created_date(self, start_date, end_date):
+        return self.filter(created_at__gte=start_date, created_at__lt=end_date + timedelta(days=1))
+
+
+class OrderManager(Manager):
+    def get_queryset(self):
+        return OrderQuerySet(self.model, using=self._db)
+
+
 class Order(Model):
     id = BigAutoField(primary_key=True)
     number = CharField(max_length=25, unique=True) 
     shopper = ForeignKey('user.Shopper', DO_NOTHING)
     shipping_address = ForeignKey('ShippingAddress', DO_NOTHING)
     created_at = DateTimeField(default=timezone.now)
+    updated_at = DateTimeField(default=timezone.now)
+
+    objects = OrderManager()
 
     class Meta:
         db_table = 'order'
         ordering = ['-id']
+        indexes = [
+            Index(fields=['shopper', 'created_at', 'id'], name='order_shopper_created_at_idx'),
+            Index(fields=['shopper', 'updated_at', 'id'], name='order_shopper_updated_at_idx'),
+        ]
 
     def __set_default_number(self):
         prefix = self.created_at.strftime(DEFAULT_DATETIME_FORMAT)
@@ -64,10 +95,15 @@ class OrderItem(Model):
     payment_price = IntegerField()
     earned_point = IntegerField()
     delivery = ForeignKey('Delivery', DO_NOTHING, null=True)
+    # 교환으로 새로 생성된 항목, 매출과 상태 통계에서 제외
+    is_replacement = BooleanField(default=False)
 
     class Meta:
         db_table = 'order_item'
         ordering = ['id']
+        indexes = [
+            Index(fields=['order', 'status'], name='order_item_order_status_idx'),
+        ]
 
 
 class Status(Model):
@@ -90,6 +126,44 @@ class StatusHistory(Model):
     class Meta:
         db_table = 'status_history'
         ordering = ['id']
+        indexes = [
+            Index(fields=['order_item', 'id'], name='status_history_item_id_idx'),
+        ]
+
+
+# 배송 완료, 구매 확정 후 변경이 거의 없는 항목의 상태 이력을 [id, status_id, created_at] 목록으로 압축 보관
+class StatusHistoryArchive(Model):
+    order_item = OneToOneField('OrderItem', DO_NOTHING, primary_key=True)
+    histories = JSONField(default=list)
+    created_at = DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'status_history_archive'
+
+
+SHIPPING_ADDRESS_CONTENT_FIELDS = [
+    'receiver_name', 'mobile_number', 'phone_number', 'zip_code', 'base_address', 'detail_address', 'shipping_message'
+]
+
+
+def get_shipping_address_hash(data):
+    content = json.dumps([data.get(field) for field in SHIPPING_ADDRESS_CONTENT_FIELDS], ensure_ascii=False)
+
+    return sha256(content.encode()).hexdigest()
+
+
+class ShippingAddressManager(Manager):
+    # 내용이 같은 배송지는 하나의 행을 공유
+    def get_or_create_by_content(self, content_hash=None, **kwargs):
+        content_hash = content_hash or get_shipping_address_hash(kwargs)
+        instance = self.filter(content_hash=content_hash).first()
+        if instance is None:
+            with atomic():
+                self.bulk_create([self.model(content_hash=content_hash, **kwargs)], ignore_conflicts=True)
+                # 스냅샷 이후 다른 트랜잭션이 커밋한 행도 읽도록 잠금 읽기로 조회
+                instance = self.select_for_update().get(content_hash=content_hash)
+
+        return instance
 
 
 class ShippingAddress(Model):
@@ -101,10 +175,18 @@ class ShippingAddress(Model):
     base_address = CharField(max_length=200)
     detail_address = CharField(max_length=100)
     shipping_message = CharField(max_length=50)
+    content_hash = CharField(max_length=64, unique=True, null=True)
+
+    objects = ShippingAddressManager()
 
     class Meta:
         db_table = 'shipping_address'
 
+    def save(self, *args, **kwargs):
+        self.content_hash = get_shipping_address_hash({field: getattr(self, field) for field in SHIPPING_ADDRESS_CONTENT_FIELDS})
+
+        return super().save(*args, **kwargs)
+
 # todo
 # claim (취소, 환불) 설계 및 구현
 # 결제, 환불 설계 및 구현
@@ -169,4 +251,141 @@ class Delivery(Model):
 
     class Meta:
         db_table = 'delivery'
-        ordering = ['id']
\ No newline at end of file
+        ordering = ['id']
+
+
+class OrderItemStatisticsManager(Manager):
+    def apply_counts(self, counts):
+        counts = {key: value for key, value in counts.items() if value != 0}
+        if not counts:
+            return
+
+        self.bulk_create([self.model(shopper_id=shopper_id, status_id=status_id) for shopper_id, status_id in counts], ignore_conflicts=True)
+
+        condition = Q()
+        cases = []
+        for (shopper_id, status_id), value in counts.items():
+            condition |= Q(shopper_id=shopper_id, status_id=status_id)
+            cases.append(When(shopper_id=shopper_id, status_id=status_id, then=Value(value)))
+
+        self.filter(condition).update(count=F('count') + Case(*cases, default=Value(0)))
+
+    def rebuild(self, shopper_ids=None):
+        queryset = OrderItem.objects.filter(is_replacement=False)
+        statistics = self.all()
+        if shopper_ids is not None:
+            queryset = queryset.filter(order__shopper_id__in=shopper_ids)
+            statistics = statistics.filter(shopper_id__in=shopper_ids)
+
+        statistics.delete()
+        counts = queryset.values('order__shopper_id', 'status_id').annotate(count=Count('id')).order_by()
+
+        return self.bulk_create([
+            self.model(shopper_id=data['order__shopper_id'], status_id=data['status_id'], count=data['count']) for data in counts
+        ], batch_size=1000)
+
+
+class OrderItemStatistics(Model):
+    id = BigAutoField(primary_key=True)
+    shopper = ForeignKey('user.Shopper', DO_NOTHING)
+    status = ForeignKey('Status', DO_NOTHING)
+    count = IntegerField(default=0)
+
+    objects = OrderItemStatisticsManager()
+
+    class Meta:
+        db_table = 'order_item_statistics'
+        unique_together = (('shopper', 'status'),)
+
+
+SALES_ROLLUP_VALUE_FIELDS = [
+    'count', 'sale_price', 'base_discount_price', 'membership_discount_price', 'coupon_discount_price', 'payment_price'
+]
+
+
+class SalesRollupManager(Manager):
+    # deltas: {key_fields 순서의 tuple: {value field: 증감값}}
+    def apply_deltas(self, deltas):
+        deltas = {key: values for key, values in deltas.items() if any(values.values())}
+        if not deltas:
+            return
+
+        key_fields = self.model.key_fields
+        self.bulk_create([self.model(**dict(zip(key_fields, key))) for key in deltas], ignore_conflicts=True)
+
+        condition = Q()
+        cases = {field: [] for field in SALES_ROLLUP_VALUE_FIELDS}
+        for key, values in deltas.items():
+            key_condition = dict(zip(key_fields, key))
+            condition |= Q(**key_condition)
+            for field in SALES_ROLLUP_VALUE_FIELDS:
+                cases[field].append(When(**key_condition, then=Value(values[field])))
+
+        self.filter(condition).update(**{
+            field: F(field) + Case(*cases[field], default=Value(0)) for field in SALES_ROLLUP_VALUE_FIELDS
+        })
+
+    def rebuild(self, wholesaler_ids):
+        self.filter(wholesaler_id__in=wholesaler_ids).delete()
+        key_fields = self.model.key_fields
+        rollups = OrderItem.objects.filter(option__product_color__product__wholesaler_id__in=wholesaler_ids, is_replacement=False) \
+            .annotate(
+                date=TruncDate('order__created_at'),
+                wholesaler_id=F('option__product_color__product__wholesaler_id'),
+                product_id=F('option__product_color__product_id'),
+            ).values(*key_fields).annotate(**{f'total_{field}': Sum(field) for field in SALES_ROLLUP_VALUE_FIELDS}).order_by()
+
+        return self.bulk_create([self.model(
+            **{field: rollup[field] for field in key_fields},
+            **{field: rollup[f'total_{field}'] for field in SALES_ROLLUP_VALUE_FIELDS},
+        ) for rollup in rollups], batch_size=1000)
+
+
+class SalesRollup(Model):
+    id = BigAutoField(primary_key=True)
+    date = DateField()
+    wholesaler = ForeignKey('user.Wholesaler', DO_NOTHING)
+    status = ForeignKey('Status', DO_NOTHING)
+    count = IntegerField(default=0)
+    sale_price = BigIntegerField(default=0)
+    base_discount_price = BigIntegerField(default=0)
+    membership_discount_price = BigIntegerField(default=0)
+    coupon_discount_price = BigIntegerField(default=0)
+    payment_price = BigIntegerField(default=0)
+
+    objects = SalesRollupManager()
+
+    class Meta:
+        abstract = True
+
+
+class WholesalerSalesRollup(SalesRollup):
+    key_fields = ['date', 'wholesaler_id', 'status_id']
+
+    class Meta:
+        db_table = 'wholesaler_sales_rollup'
+        unique_together = (('wholesaler', 'date', 'status'),)
+
+
+class ProductSalesRollup(SalesRollup):
+    product = ForeignKey('product.Product', DO_NOTHING)
+    key_fields = ['date', 'wholesaler_id', 'product_id', 'status_id']
+
+    class Meta:
+        db_table = 'product_sales_rollup'
+        unique_together = (('product', 'date', 'status'),)
+        indexes = [Index(fields=['wholesaler', 'date'], name='product_sales_rollup_date_idx')]
+
+
+class OrderConfirmJob(Model):
+    id = BigAutoField(primary_key=True)
+    order_items = JSONField()
+    processed_count = IntegerField(default=0)
+    result = JSONField(default=dict)
+    created_at = DateTimeField(auto_now_add=True)
+    claimed_at = DateTimeField(null=True)
+    finished_at = DateTimeField(null=True)
+
+    class Meta:
+        db_table = 'order_confirm_job'
+        ordering = ['id']
@@ -1,5 +1,79 @@
-from rest_framework.pagination import PageNumberPagination
+from base64 import urlsafe_b64encode, urlsafe_b64decode
+from binascii import Error as BinasciiError
+from datetime import datetime, timedelta
+
+from django.db.models import Q
+from django.utils import timezone
+
+from rest_framework.pagination import PageNumberPagination, CursorPagination, BasePagination
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+# updated_at은 커밋 전에 앱 서버 시각으로 기록되므로, 늦게 커밋된 변경이 기준점보다 앞서 기록될 수 있음
+# 이 시간보다 최근에 변경된 주문은 기준점을 넘기지 않고 다음 동기화에서 반환하며, 이보다 오래 걸린 트랜잭션의 변경은 누락될 수 있음
+ORDER_SYNC_LAG = timedelta(minutes=1)
+
+
+def get_sync_cutoff():
+    return timezone.now() - ORDER_SYNC_LAG
+
+
+def encode_watermark(order):
+    if order is None:
+        return None
+
+    return urlsafe_b64encode(f'{order.updated_at.isoformat()},{order.id}'.encode()).decode()
+
+
+def decode_watermark(value):
+    try:
+        updated_at, order_id = urlsafe_b64decode(value.encode()).decode().split(',')
+        return datetime.fromisoformat(updated_at), int(order_id)
+    except (BinasciiError, UnicodeDecodeError, ValueError):
+        raise ValidationError('Query parameter since is invalid.')
 
 
 class OrderPagination(PageNumberPagination):
-    page_size = 10
\ No newline at end of file
+    page_size = 10
+
+
+class OrderCursorPagination(CursorPagination):
+    page_size = 10
+    ordering = '-id'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        # 다음 증분 동기화의 기준점, 기준 시각 이전에 변경된 주문이 없으면 기준 시각부터 동기화
+        cutoff = get_sync_cutoff()
+        order = queryset.select_related(None).filter(updated_at__lte=cutoff).order_by('-updated_at', '-id').only('id', 'updated_at').first()
+        self.since = encode_watermark(order or queryset.model(id=0, updated_at=cutoff))
+
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        response = super().get_paginated_response(data)
+        response.data['since'] = self.since
+
+        return response
+
+
+class OrderSyncPagination(BasePagination):
+    page_size = 50
+    since_query_param = 'since'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        since = request.query_params[self.since_query_param]
+        updated_at, order_id = decode_watermark(since)
+
+        queryset = queryset.filter(
+            Q(updated_at__gt=updated_at) | Q(updated_at=updated_at, id__gt=order_id), updated_at__lte=get_sync_cutoff()
+        ).order_by('updated_at', 'id')
+
+        page = list(queryset[:self.page_size + 1])
+        self.has_more = len(page) > self.page_size
+        page = page[:self.page_size]
+        self.since = encode_watermark(page[-1]) if page else since
+
+        return page
+
+    def get_paginated_response(self, data):
+        return Response({'since': self.since, 'has_more': self.has_more, 'results': data})
@@ -1,39 +1,57 @@
 import random
 import string
+from collections import defaultdict
+from datetime import datetime
+from itertools import chain
 from dateutil.relativedelta import relativedelta
 
+from django.core.cache import cache
+from django.db import connection
+from django.db.transaction import atomic, on_commit
+from django.db.models import Case, When, Value
+from django.forms import model_to_dict
 from django.utils import timezone
 
 from rest_framework.serializers import (
     Serializer, ModelSerializer, ListSerializer,
     PrimaryKeyRelatedField, StringRelatedField,
-    IntegerField, ListField, CharField,
+    IntegerField, ListField, CharField, DateField, SerializerMethodField,
 )
 from rest_framework.exceptions import ValidationError
 
 from common.serializers import (
     has_duplicate_element, get_list_of_single_value, get_sum_of_single_value, add_data_in_each_element,
-    get_list_of_multi_values,
+    get_list_of_multi_values, MAXIMUM_NUMBER_OF_ITEMS,
 )
 from common.exceptions import NotExcutableValidationError
-from common.utils import DATETIME_WITHOUT_MILISECONDS_FORMAT
+from common.outbox import publish
+from common.pricing import calculate_item_prices, distribute_point, get_earned_point
+from common.utils import DATETIME_WITHOUT_MILISECONDS_FORMAT, DEFAULT_IMAGE_URL, REQUEST_DATE_FORMAT, datetime_to_iso
 from user.models import ShopperCoupon
 from user.serializers import ShopperCouponSerializer
 from product.models import Option
-from product.serializers import OptionInOrderItemSerializer # todo 이 페이지로 옮겨야 됨
-from coupon.models import SOME_PRODUCT_COUPON_CLASSIFICATION, SUB_CATEGORY_COUPON_CLASSIFICATION
+from product.serializers import OptionInOrderItemSerializer, get_main_image_urls # todo 이 페이지로 옮겨야 됨
+from coupon.models import SOME_PRODUCT_COUPON_CLASSIFICATION, SUB_CATEGORY_COUPON_CLASSIFICATION, Coupon, CouponSubCategory
 from .models import (
-    PAYMENT_COMPLETION_STATUS, DELIVERY_PREPARING_STATUS, DELIVERY_PROGRESSING_STATUS, BEFORE_DELIVERY_STATUS, NORMAL_STATUS,
-    Order, OrderItem, Status, ShippingAddress, Refund, CancellationInformation, StatusHistory,
-    ExchangeInformation, Delivery
+    DEPOSIT_WAITING_STATUS, PAYMENT_COMPLETION_STATUS, DELIVERY_PREPARING_STATUS, DELIVERY_PROGRESSING_STATUS, DELIVERY_COMPLETION_STATUS,
+    ORDER_CANCELLATION_STATUS, PAYMENT_CANCELLATION_STATUS, EXCHANGE_REQUEST_STATUS, RETURN_REQUEST_STATUS, BEFORE_DELIVERY_STATUS, NORMAL_STATUS,
+    get_shipping_address_hash, Order, OrderItem, Status, ShippingAddress, Refund, CancellationInformation, StatusHistory,
+    StatusHistoryArchive, ExchangeInformation, ReturnInformation, Delivery, OrderConfirmJob
 )
 from .validators import validate_order_items
+from .handlers import ORDER_ITEM_STATISTICS_TOPIC
+
+
+RECENT_SHIPPING_ADDRESSES_CACHE_KEY = 'recent_shipping_addresses:{0}'
+RECENT_SHIPPING_ADDRESSES_CACHE_TIMEOUT = 60 * 60 * 24 * 7
+MAXIMUM_NUMBER_OF_RECENT_SHIPPING_ADDRESSES = 5
+MINIMUM_ACTUAL_PAYMENT_PRICE = 1000
 
 
 class ShippingAddressSerializer(ModelSerializer):
     class Meta:
         model = ShippingAddress
-        fields = '__all__'
+        exclude = ['content_hash']
 
     def validate(self, attrs):
         if 'order' in self.context:
@@ -45,13 +63,36 @@ class ShippingAddressSerializer(ModelSerializer):
         if self.context['order'].items.exclude(status__in=BEFORE_DELIVERY_STATUS).exists():
             raise ValidationError('The shipping address for this order cannot be changed.')
 
+    # 주문자가 최근 사용한 배송지는 {content_hash: id} 캐시에서 조회 없이 재사용
+    def __get_or_create(self, validated_data):
+        model = self.Meta.model
+        content_hash = get_shipping_address_hash(validated_data)
+        if 'shopper' not in self.context:
+            return model.objects.get_or_create_by_content(content_hash, **validated_data)
+
+        cache_key = RECENT_SHIPPING_ADDRESSES_CACHE_KEY.format(self.context['shopper'].id)
+        recent_addresses = cache.get(cache_key, {})
+        if content_hash in recent_addresses:
+            instance = model(id=recent_addresses.pop(content_hash), content_hash=content_hash, **validated_data)
+            instance._state.adding = False
+        else:
+            instance = model.objects.get_or_create_by_content(content_hash, **validated_data)
+
+        recent_addresses[content_hash] = instance.id
+        recent_addresses = dict(list(recent_addresses.items())[-MAXIMUM_NUMBER_OF_RECENT_SHIPPING_ADDRESSES:])
+        # 롤백된 배송지가 캐시에 남지 않도록 커밋 후 저장
+        on_commit(lambda: cache.set(cache_key, recent_addresses, RECENT_SHIPPING_ADDRESSES_CACHE_TIMEOUT))
+
+        return instance
+
     def create(self, validated_data):
-        instance = self.Meta.model.objects.get_or_create(**validated_data)[0]
+        instance = self.__get_or_create(validated_data)
 
         # todo order serializer로 로직 이동
         if 'order' in self.context:
             self.context['order'].shipping_address = instance
-            self.context['order'].save(update_fields=['shipping_address'])
+            self.context['order'].updated_at = timezone.now()
+            self.context['order'].save(update_fields=['shipping_address', 'updated_at'])
 
         return instance
 
@@ -66,7 +107,7 @@ class OrderItemSerializer(ModelSerializer):
 
     class Meta:
         model = OrderItem
-        exclude = ['order']
+        exclude = ['order', 'is_replacement']
 
     def validate(self, attrs):
         raise NotExcutableValidationError()
@@ -76,6 +117,7 @@ class OrderItemListSerializer(ListSerializer):
     def validate(self, attrs):
         self.__validate_options(get_list_of_single_value(attrs, 'option'))
         self.__validate_shopper_coupons(get_list_of_single_value(attrs, 'shopper_coupon'))
+        validate_order_item_prices(attrs, self.context['shopper'])
 
         return attrs
 
@@ -90,6 +132,16 @@ class OrderItemListSerializer(ListSerializer):
     def __create_status_history(self, queryset):
         return StatusHistorySerializer().create(queryset)
 
+    def __touch_orders(self, queryset):
+        Order.objects.filter(id__in={instance.order_id for instance in queryset}).update(updated_at=timezone.now())
+
+    # 통계 집계는 요청 경로에서 분리하여 같은 트랜잭션의 outbox 이벤트로 기록
+    def __update_statistics(self, queryset, previous_status_ids=None):
+        previous_status_ids = previous_status_ids or {}
+        publish(ORDER_ITEM_STATISTICS_TOPIC, {
+            'changes': [[instance.id, previous_status_ids.get(instance.id), instance.status_id] for instance in queryset],
+        })
+
     def create(self, validated_data):
         model = self.child.Meta.model
         model.objects.bulk_create([model(**item) for item in validated_data])
@@ -97,20 +149,130 @@ class OrderItemListSerializer(ListSerializer):
         queryset = model.objects.filter(order=validated_data[0]['order'])
         ShopperCouponSerializer().update_is_used(queryset, True)
         self.__create_status_history(queryset)
+        self.__update_statistics(queryset)
 
         return queryset
 
+    # 교환 상품은 이미 결제된 항목을 대체하므로 금액 없이 생성
+    def create_for_exchange(self, queryset, option_ids):
+        model = self.child.Meta.model
+        order_id = queryset[0].order_id
+
+        # MySQL은 bulk insert 결과로 pk를 반환하지 않으므로 주문을 잠근 뒤 생성하여 동시에 생성된 항목과 섞이지 않도록 함
+        if not connection.features.can_return_rows_from_bulk_insert:
+            Order.objects.select_for_update().filter(id=order_id).values_list('id', flat=True).get()
+
+        new_order_items = model.objects.bulk_create([model(
+            order_id=order_id,
+            option_id=option_id,
+            status_id=EXCHANGE_REQUEST_STATUS,
+            count=instance.count,
+            sale_price=0,
+            base_discount_price=0,
+            membership_discount_price=0,
+            coupon_discount_price=0,
+            payment_price=0,
+            earned_point=0,
+            is_replacement=True,
+        ) for instance, option_id in zip(queryset, option_ids)])
+
+        if not connection.features.can_return_rows_from_bulk_insert:
+            new_order_items = list(model.objects.filter(
+                order_id=order_id, 
+                is_replacement=True, 
+                origin_order_item_exchange_information=None,
+            ).order_by('id'))
+
+        self.__create_status_history(new_order_items)
+
+        return new_order_items
+
+    # status_id가 dict인 경우 {현재 상태: 변경될 상태}
     def update_status(self, queryset, status_id):
+        previous_status_ids = {}
         for instance in queryset:
-            instance.status_id = status_id
+            previous_status_ids[instance.id] = instance.status_id
+            instance.status_id = status_id[instance.status_id] if isinstance(status_id, dict) else status_id
 
         # todo bulk_update -> update
         self.child.Meta.model.objects.bulk_update(queryset, ['status_id'])
         self.__create_status_history(queryset)
+        self.__update_statistics(queryset, previous_status_ids)
+        self.__touch_orders(queryset)
 
         return queryset
 
 
+# 쿠폰 적용 대상 상품/카테고리를 한 번에 조회
+def get_coupon_targets(coupons, products):
+    if not coupons:
+        return set(), set()
+
+    coupon_ids = [coupon.id for coupon in coupons]
+    coupon_products = set(Coupon.products.through.objects.filter(coupon_id__in=coupon_ids, product_id__in=[product.id for product in products]) \
+        .values_list('coupon_id', 'product_id'))
+    coupon_sub_categories = set(CouponSubCategory.objects.filter(coupon_id__in=coupon_ids).values_list('coupon_id', 'sub_category_id'))
+
+    return coupon_products, coupon_sub_categories
+
+
+def is_coupon_applicable(coupon, product, coupon_targets):
+    coupon_products, coupon_sub_categories = coupon_targets
+    # todo 기획전 조건 추가
+    if coupon.classification_id == SOME_PRODUCT_COUPON_CLASSIFICATION:
+        return (coupon.id, product.id) in coupon_products
+    elif coupon.classification_id == SUB_CATEGORY_COUPON_CLASSIFICATION:
+        return (coupon.id, product.sub_category_id) in coupon_sub_categories
+
+    return True
+
+
+def _validate_order_item_coupon(attrs, prices, coupon_targets):
+    option = attrs['option']
+    shopper_coupon = attrs.get('shopper_coupon', None)
+    coupon_discount_price = attrs.get('coupon_discount_price', None)
+    if shopper_coupon is None or coupon_discount_price is None:
+        raise ValidationError(f'shopper_coupon and coupon_discount_price of option {option.id} must be requested together.')
+    
+    product = option.product_color.product
+    coupon = shopper_coupon.coupon
+    if not is_coupon_applicable(coupon, product, coupon_targets):
+        raise ValidationError(f'shopper_coupon {shopper_coupon.id} is not applicable to option {option.id}.')
+    elif product.base_discounted_price < coupon.minimum_product_price:
+        raise ValidationError(f'The price of option {option.id} is lower than the minimum order price of shopper_coupon {shopper_coupon.id}.')
+    elif coupon.maximum_discount_price is not None and coupon_discount_price > coupon.maximum_discount_price:
+        raise ValidationError(f'coupon_discount_price has exceeded the maximum discount price of shopper_coupon {shopper_coupon.id}')
+    elif prices['coupon_discount_price'] != coupon_discount_price:
+        raise ValidationError(f'coupon_discount_price of option {option.id} is different from the actual price.')
+
+
+# 주문 항목의 가격과 쿠폰 적용 대상을 견적과 같은 방식으로 한 번에 계산하여 검증
+def validate_order_item_prices(items, shopper):
+    pricing_items = [{
+        'product': item['option'].product_color.product,
+        'count': item['count'],
+        'coupon': item['shopper_coupon'].coupon if item.get('shopper_coupon') is not None else None,
+    } for item in items]
+    prices = calculate_item_prices(pricing_items, shopper.membership.discount_rate)
+    coupon_items = [pricing_item for pricing_item in pricing_items if pricing_item['coupon'] is not None]
+    coupon_targets = get_coupon_targets(get_list_of_single_value(coupon_items, 'coupon'), get_list_of_single_value(coupon_items, 'product'))
+
+    for item, price in zip(items, prices):
+        option = item['option']
+        for key in ['sale_price', 'base_discounted_price', 'membership_discount_price']:
+            if item[key] != price[key]:
+                raise ValidationError(f'{key} of option {option.id} is different from the actual price.')
+
+        if 'shopper_coupon' in item or 'coupon_discount_price' in item:
+            _validate_order_item_coupon(item, price, coupon_targets)
+
+        if item['payment_price'] != price['payment_price']:
+            raise ValidationError(f'payment_price of option {option.id} is different from the actual price.')
+
+        item['base_discount_price'] = price['base_discount_price']
+        item.pop('base_discounted_price')
+
+
 class OrderItemWriteSerializer(OrderItemSerializer):
     option = PrimaryKeyRelatedField(queryset=Option.objects.select_related('product_color__product').all())
     base_discounted_price = IntegerField(min_value=0)
@@ -130,7 +292,9 @@ class OrderItemWriteSerializer(OrderItemSerializer):
         if self.instance is not None:
             return attrs
 
-        self.__validate_price(attrs)
+        # 목록으로 검증할 때는 OrderItemListSerializer에서 모든 항목을 한 번에 검증
+        if self.parent is None:
+            validate_order_item_prices([attrs], self.context['shopper'])
 
         return attrs
 
@@ -155,56 +319,6 @@ class OrderItemWriteSerializer(OrderItemSerializer):
 
         return value
 
-    def __get_actual_coupon_discount_price(self, coupon, product, maximum_discount_price):
-        if coupon.discount_rate is not None:
-            result = product.base_discounted_price * coupon.discount_rate // 100
-            result = min(result, coupon.maximum_discount_price) if coupon.maximum_discount_price is not None else result
-        elif coupon.discount_price is not None:
-            result = coupon.discount_price
-
-        return min(result, maximum_discount_price)
-
-    def __validate_coupon(self, attrs):
-        option = attrs['option']
-        shopper_coupon = attrs.get('shopper_coupon', None)
-        coupon_discount_price = attrs.get('coupon_discount_price', None)
-        if shopper_coupon is None or coupon_discount_price is None:
-            raise ValidationError(f'shopper_coupon and coupon_discount_price of option {option.id} must be requested together.')
-        
-        product = option.product_color.product
-        coupon = shopper_coupon.coupon
-        median_payment_price = (attrs['base_discounted_price'] - attrs['membership_discount_price']) // attrs['count']
-        if (coupon.classification_id == SOME_PRODUCT_COUPON_CLASSIFICATION and not coupon.products.filter(id=product.id).exists()) or \
-            (coupon.classification_id == SUB_CATEGORY_COUPON_CLASSIFICATION and not coupon.sub_categories.filter(id=product.sub_category_id).exists()):
-            # todo 기획전 조건 추가
-            raise ValidationError(f'shopper_coupon {shopper_coupon.id} is not applicable to option {option.id}.')
-        elif product.base_discounted_price < coupon.minimum_product_price:
-            raise ValidationError(f'The price of option {option.id} is lower than the minimum order price of shopper_coupon {shopper_coupon.id}.')
-        elif coupon.maximum_discount_price is not None and coupon_discount_price > coupon.maximum_discount_price:
-            raise ValidationError(f'coupon_discount_price has exceeded the maximum discount price of shopper_coupon {shopper_coupon.id}')
-        elif self.__get_actual_coupon_discount_price(coupon, product, median_payment_price) != coupon_discount_price:
-            raise ValidationError(f'coupon_discount_price of option {option.id} is different from the actual price.')
-
-    def __validate_price(self, attrs):
-        option = attrs['option']
-        product = option.product_color.product
-
-        if attrs['sale_price'] != product.sale_price * attrs['count']:
-            raise ValidationError(f'sale_price of option {option.id} is different from the actual price.')
-        elif attrs['base_discounted_price'] != product.base_discounted_price * attrs['count']:
-            raise ValidationError(f'base_discounted_price of option {option.id} is different from the actual price.')
-        elif attrs['membership_discount_price'] != product.base_discounted_price * self.context['shopper'].membership.discount_rate // 100 * attrs['count']:
-            raise ValidationError(f'membership_discount_price of option {option.id} is different from the actual price.')
-        
-        if 'shopper_coupon' in attrs or 'coupon_discount_price' in attrs:
-            self.__validate_coupon(attrs)
-        
-        if attrs['payment_price'] != attrs['base_discounted_price'] - attrs['membership_discount_price'] - attrs.get('coupon_discount_price', 0):
-            raise ValidationError(f'payment_price of option {option.id} is different from the actual price.')
-
-        attrs['base_discount_price'] = attrs['sale_price'] - attrs['base_discounted_price']
-        attrs.pop('base_discounted_price')
-
     def update(self, instance, validated_data):
         for key, value in validated_data.items():            
             setattr(instance, key, value)
@@ -214,13 +328,76 @@ class OrderItemWriteSerializer(OrderItemSerializer):
         return instance
 
 
+class OrderItemOptionChangeListSerializer(ListSerializer):
+    def validate(self, attrs):
+        if len(attrs) > MAXIMUM_NUMBER_OF_ITEMS:
+            raise ValidationError('exceeded the maximum number({}).'.format(MAXIMUM_NUMBER_OF_ITEMS))
+
+        order_item_ids = get_list_of_single_value(attrs, 'order_item')
+        if has_duplicate_element(order_item_ids):
+            raise ValidationError('order_item is duplicated.')
+
+        order_items = OrderItem.objects.select_for_update().select_related('option__product_color').in_bulk(order_item_ids)
+        product_ids = dict(Option.objects.filter(id__in=get_list_of_single_value(attrs, 'option')).values_list('id', 'product_color__product_id'))
+
+        for data in attrs:
+            order_item = order_items.get(data['order_item'])
+            if order_item is None:
+                raise ValidationError(f'order_item {data["order_item"]} does not exist.')
+            elif order_item.status_id not in BEFORE_DELIVERY_STATUS:
+                raise ValidationError(f'order_item {order_item.id} is in a state where options cannot be changed.')
+            elif data['option'] not in product_ids:
+                raise ValidationError(f'option {data["option"]} does not exist.')
+            elif product_ids[data['option']] != order_item.option.product_color.product_id:
+                raise ValidationError(f'order_item {order_item.id} cannot be changed to an option for another product.')
+
+            data['order_item'] = order_item
+
+        self.__validate_order_contents(attrs)
+
+        return attrs
+
+    # 변경 이후 주문 내용을 미리 계산해 한 주문에 같은 옵션이 중복되는지 확인
+    def __validate_order_contents(self, attrs):
+        new_option_ids = {data['order_item'].id: data['option'] for data in attrs}
+        order_ids = set([data['order_item'].order_id for data in attrs])
+
+        order_contents = defaultdict(list)
+        for order_item_id, order_id, option_id in OrderItem.objects.filter(order_id__in=order_ids).values_list('id', 'order_id', 'option_id'):
+            order_contents[order_id].append(new_option_ids.get(order_item_id, option_id))
+
+        for order_id, option_ids in order_contents.items():
+            if has_duplicate_element(option_ids):
+                raise ValidationError(f'The same option is already included in order {order_id}.')
+
+    def create(self, validated_data):
+        order_items = []
+        for data in validated_data:
+            data['order_item'].option_id = data['option']
+            order_items.append(data['order_item'])
+
+        OrderItem.objects.bulk_update(order_items, ['option'])
+        StatusHistorySerializer().create(order_items)
+        Order.objects.filter(id__in=set([order_item.order_id for order_item in order_items])).update(updated_at=timezone.now())
+
+        return order_items
+
+
+class OrderItemOptionChangeSerializer(Serializer):
+    order_item = IntegerField()
+    option = IntegerField()
+
+    class Meta:
+        list_serializer_class = OrderItemOptionChangeListSerializer
+
+
 class OrderSerializer(ModelSerializer):
     shipping_address = ShippingAddressSerializer()
     items = OrderItemSerializer(many=True)
 
     class Meta:
         model = Order
-        exclude = []
+        exclude = ['updated_at']
         extra_kwargs = {
             'number': {'read_only': True}
         }
@@ -229,14 +406,79 @@ class OrderSerializer(ModelSerializer):
         raise NotExcutableValidationError()
 
 
+# 주문 목록 조회 전용 serializer
+# 응답에 필요한 컬럼만 values()로 조회하고, 대표 이미지는 한 번의 쿼리로 붙임
+class OrderHistorySerializer:
+    __item_fields = {
+        'id': 'id',
+        'count': 'count',
+        'sale_price': 'sale_price',
+        'base_discount_price': 'base_discount_price',
+        'membership_discount_price': 'membership_discount_price',
+        'shopper_coupon': 'shopper_coupon__coupon__name',
+        'coupon_discount_price': 'coupon_discount_price',
+        'used_point': 'used_point',
+        'payment_price': 'payment_price',
+        'earned_point': 'earned_point',
+        'status': 'status__name',
+        'delivery': 'delivery_id',
+    }
+    __option_fields = {
+        'id': 'option_id',
+        'size': 'option__size__name',
+        'display_color_name': 'option__product_color__display_color_name',
+        'product_id': 'option__product_color__product_id',
+        'product_name': 'option__product_color__product__name',
+        'product_code': 'option__product_color__product__code',
+    }
+
+    def __init__(self, instance, item_queryset=None):
+        self.instance = instance
+        self.__item_queryset = OrderItem.objects.all() if item_queryset is None else item_queryset
+
+    def __get_items(self, order_ids):
+        fields = ['order_id'] + list(self.__item_fields.values()) + list(self.__option_fields.values())
+        items = list(self.__item_queryset.filter(order_id__in=order_ids).values(*fields))
+        main_image_urls = get_main_image_urls(get_list_of_single_value(items, 'option__product_color__product_id'))
+
+        result = defaultdict(list)
+        for item in items:
+            result[item['order_id']].append(self.__item_to_representation(item, main_image_urls))
+
+        return result
+
+    def __item_to_representation(self, item, main_image_urls):
+        option = {key: item[field] for key, field in self.__option_fields.items()}
+        option['product_image_url'] = main_image_urls.get(option['product_id'], DEFAULT_IMAGE_URL)
+
+        return {'option': option, **{key: item[field] for key, field in self.__item_fields.items()}}
+
+    def __order_to_representation(self, order, items):
+        return {
+            'id': order.id,
+            'number': order.number,
+            'shopper': order.shopper_id,
+            'shipping_address': model_to_dict(order.shipping_address, exclude=['content_hash']),
+            'created_at': datetime_to_iso(order.created_at),
+            'items': items,
+        }
+
+    @property
+    def data(self):
+        orders = list(self.instance)
+        items = self.__get_items([order.id for order in orders])
+
+        return [self.__order_to_representation(order, items[order.id]) for order in orders]
+
+
 class OrderWriteSerializer(OrderSerializer):
     items = OrderItemWriteSerializer(many=True, allow_empty=False)
-    actual_payment_price = IntegerField(min_value=1000, write_only=True)
+    actual_payment_price = IntegerField(min_value=MINIMUM_ACTUAL_PAYMENT_PRICE, write_only=True)
     used_point = IntegerField(min_value=0, write_only=True)
     earned_point = IntegerField(min_value=0, write_only=True)
     
     class Meta(OrderSerializer.Meta):
-        exclude = ['shopper']
+        exclude = ['shopper', 'updated_at']
 
     def validate(self, attrs):
         if self.instance is not None:
@@ -252,27 +494,22 @@ class OrderWriteSerializer(OrderSerializer):
             raise ValidationError('actual_payment_price is calculated incorrectly.')
         elif attrs['used_point'] > self.context['shopper'].point:
             raise ValidationError('The shopper has less point than used_point.')
-        elif attrs['earned_point'] != attrs['actual_payment_price'] // 100:
+        elif attrs['earned_point'] != get_earned_point(attrs['actual_payment_price']):
             raise ValidationError('earned_point is calculated incorrectly.')
         
-        self.__set_items_including_point_informations(attrs['items'], attrs['used_point'], attrs['earned_point'], total_payment_price)
+        self.__set_items_including_point_informations(attrs['items'], attrs['used_point'], attrs['earned_point'])
 
         attrs.pop('actual_payment_price')
         attrs.pop('earned_point')
 
-    def __set_items_including_point_informations(self, items, used_point, earned_point, total_payment_price):
-        self.__distribute_point(items, 'used_point', used_point, total_payment_price)
-        self.__distribute_point(items, 'earned_point', earned_point, total_payment_price)
+    def __set_items_including_point_informations(self, items, used_point, earned_point):
+        self.__distribute_point(items, 'used_point', used_point)
+        self.__distribute_point(items, 'earned_point', earned_point)
         self.__apply_used_point_to_payment_price(items)
 
-    def __distribute_point(self, items, key, point, total_payment_price):
-        distributed_point = 0
-        for item in items:
-            item[key] = int(item['payment_price'] * point / total_payment_price)
-            distributed_point += item[key]
-        
-        if distributed_point != point:
-            items[0][key] += point - distributed_point
+    def __distribute_point(self, items, key, point):
+        for item, distributed_point in zip(items, distribute_point(get_list_of_single_value(items, 'payment_price'), point)):
+            item[key] = distributed_point
 
     def __apply_used_point_to_payment_price(self, items):
         for item in items:
@@ -306,6 +543,99 @@ class OrderWriteSerializer(OrderSerializer):
         pass
 
 
+class OrderQuoteItemSerializer(Serializer):
+    option = IntegerField()
+    count = IntegerField(min_value=1, max_value=999)
+    shopper_coupon = IntegerField(required=False)
+
+
+# 장바구니/주문서 화면의 가격 조회용
+# 상품, 쿠폰, 쿠폰 적용 대상을 각각 한 번에 조회한 뒤 주문 검증과 같은 규칙으로 계산
+class OrderQuoteSerializer(Serializer):
+    items = OrderQuoteItemSerializer(many=True, allow_empty=False)
+    used_point = IntegerField(min_value=0, default=0)
+
+    def validate(self, attrs):
+        items = attrs['items']
+        option_ids = get_list_of_single_value(items, 'option')
+        shopper_coupon_ids = get_list_of_single_value(items, 'shopper_coupon')
+        if len(items) > MAXIMUM_NUMBER_OF_ITEMS:
+            raise ValidationError('exceeded the maximum number({}).'.format(MAXIMUM_NUMBER_OF_ITEMS))
+        elif has_duplicate_element(option_ids):
+            raise ValidationError('option is duplicated.')
+        elif has_duplicate_element(shopper_coupon_ids):
+            raise ValidationError('shopper_coupon is duplicated.')
+        elif attrs['used_point'] > self.context['shopper'].point:
+            raise ValidationError('The shopper has less point than used_point.')
+
+        options = Option.objects.select_related('product_color__product').in_bulk(option_ids)
+        shopper_coupons = ShopperCoupon.objects.select_related('coupon') \
+            .filter(shopper=self.context['shopper'], is_used=False, end_date__gte=timezone.now().date()).in_bulk(shopper_coupon_ids)
+
+        for item in items:
+            if item['option'] not in options:
+                raise ValidationError(f'option {item["option"]} does not exist.')
+            item['product'] = options[item['option']].product_color.product
+
+            if 'shopper_coupon' in item:
+                if item['shopper_coupon'] not in shopper_coupons:
+                    raise ValidationError(f'shopper_coupon {item["shopper_coupon"]} is expired or have already been used.')
+                item['coupon'] = shopper_coupons[item['shopper_coupon']].coupon
+
+        self.__validate_coupons([item for item in items if 'coupon' in item])
+        self.__validate_price(attrs)
+
+        return attrs
+
+    # 실제 주문 요청에서 거절되는 금액은 견적에서도 거절
+    def __validate_price(self, attrs):
+        self.__prices = calculate_item_prices(attrs['items'], self.context['shopper'].membership.discount_rate)
+        total_payment_price = get_sum_of_single_value(self.__prices, 'payment_price')
+        if attrs['used_point'] > total_payment_price:
+            raise ValidationError('used_point cannot be greater than the total payment price.')
+        elif total_payment_price - attrs['used_point'] < MINIMUM_ACTUAL_PAYMENT_PRICE:
+            raise ValidationError(f'actual_payment_price must be at least {MINIMUM_ACTUAL_PAYMENT_PRICE}.')
+
+    def __validate_coupons(self, items):
+        coupon_targets = get_coupon_targets(get_list_of_single_value(items, 'coupon'), get_list_of_single_value(items, 'product'))
+
+        for item in items:
+            coupon = item['coupon']
+            product = item['product']
+            if not is_coupon_applicable(coupon, product, coupon_targets):
+                raise ValidationError(f'shopper_coupon {item["shopper_coupon"]} is not applicable to option {item["option"]}.')
+            elif product.base_discounted_price < coupon.minimum_product_price:
+                raise ValidationError(f'The price of option {item["option"]} is lower than the minimum order price of shopper_coupon {item["shopper_coupon"]}.')
+
+    def quote(self):
+        items = self.validated_data['items']
+        used_point = self.validated_data['used_point']
+        prices = self.__prices
+
+        total_payment_price = get_sum_of_single_value(prices, 'payment_price')
+        actual_payment_price = total_payment_price - used_point
+        earned_point = get_earned_point(actual_payment_price)
+        payment_prices = get_list_of_single_value(prices, 'payment_price')
+        for price, item_used_point, item_earned_point in zip(prices, distribute_point(payment_prices, used_point), distribute_point(payment_prices, earned_point)):
+            price['used_point'] = item_used_point
+            price['earned_point'] = item_earned_point
+
+        return {
+            'items': [{
+                'option': item['option'],
+                'count': item['count'],
+                'shopper_coupon': item.get('shopper_coupon', None),
+                **price,
+            } for item, price in zip(items, prices)],
+            **{f'total_{key}': get_sum_of_single_value(prices, key) for key in [
+                'sale_price', 'base_discounted_price', 'membership_discount_price', 'coupon_discount_price', 'payment_price'
+            ]},
+            'used_point': used_point,
+            'actual_payment_price': actual_payment_price,
+            'earned_point': earned_point,
+        }
+
+
 class OrderItemStatisticsListSerializer(ListSerializer):
     def to_representation(self, data):
         result = super().to_representation(data)
@@ -327,100 +657,158 @@ class OrderItemStatisticsSerializer(Serializer):
     count = IntegerField(read_only=True)
 
 
+MAXIMUM_SALES_PERIOD_DAYS = 366
+
+
+class SalesQuerySerializer(Serializer):
+    start_date = DateField(input_formats=[REQUEST_DATE_FORMAT])
+    end_date = DateField(input_formats=[REQUEST_DATE_FORMAT])
+
+    def validate(self, attrs):
+        if attrs['start_date'] > attrs['end_date']:
+            raise ValidationError('start_date must be earlier than end_date.')
+        elif (attrs['end_date'] - attrs['start_date']).days >= MAXIMUM_SALES_PERIOD_DAYS:
+            raise ValidationError(f'The period cannot exceed {MAXIMUM_SALES_PERIOD_DAYS} days.')
+
+        return attrs
+
+
+class SalesRollupSerializer(Serializer):
+    status = CharField(read_only=True, source='status__name')
+    count = IntegerField(read_only=True, source='total_count')
+    sale_price = IntegerField(read_only=True, source='total_sale_price')
+    base_discount_price = IntegerField(read_only=True, source='total_base_discount_price')
+    membership_discount_price = IntegerField(read_only=True, source='total_membership_discount_price')
+    coupon_discount_price = IntegerField(read_only=True, source='total_coupon_discount_price')
+    payment_price = IntegerField(read_only=True, source='total_payment_price')
+
+
+class DailySalesRollupSerializer(SalesRollupSerializer):
+    date = DateField(read_only=True)
+
+
+class ProductSalesRollupSerializer(SalesRollupSerializer):
+    product_id = IntegerField(read_only=True)
+    product_name = CharField(read_only=True, source='product__name')
+
+
 class RefundSerializer(ModelSerializer):
     class Meta:
         model = Refund
         fields = '__all__'
 
 
-class OrderItemClaimSerializer(Serializer):
-    order_items = PrimaryKeyRelatedField(queryset=OrderItem.objects.all(), many=True)
+class ClaimSerializer(Serializer):
+    order_items = ListField(child=IntegerField(), max_length=MAXIMUM_NUMBER_OF_ITEMS, allow_empty=False, write_only=True)
 
+    # {현재 상태: 클레임 이후 상태}
+    _transitions = {}
+    _claim_model = None
+    _point_recovery_content = None
 
-# todo test code 작성
-# claim(교환, 반품, 취소) 관련 설계 끝난 이후
-class CancellationInformationSerializer(ModelSerializer):
-    order_items = PrimaryKeyRelatedField(queryset=OrderItem.objects.select_related('order', 'option__product_color__product').all(), many=True, allow_empty=False, write_only=True)
-    refund = RefundSerializer(read_only=True)
+    def validate_order_items(self, value):
+        if has_duplicate_element(value):
+            raise ValidationError('order_item is duplicated.')
 
-    class Meta:
-        model = CancellationInformation
-        fields = '__all__'
-        extra_kwargs = {
-            'order_item': {'read_only': True},
-        }
+        order_items = list(OrderItem.objects.select_for_update().select_related('option__product_color__product').filter(
+            id__in=value, order_id=self.context['order_id'], order__shopper_id=self.context['shopper'].user_id
+        ))
 
-    def validate_order_items(self, value):
-        validation_set = list(set([(order_item.order.shopper_id, order_item.order_id, order_item.status_id) for order_item in value]))
-        if len(validation_set) != 1:
-            raise ValidationError('You can only make a request for one shopper, for one order, and for order items that are all in the same status.')
-        elif validation_set[0][0] != self.context['shopper'].user_id:
-            raise ValidationError('You can only request your own order.')
-        elif validation_set[0][1] != self.context['order_id']:
+        if len(order_items) != len(value):
             raise ValidationError('The order requested and the order items are different.')
-        elif validation_set[0][2] not in self.context['status_id']:
+        elif any([order_item.status_id not in self._transitions for order_item in order_items]):
             raise ValidationError('The order_items cannot be requested.')
 
-        return value
+        order_items = {order_item.id: order_item for order_item in order_items}
 
-    def __recover_point(self, order_items):
-        total_used_point = 0
-        details = []
-        for order_item in order_items:
-            total_used_point += order_item.used_point
-            details.append({
-                'point': order_item.used_point, 
-                'prduct_name': order_item.option.product_color.product.name
-            })
+        return [order_items[order_item_id] for order_item_id in value]
 
-        self.context['shopper'].update_point(total_used_point, '주문 취소로 인한 사용 포인트 복구', details)
+    def _is_refundable(self, order_item):
+        return False
 
-    def __set_refund(self, validated_data, payment_price):
-        refund = self.fields['refund'].create({'price': payment_price})
-        
-        return [{**data, 'refund': refund} for data in validated_data]
+    def _get_claims(self, validated_data, refund):
+        return [
+            self._claim_model(order_item=order_item, refund=refund if self._is_refundable(order_item) else None) 
+            for order_item in validated_data['order_items']
+        ]
+
+    def __create_refund(self, order_items):
+        refund_price = sum([order_item.payment_price for order_item in order_items if self._is_refundable(order_item)])
+        if refund_price == 0:
+            return None
+
+        return Refund.objects.create(price=refund_price)
+
+    def __recover_point(self, order_items):
+        details = [{
+            'point': order_item.used_point, 
+            'product_name': order_item.option.product_color.product.name,
+        } for order_item in order_items if order_item.used_point > 0]
+
+        if self._point_recovery_content is not None and details:
+            self.context['shopper'].update_point(
+                get_sum_of_single_value(details, 'point'), self._point_recovery_content, self.context['order_id'], details
+            )
 
-    # 취소 데이터 생성
     def create(self, validated_data):
         order_items = validated_data['order_items']
+        refund = self.__create_refund(order_items)
+        claims = self._get_claims(validated_data, refund)
 
-        if order_items[0].status_id == 101:
-            update_status_id = 103
-        else:
-            update_status_id = 102
-
-        # total_used_point = 0
-        # order_items_to_recover_point = []
-        # datas_for_creation = []
-        # for order_item in order_items:
-        #     data = {'order_item': order_item}
-        #     if order_item.status_id == 101:
-        #         # todo 환불 (한번에)
-        #         # 쿠폰 재발급
-        #         order_item.status_id = 103
-        #         data['refund'] = self.fields['refund'].create({'price': order_item.payment_price})
-        #     else:
-        #         order_item.status_id = 102
-            
-        #     datas_for_creation.append(data)
+        OrderItemWriteSerializer(many=True).update_status(order_items, self._transitions)
+        self.__recover_point(order_items)
 
-        #     total_used_point += order_item.used_point
-        #     order_items_to_recover_point.append({'point': order_item.used_point, 'product_name': order_item.option.product_color.product.name})
+        return self._claim_model.objects.bulk_create(claims)
 
-        
-        # transaction
-        validated_data = [{'order_item': order_item} for order_item in order_items]
-        if update_status_id == 103:
-            validated_data = self.__set_refund(validated_data)        
 
-        # OrderItemWriteSerializer(many=True).update(order_items, ['status_id'])
-        OrderItemWriteSerializer(many=True).update_status(order_items, update_status_id)
-        self.__recover_point(order_items)
-        # self.context['shopper'].update_point(total_used_point, '주문 취소로 인한 사용 포인트 복구', self.context['order_id'], order_items_to_recover_point)
+class CancellationInformationSerializer(ClaimSerializer):
+    _transitions = {
+        DEPOSIT_WAITING_STATUS: ORDER_CANCELLATION_STATUS,
+        PAYMENT_COMPLETION_STATUS: PAYMENT_CANCELLATION_STATUS,
+    }
+    _claim_model = CancellationInformation
+    _point_recovery_content = '주문 취소로 인한 사용 포인트 복구'
 
-        model = self.Meta.model
-        # return model.objects.bulk_create([model(**data) for data in datas_for_creation])     
-        return model.objects.bulk_create([model(**data) for data in validated_data])
+    def _is_refundable(self, order_item):
+        return order_item.status_id == PAYMENT_COMPLETION_STATUS
+
+
+class ReturnInformationSerializer(ClaimSerializer):
+    _transitions = {DELIVERY_COMPLETION_STATUS: RETURN_REQUEST_STATUS}
+    _claim_model = ReturnInformation
+    _point_recovery_content = '반품으로 인한 사용 포인트 복구'
+
+    def _is_refundable(self, order_item):
+        return True
+
+
+class ExchangeInformationSerializer(ClaimSerializer):
+    options = ListField(child=IntegerField(), max_length=MAXIMUM_NUMBER_OF_ITEMS, allow_empty=False, write_only=True)
+
+    _transitions = {DELIVERY_COMPLETION_STATUS: EXCHANGE_REQUEST_STATUS}
+    _claim_model = ExchangeInformation
+
+    def validate(self, attrs):
+        order_items = attrs['order_items']
+        option_ids = attrs['options']
+        if len(order_items) != len(option_ids):
+            raise ValidationError('order_items and options must have the same length.')
+
+        product_ids = dict(Option.objects.filter(id__in=option_ids).values_list('id', 'product_color__product_id'))
+        for order_item, option_id in zip(order_items, option_ids):
+            if option_id == order_item.option_id or product_ids.get(option_id) != order_item.option.product_color.product_id:
+                raise ValidationError(f'option {option_id} cannot be exchanged for order_item {order_item.id}.')
+
+        return attrs
+
+    def _get_claims(self, validated_data, refund):
+        order_items = validated_data['order_items']
+        new_order_items = OrderItemWriteSerializer(many=True).create_for_exchange(order_items, validated_data['options'])
+
+        return [
+            ExchangeInformation(order_item=order_item, new_order_item=new_order_item)
+            for order_item, new_order_item in zip(order_items, new_order_items)
+        ]
 
 
 class StatusHistorySerializer(ModelSerializer):
@@ -435,6 +823,72 @@ class StatusHistorySerializer(ModelSerializer):
         return model.objects.bulk_create([model(order_item=order_item, status_id=order_item.status_id) for order_item in order_items])
 
 
+# 압축 보관된 이력과 status_history 테이블의 이력을 합쳐 주문 항목별로 id 순서로 반환
+def get_status_histories(order_item_ids):
+    status_histories = defaultdict(list)
+    archives = StatusHistoryArchive.objects.filter(order_item_id__in=order_item_ids)
+    statuses = None
+    for archive in archives:
+        statuses = statuses or Status.objects.in_bulk()
+        status_histories[archive.order_item_id] += [
+            StatusHistory(id=history_id, order_item_id=archive.order_item_id, status=statuses[status_id], created_at=datetime.fromisoformat(created_at))
+            for history_id, status_id, created_at in archive.histories
+        ]
+
+    queryset = StatusHistory.objects.select_related('status').filter(order_item_id__in=order_item_ids).order_by('order_item_id', 'id')
+    for status_history in queryset:
+        status_histories[status_history.order_item_id].append(status_history)
+
+    return status_histories
+
+
+class StatusHistoryTimelineSerializer(Serializer):
+    order_item = IntegerField()
+    status_histories = StatusHistorySerializer(many=True)
+
+
+def get_status_history_timelines(order_item_ids):
+    status_histories = get_status_histories(order_item_ids)
+
+    return StatusHistoryTimelineSerializer([
+        {'order_item': order_item_id, 'status_histories': status_histories[order_item_id]} for order_item_id in order_item_ids
+    ], many=True).data
+
+
+def confirm_order_items(order_item_ids, skip_locked=False):
+    existing_ids = set(OrderItem.objects.filter(id__in=order_item_ids).values_list('id', flat=True))
+    # 요청 가능 여부는 잠근 시점의 상태로 판단하여, 조회 후 상태가 변경된 항목이 잠긴 항목으로 분류되지 않도록 함
+    order_items = list(OrderItem.objects.select_for_update(skip_locked=skip_locked) \
+        .filter(id__in=order_item_ids).only('id', 'order_id', 'status_id'))
+    requestable_order_items = [order_item for order_item in order_items if order_item.status_id == PAYMENT_COMPLETION_STATUS]
+
+    if requestable_order_items:
+        OrderItemWriteSerializer(many=True).update_status(requestable_order_items, DELIVERY_PREPARING_STATUS)
+
+    locked_ids = set(order_item.id for order_item in order_items)
+
+    return {
+        'success': sorted([order_item.id for order_item in requestable_order_items]),
+        'nonexistence': sorted(set(order_item_ids).difference(existing_ids, locked_ids)),
+        'not_requestable_status': sorted(set(locked_ids).difference(order_item.id for order_item in requestable_order_items)),
+        # skip_locked인 경우 다른 트랜잭션이 잠근 항목
+        'locked': sorted(existing_ids.difference(locked_ids)),
+    }
+
+
+def confirm_order_items_in_chunks(order_item_ids, chunk_size, result=None):
+    result = result or {'success': [], 'nonexistence': [], 'not_requestable_status': [], 'locked': []}
+
+    for i in range(0, len(order_item_ids), chunk_size):
+        with atomic():
+            chunk_result = confirm_order_items(order_item_ids[i:i + chunk_size], True)
+
+        for key, value in chunk_result.items():
+            result[key] += value
+
+        yield min(i + chunk_size, len(order_item_ids)), result
+
+
 class OrderConfirmSerializer(Serializer):
     order_items = ListField(child=IntegerField(), max_length=100, allow_empty=False)
 
@@ -442,25 +896,33 @@ class OrderConfirmSerializer(Serializer):
         if has_duplicate_element(value):
             raise ValidationError('order_item is duplicated.')
 
-        requested_order_items = OrderItem.objects.select_for_update().filter(id__in=value)
-        requested_order_items_id = requested_order_items.values_list('id', flat=True)
+        return value
 
-        self.__nonexistence = sorted(set(value).difference(requested_order_items_id))
-        self.__not_requestable_status = list(requested_order_items_id.exclude(status_id=PAYMENT_COMPLETION_STATUS))
+    def create(self, validated_data):
+        result = confirm_order_items(validated_data['order_items'])
+        # 조회 후 잠그기 전에 삭제된 항목은 요청 불가 상태로 반환
+        result['not_requestable_status'] = sorted(result['not_requestable_status'] + result.pop('locked'))
 
-        return requested_order_items.filter(status_id=PAYMENT_COMPLETION_STATUS)
+        return result
 
-    def create(self, validated_data):
-        order_items = validated_data['order_items']
 
-        success = list(order_items.values_list('id', flat=True))
-        OrderItemWriteSerializer(many=True).update_status(order_items, DELIVERY_PREPARING_STATUS)
+class OrderConfirmJobSerializer(ModelSerializer):
+    order_items = ListField(child=IntegerField(), allow_empty=False, write_only=True)
+    total_count = SerializerMethodField()
 
-        return {
-            'success': success,
-            'nonexistence': self.__nonexistence,
-            'not_requestable_status': self.__not_requestable_status,
-        }
+    class Meta:
+        model = OrderConfirmJob
+        exclude = ['claimed_at']
+        read_only_fields = ['processed_count', 'result', 'finished_at']
+
+    def get_total_count(self, obj):
+        return len(obj.order_items)
+
+    def validate_order_items(self, value):
+        if has_duplicate_element(value):
+            raise ValidationError('order_item is duplicated.')
+
+        return value
 
 
 # 요청 데이터 안에서의 중복은 아무것도 처리하지 않고 에러 반환
@@ -483,39 +945,87 @@ class DeliveryListSerializer(ListSerializer):
         elif key == 'is_valid_invoice':
             self.__existed_invoice = result
 
+    def __set_order_items(self, attrs):
+        requested_order_items = OrderItem.objects.select_for_update().filter(
+            id__in=chain.from_iterable(get_list_of_single_value(attrs, 'order_items')), 
+            status_id=DELIVERY_PREPARING_STATUS, 
+            delivery_id=None,
+        )
+
+        order_items = {}
+        for order_item in requested_order_items:
+            order_items.setdefault(order_item.order_id, {})[order_item.id] = order_item
+
+        for data in attrs:
+            items_of_order = order_items.get(data['order'], {})
+            if all(order_item_id in items_of_order for order_item_id in data['order_items']):
+                data['order_items'] = [items_of_order[order_item_id] for order_item_id in sorted(data['order_items'])]
+            else:
+                data['order_items'] = None
+
+    def __set_invoice_validity(self, attrs):
+        existed_invoices = set(Delivery.objects.select_for_update().filter(
+            invoice_number__in=get_list_of_single_value(attrs, 'invoice_number'), 
+            created_at__gte=timezone.now() - relativedelta(months=3),
+        ).values_list('company', 'invoice_number'))
+
+        for data in attrs:
+            if (data['company'], data['invoice_number']) in existed_invoices:
+                data['is_valid_invoice'] = None
+
     def __validate_orders_and_items(self, attrs):
         if has_duplicate_element(get_list_of_single_value(attrs, 'order')):
             raise ValidationError('order is duplicated.')
 
+        self.__set_order_items(attrs)
         self.__set_failure_result(attrs, 'order_items')
 
     def __validate_company_and_invoice_number(self, attrs):
         if has_duplicate_element(get_list_of_multi_values(attrs, 'company', 'invoice_number')):
             raise ValidationError('invoice_number is duplicated.')
 
+        self.__set_invoice_validity(attrs)
         self.__set_failure_result(attrs, 'is_valid_invoice')
 
-    def create(self, validated_data):
+    def __create_deliveries(self, validated_data):
         flag = timezone.now().strftime(DATETIME_WITHOUT_MILISECONDS_FORMAT) + ''.join(random.choices(string.ascii_letters + string.digits, k=random.randint(5, 10)))
         model = self.child.Meta.model
-        model.objects.bulk_create([model(company=data['company'], invoice_number=data['invoice_number'], flag=flag) for data in validated_data])
-        deliveries = model.objects.filter(flag=flag)
-
-        order_items = []
-        for delivery in deliveries:
-            data = next((data for data in validated_data if data['company'] == delivery.company and data['invoice_number'] == delivery.invoice_number), False)
-            for order_item in data['order_items']:
-                order_item.delivery = delivery
-                order_items.append(order_item)
+        deliveries = model.objects.bulk_create([
+            model(company=data['company'], invoice_number=data['invoice_number'], shipping_fee=data.get('shipping_fee', 0), flag=flag) 
+            for data in validated_data
+        ])
 
-        OrderItem.objects.bulk_update(order_items, ['delivery'])
-        OrderItemWriteSerializer(many=True).update_status(order_items, DELIVERY_PROGRESSING_STATUS)
+        if connection.features.can_return_rows_from_bulk_insert:
+            return {(delivery.company, delivery.invoice_number): delivery.id for delivery in deliveries}
 
+        # MySQL은 bulk insert 결과로 pk를 반환하지 않으므로 flag로 한번에 조회
         return {
+            (company, invoice_number): delivery_id 
+            for delivery_id, company, invoice_number in model.objects.filter(flag=flag).values_list('id', 'company', 'invoice_number')
+        }
+
+    def create(self, validated_data):
+        result = {
             'success': [data['order'] for data in validated_data],
             'invalid_orders': self.__invalid_orders,
             'existed_invoice': self.__existed_invoice,
         }
+        if not validated_data:
+            return result
+
+        delivery_ids = self.__create_deliveries(validated_data)
+        delivery_ids_of_orders = {data['order']: delivery_ids[(data['company'], data['invoice_number'])] for data in validated_data}
+        order_items = list(chain.from_iterable(get_list_of_single_value(validated_data, 'order_items')))
+
+        OrderItem.objects.filter(id__in=[order_item.id for order_item in order_items]).update(delivery_id=Case(
+            *[When(order_id=order_id, then=Value(delivery_id)) for order_id, delivery_id in delivery_ids_of_orders.items()]
+        ))
+        for order_item in order_items:
+            order_item.delivery_id = delivery_ids_of_orders[order_item.order_id]
+
+        OrderItemWriteSerializer(many=True).update_status(order_items, DELIVERY_PROGRESSING_STATUS)
+
+        return result
 
 
 class DeliverySerializer(ModelSerializer):
@@ -528,6 +1038,13 @@ class DeliverySerializer(ModelSerializer):
         list_serializer_class = DeliveryListSerializer
 
     def validate(self, attrs):
+        if has_duplicate_element(attrs['order_items']):
+            raise ValidationError(f'order_item of order {attrs["order"]} is duplicated.')
+
+        # 목록으로 요청된 경우 DeliveryListSerializer에서 한번에 검증
+        if isinstance(self.parent, DeliveryListSerializer):
+            return attrs
+
         self.__validate_order_and_items(attrs)
         self.__validate_company_and_invoice_number(attrs)
 
@@ -536,8 +1053,6 @@ class DeliverySerializer(ModelSerializer):
     def __validate_order_and_items(self, attrs):
         order = attrs['order']
         order_items = attrs['order_items']
-        if has_duplicate_element(order_items):
-            raise ValidationError(f'order_item of order {order} is duplicated.')
 
         requested_order_items = OrderItem.objects.select_for_update() \
             .filter(id__in=order_items, order_id=order, status_id=DELIVERY_PREPARING_STATUS, delivery_id=None)
@@ -3,8 +3,8 @@ from factory.django import DjangoModelFactory
 from factory.faker import Faker
 from factory.fuzzy import FuzzyText, FuzzyInteger
 
+from common.pricing import get_coupon_discount_price
 from product.test.factories import create_options
-from ..serializers import OrderItemWriteSerializer
 
 
 def create_orders_with_items(order_size=1, item_size=3, only_product_color=False, order_kwargs={}, item_kwargs={}):
@@ -50,9 +50,7 @@ class OrderItemFactory(DjangoModelFactory):
 
         median_payment_price = (self.base_discount_price - self.membership_discount_price) // self.count
 
-        return OrderItemWriteSerializer()._OrderItemWriteSerializer__get_actual_coupon_discount_price(
-            self.shopper_coupon.coupon, self.option.product_color.product, median_payment_price
-        )
+        return get_coupon_discount_price(self.shopper_coupon.coupon, self.option.product_color.product, median_payment_price)
 
 
 class StatusFactory(DjangoModelFactory):
@@ -0,0 +1,166 @@
+from io import StringIO
+from datetime import timedelta
+
+from django.core.management import call_command
+from django.forms import model_to_dict
+from django.test import TestCase
+from django.utils import timezone
+
+from user.test.factories import ShopperFactory
+from .factories import OrderItemFactory, StatusFactory, StatusHistoryFactory, ShippingAddressFactory
+from ..models import (
+    PAYMENT_COMPLETION_STATUS, DELIVERY_PREPARING_STATUS, DELIVERY_COMPLETION_STATUS, PURCHASE_CONFIRMATION_STATUS, get_shipping_address_hash,
+    OrderItem, OrderItemStatistics, StatusHistory, StatusHistoryArchive, OrderConfirmJob, ShippingAddress, WholesalerSalesRollup, ProductSalesRollup
+)
+from ..management.commands.confirm_order_items import JOB_CLAIM_TIMEOUT
+
+
+class RebuildOrderItemStatisticsTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.__status = StatusFactory()
+        cls.__shoppers = ShopperFactory.create_batch(3)
+        for i, shopper in enumerate(cls.__shoppers):
+            OrderItemFactory.create_batch(i + 1, order__shopper=shopper, status=cls.__status)
+
+    def test_rebuild(self):
+        call_command('rebuild_order_item_statistics', chunk_size=2, stdout=StringIO())
+
+        self.assertDictEqual(
+            dict(OrderItemStatistics.objects.filter(status=self.__status).values_list('shopper_id', 'count')),
+            {shopper.id: i + 1 for i, shopper in enumerate(self.__shoppers)}
+        )
+
+
+class ConfirmOrderItemsTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        StatusFactory(id=DELIVERY_PREPARING_STATUS)
+        cls.__order_items = OrderItemFactory.create_batch(5, status=StatusFactory(id=PAYMENT_COMPLETION_STATUS))
+        cls.__order_item_ids = [order_item.id for order_item in cls.__order_items]
+
+    def __assert_confirmed(self, job):
+        self.assertIsNotNone(job.finished_at)
+        self.assertEqual(job.processed_count, len(job.order_items))
+        self.assertDictEqual(job.result, {
+            'success': self.__order_item_ids,
+            'nonexistence': [-1],
+            'not_requestable_status': [],
+            'locked': [],
+        })
+        self.assertFalse(OrderItem.objects.exclude(status_id=DELIVERY_PREPARING_STATUS).exists())
+
+    def test_confirm_order_items(self):
+        stdout = StringIO()
+        call_command('confirm_order_items', *self.__order_item_ids, -1, chunk_size=2, stdout=stdout)
+
+        self.__assert_confirmed(OrderConfirmJob.objects.get())
+        self.assertIn('6/6 order items processed.', stdout.getvalue())
+
+    def test_run_unfinished_jobs(self):
+        job = OrderConfirmJob.objects.create(order_items=self.__order_item_ids + [-1])
+        call_command('confirm_order_items', chunk_size=2, stdout=StringIO())
+        job.refresh_from_db()
+
+        self.__assert_confirmed(job)
+
+    def test_resume_job(self):
+        job = OrderConfirmJob.objects.create(
+            order_items=self.__order_item_ids + [-1], 
+            processed_count=2,
+            result={'success': self.__order_item_ids[:2], 'nonexistence': [], 'not_requestable_status': [], 'locked': []},
+        )
+        OrderItem.objects.filter(id__in=self.__order_item_ids[:2]).update(status_id=DELIVERY_PREPARING_STATUS)
+        call_command('confirm_order_items', chunk_size=2, stdout=StringIO())
+        job.refresh_from_db()
+
+        self.__assert_confirmed(job)
+
+    def test_skip_job_claimed_by_another_run(self):
+        job = OrderConfirmJob.objects.create(order_items=self.__order_item_ids + [-1], claimed_at=timezone.now())
+        call_command('confirm_order_items', chunk_size=2, stdout=StringIO())
+        job.refresh_from_db()
+
+        self.assertIsNone(job.finished_at)
+        self.assertEqual(job.processed_count, 0)
+        self.assertFalse(OrderItem.objects.filter(status_id=DELIVERY_PREPARING_STATUS).exists())
+
+    def test_take_over_abandoned_job(self):
+        job = OrderConfirmJob.objects.create(
+            order_items=self.__order_item_ids + [-1], claimed_at=timezone.now() - JOB_CLAIM_TIMEOUT - timedelta(seconds=1)
+        )
+        call_command('confirm_order_items', chunk_size=2, stdout=StringIO())
+        job.refresh_from_db()
+
+        self.__assert_confirmed(job)
+
+
+class FillShippingAddressHashesTestCase(TestCase):
+    def test_fill(self):
+        shipping_addresses = ShippingAddressFactory.create_batch(3)
+        ShippingAddress.objects.update(content_hash=None)
+        duplicated_shipping_address = ShippingAddress.objects.bulk_create([
+            ShippingAddress(**model_to_dict(shipping_addresses[0], exclude=['id', 'content_hash']))
+        ])[0]
+        call_command('fill_shipping_address_hashes', chunk_size=2, stdout=StringIO())
+
+        self.assertDictEqual(
+            dict(ShippingAddress.objects.values_list('id', 'content_hash')),
+            {
+                **{
+                    shipping_address.id: get_shipping_address_hash(model_to_dict(shipping_address))
+                    for shipping_address in shipping_addresses
+                },
+                duplicated_shipping_address.id: None,
+            }
+        )
+
+
+class RebuildSalesRollupsTestCase(TestCase):
+    def test_rebuild(self):
+        status = StatusFactory()
+        order_items = [OrderItemFactory(status=status) for _ in range(3)]
+        call_command('rebuild_sales_rollups', chunk_size=2, stdout=StringIO())
+
+        for model in [WholesalerSalesRollup, ProductSalesRollup]:
+            self.assertDictEqual(
+                dict(model.objects.values_list('wholesaler_id', 'payment_price')),
+                {order_item.option.product_color.product.wholesaler_id: order_item.payment_price for order_item in order_items}
+            )
+
+
+class CompactStatusHistoriesTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.__old_order_items = [
+            OrderItemFactory(status=StatusFactory(id=DELIVERY_COMPLETION_STATUS)),
+            OrderItemFactory(status=StatusFactory(id=PURCHASE_CONFIRMATION_STATUS)),
+        ]
+        cls.__recent_order_item = OrderItemFactory(status_id=DELIVERY_COMPLETION_STATUS)
+        cls.__paid_order_item = OrderItemFactory(status=StatusFactory(id=PAYMENT_COMPLETION_STATUS))
+
+        for order_item in cls.__old_order_items + [cls.__recent_order_item, cls.__paid_order_item]:
+            StatusHistoryFactory.create_batch(2, order_item=order_item)
+        StatusHistory.objects.exclude(order_item=cls.__recent_order_item).update(created_at=timezone.now() - timedelta(days=31))
+
+    def __get_histories(self, order_item):
+        return [
+            [status_history.id, status_history.status_id, status_history.created_at.isoformat()]
+            for status_history in StatusHistory.objects.filter(order_item=order_item).order_by('id')
+        ]
+
+    def test_compact(self):
+        StatusHistoryArchive.objects.create(order_item=self.__old_order_items[0], histories=[[0, PAYMENT_COMPLETION_STATUS, timezone.now().isoformat()]])
+        expected_archives = {
+            order_item.id: StatusHistoryArchive.objects.filter(order_item=order_item).values_list('histories', flat=True).first() or []
+            for order_item in self.__old_order_items
+        }
+        for order_item in self.__old_order_items:
+            expected_archives[order_item.id] += self.__get_histories(order_item)
+
+        call_command('compact_status_histories', chunk_size=1, days=30, stdout=StringIO())
+
+        self.assertDictEqual(dict(StatusHistoryArchive.objects.values_list('order_item_id', 'histories')), expected_archives)
+        self.assertSetEqual(
+            set(StatusHistory.objects.values_list('order_item_id', flat=True)), set([self.__recent_order_item.id, self.__paid_order_item.id])
+        )
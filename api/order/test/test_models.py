@@ -1,4 +1,7 @@
+from datetime import date, datetime
+
 from django.forms import model_to_dict
+from django.test import TestCase
 from django.utils import timezone
 
 from freezegun import freeze_time
@@ -9,8 +12,9 @@ from user.test.factories import ShopperFactory
 from product.test.factories import OptionFactory
 from .factories import OrderFactory, OrderItemFactory, RefundFactory, StatusFactory, ShippingAddressFactory
 from ..models import (
-    Order, OrderItem, Status, StatusHistory, ShippingAddress,
-    CancellationInformation, ExchangeInformation, ReturnInformation, Refund, Delivery
+    get_shipping_address_hash, Order, OrderItem, Status, StatusHistory, ShippingAddress,
+    CancellationInformation, ExchangeInformation, ReturnInformation, Refund, Delivery, OrderItemStatistics,
+    SALES_ROLLUP_VALUE_FIELDS, ProductSalesRollup, WholesalerSalesRollup,
 )
 
 
@@ -35,6 +39,7 @@ class OrderTestCase(ModelTestCase):
             'shipping_address': self._test_data['shipping_address'].id,
             'number': order['number'],
             'created_at': timezone.now(),
+            'updated_at': timezone.now(),
         })
 
     def test_set_default_number(self):
@@ -45,6 +50,35 @@ class OrderTestCase(ModelTestCase):
         self.assertTrue(new_order.number.startswith(new_order.created_at.strftime(DEFAULT_DATETIME_FORMAT)))
 
 
+class OrderQuerySetTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.__statuses = StatusFactory.create_batch(2)
+        cls.__order = OrderFactory(created_at=datetime(2022, 7, 1, 23, 59, 59, 999999))
+        OrderItemFactory.create_batch(2, order=cls.__order, status=cls.__statuses[0])
+        OrderFactory(shopper=cls.__order.shopper, created_at=datetime(2022, 7, 2))
+
+    def __get_queryset(self):
+        return Order.objects.filter(shopper_id=self.__order.shopper_id)
+
+    def test_filter_by_item_status(self):
+        self.assertQuerysetEqual(self.__get_queryset().filter_by_item_status(self.__statuses[0].id), [self.__order])
+        self.assertFalse(self.__get_queryset().filter_by_item_status(self.__statuses[1].id).exists())
+
+    def test_filter_by_created_date(self):
+        self.assertQuerysetEqual(self.__get_queryset().filter_by_created_date(date(2022, 6, 30), date(2022, 7, 1)), [self.__order])
+
+    def test_filter_by_item_status_explain(self):
+        queryset = self.__get_queryset().filter_by_item_status(self.__statuses[0].id)
+
+        self.assertIn('order_item_order_status_idx', queryset.explain())
+
+    def test_filter_by_created_date_explain(self):
+        queryset = self.__get_queryset().filter_by_created_date(date(2022, 6, 30), date(2022, 7, 1))
+
+        self.assertIn('order_shopper_created_at_idx', queryset.explain())
+
+
 class OrderItemTestCase(ModelTestCase):
     _model_class = OrderItem
 
@@ -74,6 +108,7 @@ class OrderItemTestCase(ModelTestCase):
             'coupon_discount_price': 0,
             'used_point': 0,
             'delivery': None,
+            'is_replacement': False,
         })
 
 
@@ -128,7 +163,10 @@ class ShippingAddressTestCase(ModelTestCase):
     def test_create(self):
         shipping_address = model_to_dict(self._get_model_after_creation(), exclude=['id'])
 
-        self.assertDictEqual(shipping_address, self._test_data)
+        self.assertDictEqual(shipping_address, {
+            **self._test_data,
+            'content_hash': get_shipping_address_hash(self._test_data),
+        })
 
 
 class CancellationInformationTestCase(ModelTestCase):
@@ -192,3 +230,107 @@ class DeliveryTestCase(ModelTestCase):
             'shipping_fee': 0,
             'flag': self._test_data['flag'],
         })
+
+
+class OrderItemStatisticsTestCase(ModelTestCase):
+    _model_class = OrderItemStatistics
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.__shopper = ShopperFactory()
+        cls.__statuses = StatusFactory.create_batch(2)
+        cls._test_data = {
+            'shopper': cls.__shopper,
+            'status': cls.__statuses[0],
+        }
+
+    def __get_counts(self):
+        return dict(OrderItemStatistics.objects.filter(shopper=self.__shopper).values_list('status_id', 'count'))
+
+    def test_create(self):
+        statistics = model_to_dict(self._get_model_after_creation(), exclude=['id'])
+
+        self.assertDictEqual(statistics, {
+            'shopper': self.__shopper.id,
+            'status': self.__statuses[0].id,
+            'count': 0,
+        })
+
+    def test_apply_counts(self):
+        self._get_model_after_creation()
+        OrderItemStatistics.objects.apply_counts({
+            (self.__shopper.id, self.__statuses[0].id): 3,
+            (self.__shopper.id, self.__statuses[1].id): 2,
+        })
+        OrderItemStatistics.objects.apply_counts({
+            (self.__shopper.id, self.__statuses[0].id): -1,
+            (self.__shopper.id, self.__statuses[1].id): 1,
+        })
+
+        self.assertDictEqual(self.__get_counts(), {self.__statuses[0].id: 2, self.__statuses[1].id: 3})
+
+    def test_rebuild(self):
+        order = OrderFactory(shopper=self.__shopper)
+        OrderItemFactory.create_batch(2, order=order, status=self.__statuses[0])
+        OrderItemFactory(order=order, status=self.__statuses[1])
+        OrderItemStatistics.objects.create(shopper=self.__shopper, status=self.__statuses[0], count=10)
+        OrderItemStatistics.objects.rebuild([self.__shopper.id])
+
+        self.assertDictEqual(self.__get_counts(), {self.__statuses[0].id: 2, self.__statuses[1].id: 1})
+
+
+class ProductSalesRollupTestCase(ModelTestCase):
+    _model_class = ProductSalesRollup
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.__option = OptionFactory()
+        cls.__product = cls.__option.product_color.product
+        cls.__statuses = StatusFactory.create_batch(2)
+        cls._test_data = {
+            'date': date(2022, 1, 1),
+            'wholesaler': cls.__product.wholesaler,
+            'product': cls.__product,
+            'status': cls.__statuses[0],
+        }
+
+    def __get_values(self, model, field):
+        return dict(model.objects.filter(wholesaler=self.__product.wholesaler).values_list('status_id', field))
+
+    def test_create(self):
+        rollup = model_to_dict(self._get_model_after_creation(), exclude=['id'])
+
+        self.assertDictEqual(rollup, {
+            'date': self._test_data['date'],
+            'wholesaler': self.__product.wholesaler.id,
+            'product': self.__product.id,
+            'status': self.__statuses[0].id,
+            **{field: 0 for field in SALES_ROLLUP_VALUE_FIELDS},
+        })
+
+    def test_apply_deltas(self):
+        key = (self._test_data['date'], self.__product.wholesaler.id, self.__product.id)
+        ProductSalesRollup.objects.apply_deltas({
+            (*key, self.__statuses[0].id): {field: 3 for field in SALES_ROLLUP_VALUE_FIELDS},
+            (*key, self.__statuses[1].id): {field: 2 for field in SALES_ROLLUP_VALUE_FIELDS},
+        })
+        ProductSalesRollup.objects.apply_deltas({
+            (*key, self.__statuses[0].id): {field: -1 for field in SALES_ROLLUP_VALUE_FIELDS},
+            (*key, self.__statuses[1].id): {field: 1 for field in SALES_ROLLUP_VALUE_FIELDS},
+        })
+
+        for field in SALES_ROLLUP_VALUE_FIELDS:
+            self.assertDictEqual(self.__get_values(ProductSalesRollup, field), {self.__statuses[0].id: 2, self.__statuses[1].id: 3})
+
+    def test_rebuild(self):
+        order_items = OrderItemFactory.create_batch(2, option=self.__option, status=self.__statuses[0])
+        self._get_model_after_creation()
+        wholesaler_ids = [self.__product.wholesaler.id]
+        WholesalerSalesRollup.objects.rebuild(wholesaler_ids)
+        ProductSalesRollup.objects.rebuild(wholesaler_ids)
+
+        for model in [WholesalerSalesRollup, ProductSalesRollup]:
+            self.assertDictEqual(self.__get_values(model, 'payment_price'), {
+                self.__statuses[0].id: sum([order_item.payment_price for order_item in order_items]),
+            })
+            self.assertEqual(model.objects.get(wholesaler=self.__product.wholesaler).date, date.today())
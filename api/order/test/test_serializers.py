@@ -3,36 +3,43 @@ from random import randint
 from copy import deepcopy
 from dateutil.relativedelta import relativedelta
 
+from django.core.cache import cache
 from django.utils import timezone
 from django.forms import model_to_dict
+from django.db import connection
 from django.db.utils import DatabaseError
-from django.db.models import Q
-from django.db.models.query import Prefetch
+from django.db.models import Q, Sum
+from django.db.models.query import QuerySet, Prefetch
 
 from freezegun import freeze_time
 
 from common.test.test_cases import SerializerTestCase, ListSerializerTestCase, FREEZE_TIME
-from common.serializers import get_list_of_single_value, get_sum_of_single_value, add_data_in_each_element
+from common.serializers import MAXIMUM_NUMBER_OF_ITEMS, get_list_of_single_value, get_sum_of_single_value, add_data_in_each_element
 from common.utils import DEFAULT_DATETIME_FORMAT, DATETIME_WITHOUT_MILISECONDS_FORMAT, datetime_to_iso
-from user.models import Shopper
+from common.outbox import process_outbox_events
+from common.pricing import calculate_item_prices, get_coupon_discount_price
+from user.models import Shopper, ShopperCoupon
 from user.test.factories import ShopperFactory, ShopperCouponFactory
 from product.models import ProductImage
 from product.serializers import OptionInOrderItemSerializer
-from product.test.factories import ProductFactory, OptionFactory, create_options
-from coupon.models import ALL_PRODUCT_COUPON_CLASSIFICATIONS, SOME_PRODUCT_COUPON_CLASSIFICATION, SUB_CATEGORY_COUPON_CLASSIFICATION
+from product.test.factories import ProductFactory, OptionFactory, ProductImageFactory, create_options
+from coupon.models import ALL_PRODUCT_COUPON_CLASSIFICATIONS, SOME_PRODUCT_COUPON_CLASSIFICATION, SUB_CATEGORY_COUPON_CLASSIFICATION, Coupon
 from coupon.test.factories import CouponClassificationFactory, CouponFactory
 from .factories import (
     create_orders_with_items, ShippingAddressFactory, OrderFactory, OrderItemFactory, 
     StatusFactory, StatusHistoryFactory, DeliveryFactory,
 )
 from ..models import (
-    PAYMENT_COMPLETION_STATUS, DELIVERY_PREPARING_STATUS, DELIVERY_PROGRESSING_STATUS, NORMAL_STATUS,
-    Order, OrderItem, ShippingAddress, StatusHistory, Delivery
+    DEPOSIT_WAITING_STATUS, PAYMENT_COMPLETION_STATUS, DELIVERY_PREPARING_STATUS, DELIVERY_PROGRESSING_STATUS, DELIVERY_COMPLETION_STATUS, 
+    ORDER_CANCELLATION_STATUS, PAYMENT_CANCELLATION_STATUS, EXCHANGE_REQUEST_STATUS, RETURN_REQUEST_STATUS, NORMAL_STATUS,
+    Order, OrderItem, ShippingAddress, StatusHistory, Delivery, OrderItemStatistics, Refund, WholesalerSalesRollup, ProductSalesRollup,
+    ExchangeInformation,
 )
 from ..serializers import (
-    ShippingAddressSerializer, OrderItemSerializer, OrderItemWriteSerializer, OrderSerializer, OrderWriteSerializer, 
-    OrderItemStatisticsSerializer, RefundSerializer, CancellationInformationSerializer, StatusHistorySerializer, 
-    OrderConfirmSerializer, DeliverySerializer,
+    ShippingAddressSerializer, OrderItemSerializer, OrderItemWriteSerializer, OrderSerializer, OrderHistorySerializer, OrderWriteSerializer, 
+    OrderItemStatisticsSerializer, RefundSerializer, CancellationInformationSerializer, ExchangeInformationSerializer, ReturnInformationSerializer, 
+    StatusHistorySerializer, OrderItemOptionChangeSerializer, OrderConfirmSerializer, DeliverySerializer, OrderQuoteSerializer,
+    RECENT_SHIPPING_ADDRESSES_CACHE_KEY, MINIMUM_ACTUAL_PAYMENT_PRICE, confirm_order_items, get_coupon_targets, confirm_order_items_in_chunks,
 )
 
 
@@ -74,9 +81,7 @@ def get_order_item_test_data(option, shopper, shopper_coupon=None):
 
     if shopper_coupon is not None:
         test_data['shopper_coupon'] = shopper_coupon.id
-        test_data['coupon_discount_price'] = OrderItemWriteSerializer()._OrderItemWriteSerializer__get_actual_coupon_discount_price(
-            shopper_coupon.coupon, product, test_data['payment_price'] // count
-        )
+        test_data['coupon_discount_price'] = get_coupon_discount_price(shopper_coupon.coupon, product, test_data['payment_price'] // count)
         test_data['payment_price'] -= test_data['coupon_discount_price']
 
     return test_data
@@ -162,6 +167,7 @@ class ShippingAddressSerializerTestCase(SerializerTestCase):
         )[0]
 
     def setUp(self):
+        cache.clear()
         self._test_data = get_shipping_address_test_data(self.__shipping_address)
 
     def __get_context(self, order=True):
@@ -195,10 +201,30 @@ class ShippingAddressSerializerTestCase(SerializerTestCase):
         self.assertEqual(shipping_address, self.__shipping_address)
 
     def test_create_with_order(self):
+        updated_at = timezone.now()
         shipping_address = self.__get_other_shipping_address(True)
 
         self.assertTrue(self.__order.shipping_address != self.__shipping_address)
         self.assertEqual(self.__order.shipping_address, shipping_address)
+        self.assertGreaterEqual(Order.objects.get(id=self.__order.id).updated_at, updated_at)
+
+    def test_create_with_recent_shipping_address(self):
+        context = {'shopper': self.__order.shopper}
+        self._test_data['receiver_name'] += 'test'
+        with self.captureOnCommitCallbacks(execute=True):
+            shipping_address = self._get_serializer(context=context).create(self._test_data)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self._get_serializer(context=context).create(self._test_data), shipping_address)
+        self.assertEqual(ShippingAddress.objects.filter(receiver_name=self._test_data['receiver_name']).count(), 1)
+
+    def test_create_with_rolled_back_shipping_address(self):
+        context = {'shopper': self.__order.shopper}
+        self._test_data['receiver_name'] += 'test'
+        with self.captureOnCommitCallbacks(execute=False):
+            self._get_serializer(context=context).create(self._test_data)
+
+        self.assertIsNone(cache.get(RECENT_SHIPPING_ADDRESSES_CACHE_KEY.format(self.__order.shopper.id)))
 
 
 class OrderItemSerializerTestCase(SerializerTestCase):
@@ -257,6 +283,13 @@ class OrderItemListSerializerTestCase(ListSerializerTestCase):
 
         self.assertEqual(StatusHistory.objects.filter(conditions).count(), len(order_items))
 
+    def __assert_statistics(self, expected_counts):
+        process_outbox_events()
+        self.assertDictEqual(
+            dict(OrderItemStatistics.objects.filter(shopper=self.__shopper).values_list('status_id', 'count')), 
+            expected_counts
+        )
+
     def test_validate_options(self):
         self._test_data.append(get_order_item_test_data(self.__options[0], self.__shopper))
 
@@ -267,6 +300,18 @@ class OrderItemListSerializerTestCase(ListSerializerTestCase):
 
         self._test_serializer_raise_validation_error('shopper_coupon is duplicated.')
 
+    def test_validate_prices_at_once(self):
+        shopper_coupons = [ShopperCouponFactory(
+            shopper=self.__shopper, is_used=False, coupon__classification_id=ALL_PRODUCT_COUPON_CLASSIFICATIONS[0]
+        ) for _ in self.__options]
+        self._test_data = [get_order_item_test_data(option, self.__shopper, shopper_coupon) for option, shopper_coupon in zip(self.__options, shopper_coupons)]
+        with patch('order.serializers.get_coupon_targets', wraps=get_coupon_targets) as mock, \
+            patch('order.serializers.calculate_item_prices', wraps=calculate_item_prices) as calculate_mock:
+            self._get_serializer_after_validation()
+
+        mock.assert_called_once()
+        calculate_mock.assert_called_once()
+
     def test_create_status_history(self):
         order_items = self.__create_order_items_by_factory()
         self._get_serializer()._OrderItemListSerializer__create_status_history(order_items)
@@ -291,19 +336,41 @@ class OrderItemListSerializerTestCase(ListSerializerTestCase):
             'used_point': 0,
             'earned_point': 0,
             'delivery': None,
+            'is_replacement': False,
             'shopper_coupon': data['shopper_coupon'].id if 'shopper_coupon' in data else None,
             'coupon_discount_price': data.get('coupon_discount_price', 0),
         } for data in serializer.validated_data])
         mock.assert_called_once()
         self.__assert_status_history_count(order_items)
+        self.__assert_statistics({self.__status.id: len(order_items)})
 
     def test_update_status(self):
         status = StatusFactory()
-        order_items = self._get_serializer().update_status(self.__create_order_items_by_factory(), status.id)
+        order_items = self.__create_order_items_by_factory()
+        OrderItemStatistics.objects.rebuild([self.__shopper.id])
+        updated_at = timezone.now()
+        order_items = self._get_serializer().update_status(order_items, status.id)
 
         for order_item in order_items:
             self.assertEqual(order_item.status_id, status.id)
+            self.assertGreaterEqual(Order.objects.get(id=order_item.order_id).updated_at, updated_at)
         self.__assert_status_history_count(order_items)
+        self.__assert_statistics({self.__status.id: 0, status.id: len(order_items)})
+
+    def test_update_status_sales_rollups(self):
+        status = StatusFactory()
+        order_items = self.__create_order_items_by_factory()
+        wholesaler_ids = list({order_item.option.product_color.product.wholesaler_id for order_item in order_items})
+        WholesalerSalesRollup.objects.rebuild(wholesaler_ids)
+        ProductSalesRollup.objects.rebuild(wholesaler_ids)
+        self._get_serializer().update_status(order_items, status.id)
+        process_outbox_events()
+
+        for model in [WholesalerSalesRollup, ProductSalesRollup]:
+            self.assertDictEqual(
+                dict(model.objects.filter(wholesaler_id__in=wholesaler_ids).values('status_id').annotate(Sum('count')).values_list('status_id', 'count__sum')),
+                {self.__status.id: 0, status.id: sum([order_item.count for order_item in order_items])}
+            )
 
 
 class OrderItemWriteSerializerTestCase(SerializerTestCase):
@@ -335,26 +402,10 @@ class OrderItemWriteSerializerTestCase(SerializerTestCase):
     def _get_serializer(self, *args, **kwargs):
         return super()._get_serializer(context={'shopper': self.__shopper}, *args, **kwargs)
 
-    def __set_up_get_actual_coupon_discount_price(self, target):
-        if target in ['discount_rate', 'coupont_maximum_discount_price']:
-            self.__coupon = CouponFactory.build(maximum_discount_price=None)
-        elif target in ['discount_price', 'maximum_discount_price']:
-            self.__coupon = CouponFactory.build(discount_price=True)
-
-        self.__product = ProductFactory.build()
-        self.__maximum_discount_price = self.__product.base_discounted_price + 1
-
     def __set_classification(self, classification_id):
         self.__coupon.coupon.classification_id = classification_id
         self.__coupon.coupon.save(update_fields=['classification'])
 
-    def __test_get_actual_coupon_discount_price(self, expected_result, maximum_discount_price=None):
-        result = self._get_serializer()._OrderItemWriteSerializer__get_actual_coupon_discount_price(
-            self.__coupon, self.__product, maximum_discount_price or self.__maximum_discount_price
-        )
-        
-        self.assertEqual(result, expected_result)
-
     def __test_validate_shopper_coupon(self, update_key, expected_message):
         self.__coupon.save(update_fields=[update_key])
         self._test_serializer_raise_validation_error(expected_message)
@@ -363,28 +414,6 @@ class OrderItemWriteSerializerTestCase(SerializerTestCase):
         self._test_data[update_key] += 1
         self._test_serializer_raise_validation_error(expected_message)
 
-    def test_get_actual_coupon_discount_price_about_discount_rate(self):
-        self.__set_up_get_actual_coupon_discount_price('discount_rate')
-
-        self.__test_get_actual_coupon_discount_price(self.__product.base_discounted_price * self.__coupon.discount_rate // 100)
-
-    def test_get_actual_coupon_discount_price_about_coupont_maximum_discount_price(self):
-        self.__set_up_get_actual_coupon_discount_price('coupont_maximum_discount_price')
-        self.__coupon.maximum_discount_price = self.__product.base_discounted_price * self.__coupon.discount_rate // 100 - 1
-
-        self.__test_get_actual_coupon_discount_price(self.__coupon.maximum_discount_price)
-
-    def test_get_actual_coupon_discount_price_about_discount_price(self):
-        self.__set_up_get_actual_coupon_discount_price('discount_price')
-
-        self.__test_get_actual_coupon_discount_price(self.__coupon.discount_price)
-
-    def test_get_actual_coupon_discount_price_about_maximum_discount_price(self):        
-        self.__set_up_get_actual_coupon_discount_price('maximum_discount_price')
-        maximum_discount_price = self.__coupon.discount_price - 1
-
-        self.__test_get_actual_coupon_discount_price(maximum_discount_price, maximum_discount_price)
-
     def test_validate_sale_price(self):        
         self.__test_validate_price('sale_price', f'sale_price of option {self.__option.id} is different from the actual price.')
 
@@ -506,6 +535,80 @@ class OrderItemWriteSerializerTestCase(SerializerTestCase):
         self.assertEqual(order_item, self.__order_item)
 
 
+class OrderItemOptionChangeListSerializerTestCase(ListSerializerTestCase):
+    _child_serializer_class = OrderItemOptionChangeSerializer
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.__status = StatusFactory(id=PAYMENT_COMPLETION_STATUS)
+        cls.__orders = create_orders_with_items(2, 2, True, item_kwargs={'status': cls.__status, 'shopper_coupon': None})
+        cls.__order_items = list(OrderItem.objects.filter(order__in=cls.__orders))
+        cls.__new_options = [OptionFactory(product_color=order_item.option.product_color) for order_item in cls.__order_items]
+
+    def setUp(self):
+        self._test_data = [
+            {'order_item': order_item.id, 'option': option.id} for order_item, option in zip(self.__order_items, self.__new_options)
+        ]
+
+    def test_duplicated_order_items(self):
+        self._test_data[1]['order_item'] = self._test_data[0]['order_item']
+
+        self._test_serializer_raise_validation_error('order_item is duplicated.')
+
+    def test_non_existent_order_item(self):
+        self._test_data[0]['order_item'] = -1
+
+        self._test_serializer_raise_validation_error('order_item -1 does not exist.')
+
+    def test_not_changeable_status(self):
+        order_item = self.__order_items[0]
+        order_item.status = StatusFactory(id=1000)
+        order_item.save(update_fields=['status'])
+
+        self._test_serializer_raise_validation_error(f'order_item {order_item.id} is in a state where options cannot be changed.')
+
+    def test_other_product_option(self):
+        self._test_data[0]['option'] = OptionFactory().id
+
+        self._test_serializer_raise_validation_error(f'order_item {self.__order_items[0].id} cannot be changed to an option for another product.')
+
+    def test_nonexistent_option(self):
+        self._test_data[0]['option'] = 0
+
+        self._test_serializer_raise_validation_error('option 0 does not exist.')
+
+    def test_exceed_maximum_number(self):
+        self._test_data = [{'order_item': i, 'option': i} for i in range(1, MAXIMUM_NUMBER_OF_ITEMS + 2)]
+
+        self._test_serializer_raise_validation_error(r'exceeded the maximum number\({0}\)'.format(MAXIMUM_NUMBER_OF_ITEMS))
+
+    def test_option_included_order(self):
+        self._test_data = [{'order_item': self.__order_items[0].id, 'option': self.__order_items[1].option_id}]
+
+        self._test_serializer_raise_validation_error(f'The same option is already included in order {self.__orders[0].id}.')
+
+    def test_swap_options_in_order(self):
+        self._test_data = [
+            {'order_item': self.__order_items[0].id, 'option': self.__order_items[1].option_id},
+            {'order_item': self.__order_items[1].id, 'option': self.__order_items[0].option_id},
+        ]
+
+        self.assertTrue(self._get_serializer_after_validation())
+
+    def test_validation_query_count(self):
+        self.assertNumQueries(3, self._get_serializer_after_validation)
+
+    def test_create(self):
+        serializer = self._get_serializer_after_validation()
+        self.assertNumQueries(3, serializer.save)
+
+        self.assertListEqual(
+            list(OrderItem.objects.filter(id__in=get_list_of_single_value(self._test_data, 'order_item')).values_list('id', 'option_id')),
+            [(data['order_item'], data['option']) for data in self._test_data]
+        )
+        self.assertEqual(StatusHistory.objects.filter(order_item__in=self.__order_items, status=self.__status).count(), len(self.__order_items))
+
+
 class OrderSerializerTestCase(SerializerTestCase):
     _serializer_class = OrderSerializer
 
@@ -525,6 +628,31 @@ class OrderSerializerTestCase(SerializerTestCase):
         self._test_not_excutable_validation()
 
 
+class OrderHistorySerializerTestCase(SerializerTestCase):
+    _serializer_class = OrderHistorySerializer
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.__orders = create_orders_with_items(2, 3)
+        ProductImageFactory(product=cls.__orders[0].items.first().option.product_color.product, sequence=1)
+
+    def test_serialization(self):
+        orders = get_order_queryset().filter(id__in=[order.id for order in self.__orders])
+
+        self.assertListEqual(self._get_serializer(orders).data, OrderSerializer(orders, many=True).data)
+
+    def test_serialization_with_item_queryset(self):
+        order_items = OrderItem.objects.filter(id=self.__orders[0].items.first().id)
+        orders = get_order_queryset(item_queryset=order_items).filter(id=self.__orders[0].id)
+
+        self.assertListEqual(self._get_serializer(orders, order_items).data, OrderSerializer(orders, many=True).data)
+
+    def test_number_of_queries(self):
+        orders = list(Order.objects.select_related('shipping_address'))
+
+        self.assertNumQueries(2, lambda: self._get_serializer(orders).data)
+
+
 class OrderWriteSerializerTestCase(SerializerTestCase):
     _serializer_class = OrderWriteSerializer
 
@@ -582,15 +710,14 @@ class OrderWriteSerializerTestCase(SerializerTestCase):
         key = 'test_key'
         point = 5000
         items = self._test_data['items']
-        self._get_serializer()._OrderWriteSerializer__distribute_point(items, key, point, self.__total_payment_price)
+        self._get_serializer()._OrderWriteSerializer__distribute_point(items, key, point)
         
         self.__assert_point(items, key, point)
 
     def test_apply_used_point_to_payment_price(self):
         items = self._test_data['items']
         serializer = self._get_serializer()
-        serializer._OrderWriteSerializer__distribute_point(
-            items, 'used_point', self._test_data['used_point'], self.__total_payment_price)
+        serializer._OrderWriteSerializer__distribute_point(items, 'used_point', self._test_data['used_point'])
         serializer._OrderWriteSerializer__apply_used_point_to_payment_price(items)
 
         self.assertEqual(get_sum_of_single_value(items, 'payment_price'), self._test_data['actual_payment_price'])
@@ -598,7 +725,7 @@ class OrderWriteSerializerTestCase(SerializerTestCase):
     def test_set_items_including_point_informations(self):
         items = self._test_data['items']
         self._get_serializer()._OrderWriteSerializer__set_items_including_point_informations(
-            items, self._test_data['used_point'], self._test_data['earned_point'], self.__total_payment_price
+            items, self._test_data['used_point'], self._test_data['earned_point']
         )
 
         self.__assert_point(items, 'used_point', self._test_data['used_point'])
@@ -609,7 +736,7 @@ class OrderWriteSerializerTestCase(SerializerTestCase):
         item_serializer = OrderItemWriteSerializer(many=True, data=self._test_data['items'], context={'shopper': self.__shopper})
         item_serializer.is_valid()
         self._get_serializer()._OrderWriteSerializer__set_items_including_point_informations(
-            item_serializer.validated_data, self._test_data['used_point'], self._test_data['earned_point'], self.__total_payment_price
+            item_serializer.validated_data, self._test_data['used_point'], self._test_data['earned_point']
         )
         expected_data = deepcopy(self._test_data)
         expected_data['items'] = item_serializer.validated_data
@@ -632,11 +759,94 @@ class OrderWriteSerializerTestCase(SerializerTestCase):
             'shopper': self.__shopper.id,
             'shipping_address': ShippingAddress.objects.get(**self._test_data['shipping_address']).id,
             'created_at': timezone.now(),
+            'updated_at': timezone.now(),
         })
         mock1.assert_called_once()
         mock2.assert_called_once_with(-1 * self._test_data['used_point'], '적립금으로 결제', order.id)
 
 
+class OrderQuoteSerializerTestCase(SerializerTestCase):
+    _serializer_class = OrderQuoteSerializer
+
+    @classmethod
+    def setUpTestData(cls):
+        shopper = ShopperFactory()
+        cls.__shopper = Shopper.objects.select_related('membership').get(id=shopper.id)
+        cls.__options = create_options()
+        cls.__coupon = ShopperCouponFactory(
+            shopper=cls.__shopper,
+            is_used=False,
+            coupon__classification__id=ALL_PRODUCT_COUPON_CLASSIFICATIONS[0],
+        )
+        cls.__order_test_data = get_order_test_data(
+            ShippingAddressFactory.build(), cls.__options, cls.__shopper, [cls.__coupon] + [None] * (len(cls.__options) - 1),
+        )
+
+    def setUp(self):
+        self._test_data = {
+            'items': [{
+                key: item[key] for key in ['option', 'count', 'shopper_coupon'] if key in item
+            } for item in self.__order_test_data['items']],
+            'used_point': self.__order_test_data['used_point'],
+        }
+
+    def _get_serializer(self, *args, **kwargs):
+        return super()._get_serializer(context={'shopper': self.__shopper}, *args, **kwargs)
+
+    def test_quote(self):
+        serializer = self._get_serializer_after_validation()
+        result = serializer.quote()
+
+        for item, expected_item in zip(result['items'], self.__order_test_data['items']):
+            for key in ['option', 'count', 'sale_price', 'base_discounted_price', 'membership_discount_price', 'payment_price']:
+                self.assertEqual(item[key], expected_item[key])
+            self.assertEqual(item['coupon_discount_price'], expected_item.get('coupon_discount_price', 0))
+        self.assertEqual(result['total_payment_price'], get_sum_of_single_value(self.__order_test_data['items'], 'payment_price'))
+        self.assertEqual(result['actual_payment_price'], self.__order_test_data['actual_payment_price'])
+        self.assertEqual(result['earned_point'], self.__order_test_data['earned_point'])
+        self.assertEqual(get_sum_of_single_value(result['items'], 'used_point'), self._test_data['used_point'])
+
+    def test_validation_query_count(self):
+        self.assertNumQueries(4, self._get_serializer(data=self._test_data).is_valid)
+
+    def test_validate_nonexistent_option(self):
+        self._test_data['items'][0]['option'] = 0
+
+        self._test_serializer_raise_validation_error('option 0 does not exist.')
+
+    def test_validate_used_shopper_coupon(self):
+        ShopperCoupon.objects.filter(id=self.__coupon.id).update(is_used=True)
+
+        self._test_serializer_raise_validation_error(f'shopper_coupon {self.__coupon.id} is expired or have already been used.')
+
+    def test_validate_not_applicable_shopper_coupon(self):
+        CouponClassificationFactory(id=SOME_PRODUCT_COUPON_CLASSIFICATION)
+        Coupon.objects.filter(id=self.__coupon.coupon_id).update(classification_id=SOME_PRODUCT_COUPON_CLASSIFICATION)
+
+        self._test_serializer_raise_validation_error(
+            f'shopper_coupon {self.__coupon.id} is not applicable to option {self._test_data["items"][0]["option"]}.'
+        )
+
+    def test_validate_used_point(self):
+        self._test_data['used_point'] = self.__shopper.point + 1
+
+        self._test_serializer_raise_validation_error('The shopper has less point than used_point.')
+
+    def test_validate_used_point_greater_than_total_payment_price(self):
+        total_payment_price = get_sum_of_single_value(self.__order_test_data['items'], 'payment_price')
+        self.__shopper.point = total_payment_price + 1
+        self._test_data['used_point'] = total_payment_price + 1
+
+        self._test_serializer_raise_validation_error('used_point cannot be greater than the total payment price.')
+
+    def test_validate_minimum_actual_payment_price(self):
+        total_payment_price = get_sum_of_single_value(self.__order_test_data['items'], 'payment_price')
+        self.__shopper.point = total_payment_price
+        self._test_data['used_point'] = total_payment_price - MINIMUM_ACTUAL_PAYMENT_PRICE + 1
+
+        self._test_serializer_raise_validation_error(f'actual_payment_price must be at least {MINIMUM_ACTUAL_PAYMENT_PRICE}.')
+
+
 class OrderItemStatisticsListSerializerTestCase(ListSerializerTestCase):
     _child_serializer_class = OrderItemStatisticsSerializer
 
@@ -686,8 +896,182 @@ class RefundSerializerTestCase(SerializerTestCase):
     _serializer_class = RefundSerializer
 
 
-class CancellationInformationSerializerTestCase(SerializerTestCase):
+def create_claim_test_data(status_ids, used_point=0):
+    shopper = ShopperFactory(point=0)
+    order = OrderFactory(shopper=shopper)
+    options = create_options(len(status_ids) + 1, True)
+    order_items = [
+        OrderItemFactory(order=order, option=option, status_id=status_id, used_point=used_point, shopper_coupon=None)
+        for option, status_id in zip(options, status_ids)
+    ]
+
+    return shopper, order, order_items, options[-1]
+
+
+class ClaimSerializerTestCase(SerializerTestCase):
+    _serializer_class = CancellationInformationSerializer
+    _status_ids = []
+    _claim_status_ids = []
+
+    @classmethod
+    def setUpTestData(cls):
+        for status_id in set(cls._status_ids + cls._claim_status_ids + [DELIVERY_PREPARING_STATUS]):
+            StatusFactory(id=status_id)
+        cls._shopper, cls._order, cls._order_items, cls._other_option = create_claim_test_data(cls._status_ids, 100)
+        cls._test_data = {'order_items': [order_item.id for order_item in cls._order_items]}
+
+    def _get_serializer(self, *args, **kwargs):
+        kwargs.setdefault('context', {'shopper': self._shopper, 'order_id': self._order.id})
+
+        return super()._get_serializer(*args, **kwargs)
+
+    def _test_validation(self):
+        if not self._status_ids:
+            return
+
+        self.assertListEqual(self._get_serializer_after_validation().validated_data['order_items'], self._order_items)
+
+    def _test_duplicated_order_items(self):
+        self._test_data['order_items'].append(self._test_data['order_items'][0])
+
+        self._test_serializer_raise_validation_error('order_item is duplicated.')
+
+    def _test_other_order_items(self):
+        self._test_data['order_items'].append(OrderItemFactory(order__shopper=self._shopper, status_id=self._status_ids[0]).id)
+
+        self._test_serializer_raise_validation_error('The order requested and the order items are different.')
+
+    def _test_not_requestable_status(self):
+        order_item = self._order_items[0]
+        order_item.status_id = DELIVERY_PREPARING_STATUS
+        order_item.save(update_fields=['status_id'])
+
+        self._test_serializer_raise_validation_error('The order_items cannot be requested.')
+
+    def _assert_claimed(self, expected_refund_price, point_recovered=True):
+        for order_item, status_id in zip(self._order_items, self._claim_status_ids):
+            self.assertEqual(OrderItem.objects.get(id=order_item.id).status_id, status_id)
+        self.assertEqual(StatusHistory.objects.filter(order_item__in=self._order_items).count(), len(self._order_items))
+
+        if expected_refund_price is None:
+            self.assertFalse(Refund.objects.exists())
+        else:
+            self.assertEqual(Refund.objects.get().price, expected_refund_price)
+
+        self.assertEqual(Shopper.objects.get(id=self._shopper.id).point, 100 * len(self._order_items) if point_recovered else 0)
+
+
+class CancellationInformationSerializerTestCase(ClaimSerializerTestCase):
     _serializer_class = CancellationInformationSerializer
+    _status_ids = [DEPOSIT_WAITING_STATUS, PAYMENT_COMPLETION_STATUS, PAYMENT_COMPLETION_STATUS]
+    _claim_status_ids = [ORDER_CANCELLATION_STATUS, PAYMENT_CANCELLATION_STATUS, PAYMENT_CANCELLATION_STATUS]
+
+    def test_validation(self):
+        self._test_validation()
+
+    def test_duplicated_order_items(self):
+        self._test_duplicated_order_items()
+
+    def test_other_order_items(self):
+        self._test_other_order_items()
+
+    def test_not_requestable_status(self):
+        self._test_not_requestable_status()
+
+    def test_create(self):
+        cancellation_informations = self._save()
+        refund = Refund.objects.get()
+
+        self._assert_claimed(sum([order_item.payment_price for order_item in self._order_items[1:]]))
+        self.assertListEqual([model_to_dict(cancellation_information, exclude=['created_at']) for cancellation_information in cancellation_informations], [
+            {'order_item': self._order_items[0].id, 'refund': None},
+        ] + [{'order_item': order_item.id, 'refund': refund.id} for order_item in self._order_items[1:]])
+
+    def test_create_query_count(self):
+        serializer = self._get_serializer_after_validation()
+
+        self.assertNumQueries(11, serializer.save)
+
+
+class ReturnInformationSerializerTestCase(ClaimSerializerTestCase):
+    _serializer_class = ReturnInformationSerializer
+    _status_ids = [DELIVERY_COMPLETION_STATUS, DELIVERY_COMPLETION_STATUS]
+    _claim_status_ids = [RETURN_REQUEST_STATUS, RETURN_REQUEST_STATUS]
+
+    def test_not_requestable_status(self):
+        self._test_not_requestable_status()
+
+    def test_create(self):
+        return_informations = self._save()
+
+        self._assert_claimed(sum([order_item.payment_price for order_item in self._order_items]))
+        self.assertListEqual(
+            [return_information.order_item_id for return_information in return_informations], 
+            self._test_data['order_items']
+        )
+        self.assertTrue(all([return_information.refund_id == Refund.objects.get().id for return_information in return_informations]))
+
+
+class ExchangeInformationSerializerTestCase(ClaimSerializerTestCase):
+    _serializer_class = ExchangeInformationSerializer
+    _status_ids = [DELIVERY_COMPLETION_STATUS, DELIVERY_COMPLETION_STATUS]
+    _claim_status_ids = [EXCHANGE_REQUEST_STATUS, EXCHANGE_REQUEST_STATUS]
+
+    def setUp(self):
+        self._test_data['options'] = [self._other_option.id, self._order_items[0].option_id]
+
+    def test_different_length(self):
+        self._test_data['options'].pop()
+
+        self._test_serializer_raise_validation_error('order_items and options must have the same length.')
+
+    def test_same_option(self):
+        self._test_data['options'][0] = self._order_items[0].option_id
+
+        self._test_serializer_raise_validation_error(f'option {self._order_items[0].option_id} cannot be exchanged')
+
+    def test_other_product_option(self):
+        self._test_data['options'][0] = OptionFactory().id
+
+        self._test_serializer_raise_validation_error(f'option {self._test_data["options"][0]} cannot be exchanged')
+
+    def test_create(self):
+        exchange_informations = self._save()
+
+        self._assert_claimed(None, False)
+        for exchange_information, order_item, option_id in zip(exchange_informations, self._order_items, self._test_data['options']):
+            new_order_item = OrderItem.objects.get(id=exchange_information.new_order_item_id)
+
+            self.assertEqual(exchange_information.order_item_id, order_item.id)
+            self.assertEqual(new_order_item.order_id, self._order.id)
+            self.assertEqual(new_order_item.option_id, option_id)
+            self.assertEqual(new_order_item.status_id, EXCHANGE_REQUEST_STATUS)
+            self.assertTrue(new_order_item.is_replacement)
+            self.assertListEqual(
+                [getattr(new_order_item, field) for field in ['sale_price', 'base_discount_price', 'membership_discount_price', 'payment_price']],
+                [0, 0, 0, 0]
+            )
+
+    def test_create_without_returning_bulk_insert(self):
+        previous_order_item = OrderItemFactory(order=self._order, status_id=EXCHANGE_REQUEST_STATUS, is_replacement=True)
+        ExchangeInformation.objects.create(order_item=OrderItemFactory(order=self._order), new_order_item=previous_order_item)
+        with patch.object(type(connection.features), 'can_return_rows_from_bulk_insert', False):
+            exchange_informations = self._save()
+
+        new_order_items = OrderItem.objects.filter(id__in=[exchange_information.new_order_item_id for exchange_information in exchange_informations])
+        self.assertNotIn(previous_order_item.id, [exchange_information.new_order_item_id for exchange_information in exchange_informations])
+        self.assertListEqual(list(new_order_items.values_list('option_id', flat=True)), self._test_data['options'])
+
+    def test_create_excluded_from_statistics(self):
+        exchange_informations = self._save()
+        new_order_items = list(OrderItem.objects.filter(id__in=[exchange_information.new_order_item_id for exchange_information in exchange_informations]))
+        OrderItemWriteSerializer(many=True).update_status(new_order_items, DELIVERY_PREPARING_STATUS)
+        process_outbox_events()
+
+        self.assertDictEqual(
+            dict(OrderItemStatistics.objects.filter(shopper=self._shopper).values_list('status_id', 'count')),
+            {DELIVERY_COMPLETION_STATUS: -len(self._order_items), EXCHANGE_REQUEST_STATUS: len(self._order_items)}
+        )
 
 
 class StatusHistorySerializerTestCase(SerializerTestCase):
@@ -738,11 +1122,39 @@ class OrderConfirmSerializerTestCase(SerializerTestCase):
 
     def test_validate_order_items(self):
         serializer = self._get_serializer()
-        order_items = serializer.validate_order_items(self._test_data['order_items'])
 
-        self.assertQuerysetEqual(OrderItem.objects.filter(id__in=self.__expected_result['success']), order_items)
-        self.assertListEqual(serializer._OrderConfirmSerializer__nonexistence, self.__expected_result['nonexistence'])
-        self.assertListEqual(serializer._OrderConfirmSerializer__not_requestable_status, self.__expected_result['not_requestable_status'])
+        self.assertListEqual(serializer.validate_order_items(self._test_data['order_items']), self._test_data['order_items'])
+
+    def test_confirm_order_items(self):
+        result = confirm_order_items(self._test_data['order_items'])
+
+        self.assertDictEqual(result, {**self.__expected_result, 'locked': []})
+        self.assertFalse(OrderItem.objects.filter(id__in=result['success']).exclude(status_id=DELIVERY_PREPARING_STATUS).exists())
+
+    def test_confirm_order_items_in_chunks(self):
+        progress = list(confirm_order_items_in_chunks(self._test_data['order_items'], 2))
+
+        self.assertListEqual(
+            [processed_count for processed_count, _ in progress], 
+            list(range(2, len(self._test_data['order_items']), 2)) + [len(self._test_data['order_items'])]
+        )
+        self.assertDictEqual(progress[-1][1], {**self.__expected_result, 'locked': []})
+
+    def test_confirm_order_items_with_status_changed_before_lock(self):
+        order_item_id = self.__expected_result['success'][0]
+        values_list = QuerySet.values_list
+
+        def values_list_and_change_status(queryset, *args, **kwargs):
+            values = list(values_list(queryset, *args, **kwargs))
+            OrderItem.objects.filter(id=order_item_id).update(status_id=DELIVERY_PREPARING_STATUS)
+            return values
+
+        with patch.object(QuerySet, 'values_list', values_list_and_change_status):
+            result = confirm_order_items(self._test_data['order_items'], True)
+
+        self.assertListEqual(result['success'], self.__expected_result['success'][1:])
+        self.assertIn(order_item_id, result['not_requestable_status'])
+        self.assertListEqual(result['locked'], [])
         
     @patch('order.serializers.OrderItemListSerializer._OrderItemListSerializer__create_status_history')
     def test_create(self, mock):
@@ -752,6 +1164,18 @@ class OrderConfirmSerializerTestCase(SerializerTestCase):
         mock.assert_called_once()
         self.assertDictEqual(result, self.__expected_result)
 
+    def test_create_with_status_changed_before_lock(self):
+        order_item_id = self.__expected_result['success'][0]
+        locked_result = {**self.__expected_result, 'locked': [order_item_id]}
+        locked_result['success'] = self.__expected_result['success'][1:]
+        serializer = self._get_serializer_after_validation()
+        with patch('order.serializers.confirm_order_items', return_value=locked_result):
+            result = serializer.save()
+
+        self.assertListEqual(result['success'], self.__expected_result['success'][1:])
+        self.assertIn(order_item_id, result['not_requestable_status'])
+        self.assertNotIn('locked', result)
+
 
 class DeliveryListSerializerTestCase(ListSerializerTestCase):
     _child_serializer_class = DeliverySerializer
@@ -780,6 +1204,9 @@ class DeliveryListSerializerTestCase(ListSerializerTestCase):
 
         self._test_serializer_raise_validation_error('invoice_number is duplicated.')
 
+    def test_validation_query_count(self):
+        self.assertNumQueries(2, self._get_serializer_after_validation)
+
     def test_set_failure_result(self):
         serializer = self._get_serializer_after_validation()
 
@@ -1,11 +1,20 @@
+import json
+from copy import copy
+from unittest.mock import patch
 from dateutil.relativedelta import relativedelta
 
+from django.db import DatabaseError
 from django.db.models import Count
+from django.core.files.uploadedfile import SimpleUploadedFile
 from django.utils import timezone
 
+from freezegun import freeze_time
+
 from common.test.test_cases import ViewTestCase
-from common.utils import REQUEST_DATE_FORMAT
-from user.test.factories import UserFactory, ShopperCouponFactory
+from common.models import IdempotencyKey
+from common.serializers import get_list_of_single_value
+from common.utils import REQUEST_DATE_FORMAT, datetime_to_iso
+from user.test.factories import UserFactory, ShopperFactory, ShopperCouponFactory
 from product.models import Option
 from product.test.factories import OptionFactory
 from coupon.models import ALL_PRODUCT_COUPON_CLASSIFICATIONS
@@ -13,12 +22,13 @@ from coupon.test.factories import CouponClassificationFactory
 from .factories import StatusHistoryFactory, create_orders_with_items, OrderItemFactory, ShippingAddressFactory, StatusFactory
 from .test_serializers import (
     get_order_item_queryset, get_order_queryset, get_shipping_address_test_data, get_order_test_data, 
-    get_order_confirm_result, get_delivery_test_data, get_delivery_result,
+    get_order_confirm_result, get_delivery_test_data, get_delivery_result, create_claim_test_data,
 )
-from ..paginations import OrderPagination
+from ..paginations import ORDER_SYNC_LAG, OrderPagination, OrderCursorPagination, OrderSyncPagination, encode_watermark
 from ..models import (
-    PAYMENT_COMPLETION_STATUS, DELIVERY_PREPARING_STATUS, DELIVERY_PROGRESSING_STATUS, NORMAL_STATUS, 
-    Order, OrderItem, Status,
+    PAYMENT_COMPLETION_STATUS, DELIVERY_PREPARING_STATUS, DELIVERY_PROGRESSING_STATUS, DELIVERY_COMPLETION_STATUS, NORMAL_STATUS, 
+    PAYMENT_CANCELLATION_STATUS, EXCHANGE_REQUEST_STATUS, RETURN_REQUEST_STATUS,
+    SALES_ROLLUP_VALUE_FIELDS, Order, OrderItem, Status, StatusHistory, StatusHistoryArchive, OrderItemStatistics, OrderConfirmJob, WholesalerSalesRollup, ProductSalesRollup,
 )
 from ..serializers import (
     ShippingAddressSerializer, OrderItemWriteSerializer, OrderSerializer, OrderWriteSerializer, OrderItemStatisticsSerializer,
@@ -89,6 +99,26 @@ class OrderViewSetTestCase(ViewTestCase):
 
         self.__test_pagination_list(status=self.__payment_completion_status.name)
 
+    def test_list_with_many_orders(self):
+        order_item = OrderItem.objects.filter(order__shopper_id=self._user.id).first()
+        Order.objects.bulk_create([
+            Order(number=f'bulk{i}', shopper_id=self._user.id, shipping_address=self.__shipping_address) for i in range(500)
+        ])
+        order_items = []
+        for order_id in Order.objects.filter(number__startswith='bulk').values_list('id', flat=True):
+            order_item.pk = None
+            order_item.order_id = order_id
+            order_items.append(copy(order_item))
+        OrderItem.objects.bulk_create(order_items)
+
+        self.assertNumQueries(5, self._get)
+        self._assert_success()
+        self.assertEqual(self._response_data['count'], 502)
+        self.assertListEqual(
+            self._response_data['results'], 
+            OrderSerializer(self.__get_queryset()[:OrderPagination.page_size], many=True).data
+        )
+
     def test_date_filter_list(self):
         order = Order.objects.filter(shopper_id=self._user.id).only('created_at').first()
         order.created_at = timezone.now() - relativedelta(months=1)
@@ -98,6 +128,97 @@ class OrderViewSetTestCase(ViewTestCase):
 
         self.__test_pagination_list(start_date=start_date, end_date=end_date)
 
+    def test_date_filter_list_with_invalid_date(self):
+        self._get({'start_date': '2022-07-01', 'end_date': '20220701'}, 400)
+
+        self._assert_failure(400, ['Query parameter end_date must be date format.'])
+
+    def __get_history_queryset(self):
+        return get_order_queryset(Order.objects.filter(shopper_id=self._user.id), get_order_item_queryset())
+
+    def __get_after_sync_lag(self, *args, **kwargs):
+        with freeze_time(timezone.now() + ORDER_SYNC_LAG):
+            self._get(*args, **kwargs)
+
+    def test_history(self):
+        self._url += '/history'
+        self.__get_after_sync_lag()
+
+        self._assert_success()
+        self.assertIsNone(self._response_data['previous'])
+        self.assertEqual(
+            self._response_data['since'], 
+            encode_watermark(self.__get_history_queryset().order_by('-updated_at', '-id').first())
+        )
+        self.assertListEqual(
+            self._response_data['results'],
+            OrderSerializer(self.__get_history_queryset()[:OrderCursorPagination.page_size], many=True).data
+        )
+
+    def test_history_without_orders_before_sync_lag(self):
+        self._url += '/history'
+        self._get()
+        since = self._response_data['since']
+        self.__get_after_sync_lag({'since': since})
+
+        self.assertTrue(since)
+        self.assertSetEqual(
+            set(get_list_of_single_value(self._response_data['results'], 'id')), 
+            set(self.__get_history_queryset().values_list('id', flat=True))
+        )
+
+    def test_history_with_since(self):
+        self._url += '/history'
+        self.__get_after_sync_lag()
+        since = self._response_data['since']
+
+        order = self.__orders[0]
+        OrderItemWriteSerializer(many=True).update_status(list(order.items.all()), DELIVERY_PREPARING_STATUS)
+        self.__get_after_sync_lag({'since': since})
+
+        self._assert_success()
+        self.assertFalse(self._response_data['has_more'])
+        self.assertEqual(self._response_data['since'], encode_watermark(Order.objects.get(id=order.id)))
+        self.assertListEqual(
+            self._response_data['results'],
+            OrderSerializer(self.__get_history_queryset().filter(id=order.id), many=True).data
+        )
+
+        self.__get_after_sync_lag({'since': self._response_data['since']})
+
+        self.assertEqual(self._response_data['results'], [])
+
+    # 기준 시각보다 최근에 변경된 주문은 늦게 커밋되는 변경이 누락되지 않도록 다음 동기화까지 반환하지 않음
+    def test_history_with_since_within_sync_lag(self):
+        self._url += '/history'
+        self.__get_after_sync_lag()
+        since = self._response_data['since']
+
+        order = self.__orders[0]
+        OrderItemWriteSerializer(many=True).update_status(list(order.items.all()), DELIVERY_PREPARING_STATUS)
+        self._get({'since': since})
+
+        self.assertListEqual(self._response_data['results'], [])
+        self.assertEqual(self._response_data['since'], since)
+
+    def test_history_with_since_has_more(self):
+        self._url += '/history'
+        since = encode_watermark(Order.objects.filter(shopper_id=self._user.id).order_by('updated_at', 'id').first())
+        Order.objects.bulk_create([
+            Order(number=f'bulk{i}', shopper_id=self._user.id, shipping_address=self.__shipping_address) 
+            for i in range(OrderSyncPagination.page_size + 1)
+        ])
+        self.__get_after_sync_lag({'since': since})
+
+        self.assertTrue(self._response_data['has_more'])
+        self.assertEqual(len(self._response_data['results']), OrderSyncPagination.page_size)
+
+    def test_history_with_invalid_since(self):
+        self._url += '/history'
+        self._get({'since': 'invalid'}, 400)
+
+        self._assert_failure(400, ['Query parameter since is invalid.'])
+
     def test_create(self):
         options = Option.objects.select_related('product_color__product').all()
         shopper_coupons = [ShopperCouponFactory(
@@ -111,6 +232,64 @@ class OrderViewSetTestCase(ViewTestCase):
 
         self._assert_success_and_serializer_class(OrderWriteSerializer)
 
+    def test_quote(self):
+        self._url += '/quote'
+        options = Option.objects.select_related('product_color__product').all()
+        order_test_data = get_order_test_data(self.__shipping_address, options, self._user, [None] * len(options))
+        self._test_data = {
+            'items': [{'option': item['option'], 'count': item['count']} for item in order_test_data['items']],
+            'used_point': order_test_data['used_point'],
+        }
+        self._post(format='json', status_code=200)
+
+        self._assert_success()
+        self.assertListEqual(
+            get_list_of_single_value(self._response_data['items'], 'payment_price'),
+            get_list_of_single_value(order_test_data['items'], 'payment_price')
+        )
+        self.assertEqual(self._response_data['actual_payment_price'], order_test_data['actual_payment_price'])
+
+    def __set_order_test_data(self):
+        options = Option.objects.select_related('product_color__product').all()
+        self._test_data = get_order_test_data(self.__shipping_address, options, self._user, [None] * len(options))
+
+    def test_create_with_idempotency_key(self):
+        self.__set_order_test_data()
+        self._post(format='json', HTTP_IDEMPOTENCY_KEY='order-key')
+        order_id = self._response_data['id']
+        order_count = Order.objects.count()
+        self._post(format='json', HTTP_IDEMPOTENCY_KEY='order-key')
+
+        self._assert_success()
+        self.assertEqual(self._response_data['id'], order_id)
+        self.assertEqual(self._response['Idempotent-Replayed'], 'true')
+        self.assertEqual(Order.objects.count(), order_count)
+
+    def test_create_with_reused_idempotency_key(self):
+        self.__set_order_test_data()
+        self._post(format='json', HTTP_IDEMPOTENCY_KEY='order-key')
+        self._test_data['used_point'] += 1
+        self._post(format='json', status_code=422, HTTP_IDEMPOTENCY_KEY='order-key')
+
+        self._assert_failure(422, 'Idempotency-Key is already used for a different request.')
+
+    def test_create_with_in_progress_idempotency_key(self):
+        self.__set_order_test_data()
+        self._post(format='json', HTTP_IDEMPOTENCY_KEY='order-key')
+        IdempotencyKey.objects.filter(key='order-key').update(status_code=None, response=None)
+        self._post(format='json', status_code=409, HTTP_IDEMPOTENCY_KEY='order-key')
+
+        self._assert_failure(409, 'A request with the same Idempotency-Key is in progress.')
+
+    def test_create_with_idempotency_key_rollback(self):
+        self.__set_order_test_data()
+        order_count = Order.objects.count()
+        with patch.object(IdempotencyKey, 'save', side_effect=DatabaseError):
+            self.assertRaises(DatabaseError, self.client.post, self._url, self._test_data, format='json', HTTP_IDEMPOTENCY_KEY='order-key')
+
+        self.assertEqual(Order.objects.count(), order_count)
+        self.assertFalse(IdempotencyKey.objects.filter(key='order-key').exists())
+
     def test_retreive(self):
         self.__set_detail_url()
         order = self.__get_queryset().get(id=self.__order.id)
@@ -159,8 +338,95 @@ class OrderViewSetTestCase(ViewTestCase):
 
         self._assert_success_and_serializer_class(DeliverySerializer, False)
         self.assertDictEqual(self._response_data, expected_result)
+
+    def __set_up_delivery_import(self):
+        self.__easyadmin_set_up()
+        self._url += '/delivery/import'
+        OrderItem.objects.update(status_id=DELIVERY_PREPARING_STATUS)
+        test_data = [get_delivery_test_data(order) for order in self.__orders]
+        expected_result = get_delivery_result(test_data)
+
+        return test_data, expected_result
+
+    def test_import_delivery_csv(self):
+        test_data, expected_result = self.__set_up_delivery_import()
+        lines = ['order,order_items,company,invoice_number'] + [
+            f'{data["order"]},{"|".join(map(str, data["order_items"]))},{data["company"]},{data["invoice_number"]}' for data in test_data
+        ] + ['invalid,1,company,invoice']
+        self._test_data = {'file': SimpleUploadedFile('delivery.csv', '\n'.join(lines).encode())}
+        self._post()
+
+        self._assert_success_and_serializer_class(DeliverySerializer, False)
+        self.assertDictEqual(self._response_data, {**expected_result, 'invalid_rows': [len(lines)]})
+        self.assertFalse(OrderItem.objects.filter(order_id__in=expected_result['success'], delivery_id=None).exists())
+
+    def test_import_delivery_ndjson(self):
+        test_data, expected_result = self.__set_up_delivery_import()
+        lines = ['not json'] + [json.dumps(data) for data in test_data]
+        self._test_data = {'file': SimpleUploadedFile('delivery.ndjson', '\n'.join(lines).encode())}
+        self._post()
+
+        self._assert_success()
+        self.assertDictEqual(self._response_data, {**expected_result, 'invalid_rows': [1]})
+
+    def test_import_delivery_with_duplicated_orders(self):
+        test_data, _ = self.__set_up_delivery_import()
+        test_data[1]['order'] = test_data[0]['order']
+        self._test_data = {'file': SimpleUploadedFile('delivery.ndjson', '\n'.join(map(json.dumps, test_data)).encode())}
+        self._post()
+
+        self._assert_success()
+        self.assertListEqual(self._response_data['invalid_rows'], list(range(1, len(test_data) + 1)))
+        self.assertListEqual(self._response_data['success'], [])
+
+    def test_import_delivery_with_invalid_file_format(self):
+        self.__easyadmin_set_up()
+        self._url += '/delivery/import'
+        self._test_data = {'file': SimpleUploadedFile('delivery.txt', b'')}
+        self._post(status_code=400)
+
+        self._assert_failure(400, 'Only csv or ndjson file can be imported.')
         
 
+class OrderConfirmJobViewSetTestCase(ViewTestCase):
+    _url = '/orders/confirm-jobs'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls._user = UserFactory(username='easyadmin', is_admin=True)
+        cls.__job = OrderConfirmJob.objects.create(order_items=[1, 2, 3], processed_count=2, result={'success': [1, 2]})
+
+    def setUp(self):
+        self._set_authentication()
+
+    def test_create(self):
+        self._test_data = {'order_items': [1, 2, 3]}
+        self._post(status_code=202)
+
+        self._assert_success_with_id_response()
+        self.assertListEqual(OrderConfirmJob.objects.get(id=self._response_data['id']).order_items, [1, 2, 3])
+
+    def test_create_with_duplicated_order_items(self):
+        self._test_data = {'order_items': [1, 1]}
+        self._post(status_code=400)
+
+        self._assert_failure(400, {'order_items': ['order_item is duplicated.']})
+
+    def test_retrieve(self):
+        self._url += f'/{self.__job.id}'
+        self._get()
+
+        self._assert_success()
+        self.assertDictEqual(self._response_data, {
+            'id': self.__job.id,
+            'total_count': 3,
+            'processed_count': 2,
+            'result': {'success': [1, 2]},
+            'created_at': datetime_to_iso(self.__job.created_at),
+            'finished_at': None,
+        })
+
+
 class OrderItemViewSetTestCase(ViewTestCase):
     _url = '/orders/items'
 
@@ -175,6 +441,7 @@ class OrderItemViewSetTestCase(ViewTestCase):
 
         cls.__order_item = OrderItem.objects.select_related('status', 'option__product_color').get(
             id=OrderItemFactory(order__shopper=cls._user, status=payment_completion_status_instance).id)
+        OrderItemStatistics.objects.rebuild([cls._user.id])
 
     def setUp(self):
         self._set_authentication()
@@ -191,9 +458,28 @@ class OrderItemViewSetTestCase(ViewTestCase):
 
         self._assert_success_and_serializer_class(OrderItemWriteSerializer)
 
+    def test_update_options(self):
+        self._user = UserFactory(is_admin=True)
+        self._set_authentication()
+        self._url += '/options'
+        option = OptionFactory(product_color=self.__order_item.option.product_color)
+        self._test_data = [{'order_item': self.__order_item.id, 'option': option.id}]
+        self._patch(format='json')
+
+        self._assert_success()
+        self.assertListEqual(self._response_data['id'], [self.__order_item.id])
+        self.assertEqual(OrderItem.objects.get(id=self.__order_item.id).option_id, option.id)
+
+    def test_update_options_without_admin(self):
+        self._url += '/options'
+        self._test_data = []
+        self._patch(format='json', status_code=403)
+
+        self.assertEqual(self._response.status_code, 403)
+
     def test_get_statistics(self):
         self._url += '/statistics'
-        self._get()
+        self.assertNumQueries(2, self._get)
 
         self._assert_success()
         self.assertListEqual(self._response_data, OrderItemStatisticsSerializer([{
@@ -202,8 +488,115 @@ class OrderItemViewSetTestCase(ViewTestCase):
         }], many=True).data)
 
 
+class SalesViewSetTestCase(ViewTestCase):
+    _url = '/orders/sales'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls._set_wholesaler()
+        cls.__statuses = StatusFactory.create_batch(2)
+        cls.__option = OptionFactory(product_color__product__wholesaler=cls._user)
+        cls.__order_items = [
+            OrderItemFactory(option=cls.__option, status=status) for status in cls.__statuses + cls.__statuses[:1]
+        ]
+        WholesalerSalesRollup.objects.rebuild([cls._user.id])
+        ProductSalesRollup.objects.rebuild([cls._user.id])
+        cls.__today = timezone.now().date()
+
+    def setUp(self):
+        self._set_authentication()
+        self._test_data = {
+            'start_date': (self.__today - relativedelta(days=7)).strftime(REQUEST_DATE_FORMAT),
+            'end_date': self.__today.strftime(REQUEST_DATE_FORMAT),
+        }
+
+    def __get_expected_values(self, status):
+        order_items = [order_item for order_item in self.__order_items if order_item.status == status]
+
+        return {field: sum([getattr(order_item, field) for order_item in order_items]) for field in SALES_ROLLUP_VALUE_FIELDS}
+
+    def test_list(self):
+        self._get()
+
+        self._assert_success()
+        self.assertListEqual(self._response_data, [{
+            'status': status.name,
+            **self.__get_expected_values(status),
+            'date': self.__today.isoformat(),
+        } for status in self.__statuses])
+
+    def test_summary(self):
+        self._url += '/summary'
+        self._get()
+
+        self._assert_success()
+        self.assertListEqual(self._response_data, [
+            {'status': status.name, **self.__get_expected_values(status)} for status in self.__statuses
+        ])
+
+    def test_get_products(self):
+        self._url += '/products'
+        self._get()
+
+        self._assert_success()
+        self.assertListEqual(self._response_data, [{
+            'status': status.name,
+            **self.__get_expected_values(status),
+            'product_id': self.__option.product_color.product_id,
+            'product_name': self.__option.product_color.product.name,
+        } for status in self.__statuses])
+
+    def test_get_with_too_long_period(self):
+        self._test_data['start_date'] = (self.__today - relativedelta(years=2)).strftime(REQUEST_DATE_FORMAT)
+        self._get(status_code=400)
+
+        self._assert_failure(400, {'non_field_errors': ['The period cannot exceed 366 days.']})
+
+
 class ClaimViewSetTestCase(ViewTestCase):
-    pass
+    _url = '/orders/{0}/{1}'
+
+    @classmethod
+    def setUpTestData(cls):
+        for status_id in [PAYMENT_COMPLETION_STATUS, PAYMENT_CANCELLATION_STATUS, DELIVERY_COMPLETION_STATUS, EXCHANGE_REQUEST_STATUS, RETURN_REQUEST_STATUS]:
+            StatusFactory(id=status_id)
+
+    def __set_up(self, claim, status_id):
+        self._user, order, order_items, self.__other_option = create_claim_test_data([status_id, status_id])
+        self._set_authentication()
+        self._url = self._url.format(order.id, claim)
+        self._test_data = {'order_items': [order_item.id for order_item in order_items]}
+
+    def __test_claim(self, claimed_status_id):
+        self._post(format='json')
+
+        self._assert_success()
+        self.assertListEqual(self._response_data['id'], self._test_data['order_items'])
+        self.assertFalse(OrderItem.objects.filter(id__in=self._test_data['order_items']).exclude(status_id=claimed_status_id).exists())
+
+    def test_cancel(self):
+        self.__set_up('cancel', PAYMENT_COMPLETION_STATUS)
+
+        self.__test_claim(PAYMENT_CANCELLATION_STATUS)
+
+    def test_cancel_other_shopper_order(self):
+        self.__set_up('cancel', PAYMENT_COMPLETION_STATUS)
+        self._user = ShopperFactory()
+        self._set_authentication()
+        self._post(format='json', status_code=400)
+
+        self._assert_failure(400, {'order_items': ['The order requested and the order items are different.']})
+
+    def test_exchange(self):
+        self.__set_up('exchange', DELIVERY_COMPLETION_STATUS)
+        self._test_data['options'] = [self.__other_option.id] * 2
+
+        self.__test_claim(EXCHANGE_REQUEST_STATUS)
+
+    def test_return(self):
+        self.__set_up('return', DELIVERY_COMPLETION_STATUS)
+
+        self.__test_claim(RETURN_REQUEST_STATUS)
 
 
 class StatusHistoryTestCase(ViewTestCase):
@@ -223,4 +616,81 @@ class StatusHistoryTestCase(ViewTestCase):
         self._get()
 
         self._assert_success()
-        self.assertListEqual(self._response_data, StatusHistorySerializer(status_histories, many=True).data)
\ No newline at end of file
+        self.assertListEqual(self._response_data, StatusHistorySerializer(status_histories, many=True).data)
+
+    def test_get_with_archive(self):
+        status_histories = StatusHistoryFactory.create_batch(3, order_item=self.__order_item)
+        StatusHistoryArchive.objects.create(order_item=self.__order_item, histories=[
+            [status_history.id, status_history.status_id, status_history.created_at.isoformat()] for status_history in status_histories[:2]
+        ])
+        StatusHistory.objects.filter(id__in=[status_history.id for status_history in status_histories[:2]]).delete()
+        self._get()
+
+        self._assert_success()
+        self.assertListEqual(self._response_data, StatusHistorySerializer(status_histories, many=True).data)
+
+
+class StatusHistoryTimelineTestCase(ViewTestCase):
+    _url = '/orders'
+    @classmethod
+    def setUpTestData(cls):
+        cls._set_shopper()
+        cls.__order = create_orders_with_items(order_kwargs={'shopper': cls._user})[0]
+        cls.__order_items = list(cls.__order.items.all())
+        cls.__status_histories = {
+            order_item.id: StatusHistoryFactory.create_batch(2, order_item=order_item) for order_item in cls.__order_items
+        }
+
+    def setUp(self):
+        self._set_authentication()
+
+    def __get_expected_data(self, order_items):
+        return [{
+            'order_item': order_item.id,
+            'status_histories': StatusHistorySerializer(self.__status_histories[order_item.id], many=True).data,
+        } for order_item in order_items]
+
+    def test_get_by_order(self):
+        self._url += f'/{self.__order.id}/status-histories'
+        self._get()
+
+        self._assert_success()
+        self.assertListEqual(self._response_data, self.__get_expected_data(self.__order_items))
+
+    def test_get_by_order_of_other_shopper(self):
+        self._url += f'/{create_orders_with_items(item_size=1)[0].id}/status-histories'
+        self._get(status_code=403)
+
+        self._assert_failure(403, 'You do not have permission to perform this action.')
+
+    def test_get_by_order_items(self):
+        self._url += '/items/status-histories'
+        self._get({'id': [order_item.id for order_item in self.__order_items[:2]]})
+
+        self._assert_success()
+        self.assertListEqual(self._response_data, self.__get_expected_data(self.__order_items[:2]))
+
+    def test_get_by_order_items_query_count(self):
+        self._url += '/items/status-histories'
+        with self.assertNumQueries(4):
+            self._get({'id': [order_item.id for order_item in self.__order_items]})
+
+        self._assert_success()
+
+    def test_get_by_order_items_of_other_shopper(self):
+        self._url += '/items/status-histories'
+        self._get({'id': [self.__order_items[0].id, OrderItemFactory().id]})
+
+        self._assert_failure(403, 'You do not have permission to perform this action.')
+
+    def test_get_by_order_items_without_id(self):
+        self._url += '/items/status-histories'
+        self._get()
+
+        self._assert_failure(400, 'Query parameter id is required.')
+
+    def test_get_by_non_integer_order_item_id(self):
+        self._url += '/items/status-histories'
+        self._get({'id': ['id']})
+
+        self._assert_failure(400, 'Query parameter id must be integer format.')
\ No newline at end of file
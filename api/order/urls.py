@@ -2,12 +2,16 @@ from django.urls import path
 
 from rest_framework.routers import SimpleRouter
 
-from .documentations import DecoratedOrderItemViewSet, DecoratedClaimViewset, decorated_status_history_view
+from .documentations import (
+    DecoratedOrderItemViewSet, DecoratedOrderConfirmJobViewSet, DecoratedSalesViewSet, DecoratedClaimViewset, decorated_status_history_view
+)
 
 app_name = 'order'
 
 router = SimpleRouter(trailing_slash=False)
 router.register(r'/items', DecoratedOrderItemViewSet, 'order-items')
+router.register(r'/confirm-jobs', DecoratedOrderConfirmJobViewSet, 'order-confirm-jobs')
+router.register(r'/sales', DecoratedSalesViewSet, 'order-sales')
 router.register(r'/(?P<order_id>\d+)', DecoratedClaimViewset, 'order-claim')
 
 urlpatterns = [
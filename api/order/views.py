@@ -1,28 +1,43 @@
-from django.db.models import Count
+import csv
+import codecs
+import json
+from datetime import datetime
+
+from django.db.models import F, Sum, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 from django.db.models.query import Prefetch
 from django.db.transaction import atomic
 
 from rest_framework.generics import GenericAPIView, get_object_or_404
 from rest_framework.viewsets import GenericViewSet
 from rest_framework.decorators import action
-from rest_framework.status import HTTP_201_CREATED, HTTP_400_BAD_REQUEST
-
-from common.utils import get_response
-from common.permissions import IsEasyAdminUser
+from rest_framework.parsers import MultiPartParser
+from rest_framework.status import HTTP_201_CREATED, HTTP_202_ACCEPTED, HTTP_400_BAD_REQUEST
+from rest_framework.exceptions import ValidationError, PermissionDenied
+
+from common.utils import get_response, check_integer_format, REQUEST_DATE_FORMAT
+from common.serializers import MAXIMUM_NUMBER_OF_ITEMS
+from common.permissions import IsAdminUser, IsEasyAdminUser, IsAuthenticatedWholesaler
+from common.idempotency import idempotent
 from user.models import Shopper
 from product.models import ProductImage
 from .models import (
-    PAYMENT_COMPLETION_STATUS, NORMAL_STATUS,
-    Order, OrderItem, Status, StatusHistory
+    PAYMENT_COMPLETION_STATUS, NORMAL_STATUS, SALES_ROLLUP_VALUE_FIELDS,
+    Order, OrderItem, Status, OrderItemStatistics, OrderConfirmJob, WholesalerSalesRollup, ProductSalesRollup
 )
 from .serializers import (
-    OrderSerializer, OrderWriteSerializer, OrderItemWriteSerializer, OrderItemStatisticsSerializer, ShippingAddressSerializer, 
-    CancellationInformationSerializer, StatusHistorySerializer, OrderConfirmSerializer, DeliverySerializer
+    OrderSerializer, OrderHistorySerializer, OrderWriteSerializer, OrderQuoteSerializer, OrderItemWriteSerializer, OrderItemOptionChangeSerializer, OrderItemStatisticsSerializer, ShippingAddressSerializer, 
+    CancellationInformationSerializer, ExchangeInformationSerializer, ReturnInformationSerializer, StatusHistorySerializer, OrderConfirmSerializer, OrderConfirmJobSerializer, DeliverySerializer,
+    SalesQuerySerializer, SalesRollupSerializer, DailySalesRollupSerializer, ProductSalesRollupSerializer,
+    get_status_histories, get_status_history_timelines,
 )
-from .paginations import OrderPagination
+from .paginations import OrderPagination, OrderCursorPagination, OrderSyncPagination
 from .permissions import OrderPermission, OrderItemPermission
 
 
+DELIVERY_IMPORT_CHUNK_SIZE = 500
+
+
 class OrderViewSet(GenericViewSet):
     pagination_class = OrderPagination
     permission_classes = [OrderPermission]
@@ -36,46 +51,64 @@ class OrderViewSet(GenericViewSet):
             return ShippingAddressSerializer
         elif self.action == 'confirm':
             return OrderConfirmSerializer
-        elif self.action == 'delivery':
+        elif self.action == 'quote':
+            return OrderQuoteSerializer
+        elif self.action in ['delivery', 'import_delivery']:
             return DeliverySerializer
         
         return OrderSerializer
 
+    def __get_date_query_param(self, key):
+        try:
+            return datetime.strptime(self.request.query_params[key], REQUEST_DATE_FORMAT)
+        except ValueError:
+            raise ValidationError(f'Query parameter {key} must be date format.')
+
     def __apply_filters(self, order_queryset, item_queryset):
-        if self.action != 'list':
-            return order_queryset, item_queryset
+        order_queryset = order_queryset.filter(shopper_id=self.request.user.id)
 
         if 'status' in self.request.query_params:
-            status = Status.objects.filter(name=self.request.query_params['status']).first()
-            order_queryset = order_queryset.filter(items__status=status).annotate(count=Count('id')).order_by('-id')
-            item_queryset = item_queryset.filter(status=status)
+            status_id = Status.objects.filter(name=self.request.query_params['status']).values_list('id', flat=True).first()
+            order_queryset = order_queryset.filter_by_item_status(status_id)
+            item_queryset = item_queryset.filter(status_id=status_id)
         
         if 'start_date' in self.request.query_params and 'end_date' in self.request.query_params:
-            order_queryset = order_queryset.filter(created_at__range=[
-                self.request.query_params['start_date'], 
-                self.request.query_params['end_date'] + ' 23:59:59',
-            ])
+            order_queryset = order_queryset.filter_by_created_date(
+                self.__get_date_query_param('start_date'), self.__get_date_query_param('end_date')
+            )
 
-        return order_queryset.filter(shopper_id=self.request.user.id), item_queryset
+        return order_queryset, item_queryset
 
     def get_queryset(self):
         queryset = Order.objects
 
-        if self.action in ['list', 'retrieve']:
+        if self.action in ['list', 'history']:
+            queryset = queryset.select_related('shipping_address')
+        elif self.action == 'retrieve':
             images = ProductImage.objects.filter(sequence=1)
-            item_queryset = OrderItem.objects.select_related('option__product_color__product', 'status'). \
+            item_queryset = OrderItem.objects.select_related('option__product_color__product', 'option__size', 'status', 'shopper_coupon__coupon'). \
                 prefetch_related(Prefetch('option__product_color__product__images', images))
 
-            queryset, item_queryset = self.__apply_filters(queryset, item_queryset)
             queryset = queryset.select_related('shipping_address').prefetch_related(Prefetch('items', item_queryset))
 
         return queryset
 
     def list(self, request):
-        serializer = self.get_serializer(self.paginate_queryset(self.get_queryset()), many=True)
+        queryset, item_queryset = self.__apply_filters(self.get_queryset(), OrderItem.objects.all())
+        serializer = OrderHistorySerializer(self.paginate_queryset(queryset), item_queryset)
 
         return get_response(data=self.get_paginated_response(serializer.data).data)
 
+    @action(['get'], False, 'history', pagination_class=OrderCursorPagination)
+    def history(self, request):
+        queryset = self.get_queryset().filter(shopper_id=request.user.id)
+        paginator = OrderSyncPagination() if OrderSyncPagination.since_query_param in request.query_params else self.paginator
+
+        serializer = OrderHistorySerializer(paginator.paginate_queryset(queryset, request, self))
+
+        return get_response(data=paginator.get_paginated_response(serializer.data).data)
+
+    @idempotent
     @atomic
     def create(self, request):
         shopper = Shopper.objects.select_related('membership').get(user=request.user)
@@ -90,9 +123,24 @@ class OrderViewSet(GenericViewSet):
 
         return get_response(status=HTTP_201_CREATED, data={'id': order.id})
     
+    @action(['post'], False)
+    def quote(self, request):
+        shopper = Shopper.objects.select_related('membership').get(user=request.user)
+        serializer = self.get_serializer(data=request.data, context={'shopper': shopper})
+        serializer.is_valid(raise_exception=True)
+
+        return get_response(data=serializer.quote())
+
     def retrieve(self, request, order_id):
         return get_response(data=self.get_serializer(self.get_object()).data)
 
+    @action(['get'], True, 'status-histories')
+    def get_status_histories(self, request, order_id):
+        order = self.get_object()
+        order_item_ids = list(OrderItem.objects.filter(order=order).values_list('id', flat=True))
+
+        return get_response(data=get_status_history_timelines(order_item_ids))
+
     @action(['put'], True, 'shipping-address')
     def update_shipping_address(self, request, order_id):
         serializer = self.get_serializer(data=request.data, context={'order': self.get_object()})
@@ -121,6 +169,70 @@ class OrderViewSet(GenericViewSet):
         return get_response(status=HTTP_201_CREATED, data=serializer.save())
 
 
+    def __read_delivery_records(self, file):
+        if file.name.endswith('.csv'):
+            reader = csv.DictReader(codecs.iterdecode(file, 'utf-8-sig'))
+            for record in reader:
+                record = {key: value for key, value in record.items() if key is not None and value not in ['', None]}
+                if 'order_items' in record:
+                    record['order_items'] = record['order_items'].split('|')
+
+                yield reader.line_num, record
+        else:
+            for line_number, line in enumerate(file, 1):
+                if not line.strip():
+                    continue
+
+                try:
+                    yield line_number, json.loads(line)
+                except ValueError:
+                    yield line_number, None
+
+    def __chunk_delivery_records(self, records):
+        chunk = []
+        for record in records:
+            chunk.append(record)
+            if len(chunk) == DELIVERY_IMPORT_CHUNK_SIZE:
+                yield chunk
+                chunk = []
+
+        if chunk:
+            yield chunk
+
+    @atomic
+    def __import_delivery_chunk(self, chunk, result):
+        serializer = self.get_serializer(data=[record for _, record in chunk], many=True)
+        if not serializer.is_valid() and isinstance(serializer.errors, list):
+            result['invalid_rows'] += [line_number for (line_number, _), error in zip(chunk, serializer.errors) if error]
+            chunk = [row for row, error in zip(chunk, serializer.errors) if not error]
+            if not chunk:
+                return
+
+            serializer = self.get_serializer(data=[record for _, record in chunk], many=True)
+            serializer.is_valid()
+
+        if serializer.errors:
+            result['invalid_rows'] += [line_number for line_number, _ in chunk]
+            return
+
+        for key, value in serializer.save().items():
+            result[key] += value
+
+    @action(['post'], False, 'delivery/import', permission_classes=[IsEasyAdminUser], parser_classes=[MultiPartParser])
+    def import_delivery(self, request):
+        file = request.FILES.get('file')
+        if file is None:
+            return get_response(status=HTTP_400_BAD_REQUEST, message='file is required.')
+        elif not file.name.endswith(('.csv', '.ndjson', '.jsonl')):
+            return get_response(status=HTTP_400_BAD_REQUEST, message='Only csv or ndjson file can be imported.')
+
+        result = {'success': [], 'invalid_orders': [], 'existed_invoice': [], 'invalid_rows': []}
+        for chunk in self.__chunk_delivery_records(self.__read_delivery_records(file)):
+            self.__import_delivery_chunk(chunk, result)
+
+        return get_response(status=HTTP_201_CREATED, data=result)
+
+
 class OrderItemViewSet(GenericViewSet):
     pagination_class = None
     permission_classes = [OrderItemPermission]
@@ -131,6 +243,8 @@ class OrderItemViewSet(GenericViewSet):
     def get_serializer_class(self):
         if self.action == 'get_statistics':
             return OrderItemStatisticsSerializer
+        elif self.action == 'update_options':
+            return OrderItemOptionChangeSerializer
 
         return OrderItemWriteSerializer
 
@@ -139,8 +253,9 @@ class OrderItemViewSet(GenericViewSet):
         if self.action == 'partial_update':
             queryset = queryset.select_related('order', 'option__product_color')
         elif self.action == 'get_statistics':
-            queryset = queryset.filter(order__shopper_id=self.request.user.id, status__in=NORMAL_STATUS) \
-                .values('status', 'status__name').annotate(count=Count('*')).order_by('status')
+            counts = OrderItemStatistics.objects.filter(shopper_id=self.request.user.id, status_id=OuterRef('id')).values('count')
+            queryset = Status.objects.filter(id__in=NORMAL_STATUS).order_by('id') \
+                .values(status__name=F('name'), count=Coalesce(Subquery(counts), 0))
 
         return queryset        
 
@@ -154,36 +269,150 @@ class OrderItemViewSet(GenericViewSet):
 
         return get_response(data={'id': int(item_id)})
 
+    @action(['get'], False, 'status-histories')
+    def get_status_histories(self, request):
+        order_item_ids = request.query_params.getlist('id')
+        if not order_item_ids:
+            return get_response(status=HTTP_400_BAD_REQUEST, message='Query parameter id is required.')
+        if not check_integer_format(order_item_ids):
+            return get_response(status=HTTP_400_BAD_REQUEST, message='Query parameter id must be integer format.')
+        if len(order_item_ids) > MAXIMUM_NUMBER_OF_ITEMS:
+            return get_response(status=HTTP_400_BAD_REQUEST, message=f'The number of id must not be more than {MAXIMUM_NUMBER_OF_ITEMS}.')
+
+        order_item_ids = sorted(set(map(int, order_item_ids)))
+        if OrderItem.objects.filter(id__in=order_item_ids, order__shopper_id=request.user.id).count() != len(order_item_ids):
+            raise PermissionDenied()
+
+        return get_response(data=get_status_history_timelines(order_item_ids))
+
+    @atomic
+    @action(['patch'], False, 'options', permission_classes=[IsAdminUser])
+    def update_options(self, request):
+        serializer = self.get_serializer(data=request.data, many=True, allow_empty=False)
+        serializer.is_valid(raise_exception=True)
+        order_items = serializer.save()
+
+        return get_response(data={'id': [order_item.id for order_item in order_items]})
+
     @action(['get'], False, 'statistics')
     def get_statistics(self, request):
         return get_response(data=self.get_serializer(self.get_queryset(), many=True).data)
 
 
+class OrderConfirmJobViewSet(GenericViewSet):
+    pagination_class = None
+    permission_classes = [IsEasyAdminUser]
+    serializer_class = OrderConfirmJobSerializer
+    queryset = OrderConfirmJob.objects.all()
+    lookup_field = 'id'
+    lookup_url_kwarg = 'job_id'
+
+    # 실제 처리는 confirm_order_items 커맨드에서 청크 단위로 수행
+    def create(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        job = serializer.save()
+
+        return get_response(status=HTTP_202_ACCEPTED, data={'id': job.id})
+
+    def retrieve(self, request, job_id):
+        return get_response(data=self.get_serializer(self.get_object()).data)
+
+
+class SalesViewSet(GenericViewSet):
+    pagination_class = None
+    permission_classes = [IsAuthenticatedWholesaler]
+    __value_fields = {f'total_{field}': Sum(field) for field in SALES_ROLLUP_VALUE_FIELDS}
+
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return DailySalesRollupSerializer
+        elif self.action == 'get_products':
+            return ProductSalesRollupSerializer
+
+        return SalesRollupSerializer
+
+    # 주문 항목이 아닌 일별 집계 테이블에서 조회하므로 조회 기간에만 비례
+    def get_queryset(self):
+        query_serializer = SalesQuerySerializer(data=self.request.query_params)
+        query_serializer.is_valid(raise_exception=True)
+
+        model = ProductSalesRollup if self.action == 'get_products' else WholesalerSalesRollup
+        queryset = model.objects.filter(
+            wholesaler_id=self.request.user.id,
+            date__range=(query_serializer.validated_data['start_date'], query_serializer.validated_data['end_date']),
+        )
+
+        if self.action == 'list':
+            group_fields = ['date', 'status__name']
+            ordering = ['date', 'status_id']
+        elif self.action == 'get_products':
+            group_fields = ['product_id', 'product__name', 'status__name']
+            ordering = ['product_id', 'status_id']
+        else:
+            group_fields = ['status__name']
+            ordering = ['status_id']
+
+        return queryset.values(*group_fields).annotate(**self.__value_fields).order_by(*ordering)
+
+    def list(self, request):
+        return get_response(data=self.get_serializer(self.get_queryset(), many=True).data)
+
+    @action(['get'], False)
+    def summary(self, request):
+        return get_response(data=self.get_serializer(self.get_queryset(), many=True).data)
+
+    @action(['get'], False, 'products')
+    def get_products(self, request):
+        return get_response(data=self.get_serializer(self.get_queryset(), many=True).data)
+
+
 class ClaimViewSet(GenericViewSet):
     permission_classes = [OrderPermission]
 
     def get_serializer_class(self):
         if self.action == 'cancel':
             return CancellationInformationSerializer
+        elif self.action == 'exchange':
+            return ExchangeInformationSerializer
+        elif self.action == 'return_order_items':
+            return ReturnInformationSerializer
 
-    def __get_context(self, status_id):
+    def get_serializer_context(self):
         return {
+            **super().get_serializer_context(),
             'shopper': self.request.user.shopper,
             'order_id': int(self.kwargs['order_id']),
-            'status_id': status_id,
         }
 
-    @action(['post'], False)
-    def cancel(self, request, order_id):
-        serializer = self.get_serializer(data=request.data, context=self.__get_context([100, 101]))
+    def __claim(self, request):
+        serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         serializer.save()
 
         return get_response(status=HTTP_201_CREATED, data={'id': request.data['order_items']})
 
+    @idempotent
+    @atomic
+    @action(['post'], False)
+    def cancel(self, request, order_id):
+        return self.__claim(request)
+
+    @idempotent
+    @atomic
+    @action(['post'], False)
+    def exchange(self, request, order_id):
+        return self.__claim(request)
+
+    @idempotent
+    @atomic
+    @action(['post'], False, 'return')
+    def return_order_items(self, request, order_id):
+        return self.__claim(request)
+
     # todo
-    # 교환 요청, 교환 요청 철회, 교환 완료, 교환 수락, 교환 거부
-    # 반품 요청, 반품 요청 철회, 반품 완료, 반품 수락, 반품 거부
+    # 교환 요청 철회, 교환 완료, 교환 수락, 교환 거부
+    # 반품 요청 철회, 반품 완료, 반품 수락, 반품 거부
 
 
 class StatusHistoryAPIView(GenericAPIView):
@@ -191,11 +420,13 @@ class StatusHistoryAPIView(GenericAPIView):
     permission_classes = [OrderItemPermission]
     serializer_class = StatusHistorySerializer
 
-    def get_queryset(self):
+    def get_object(self):
         order_item = get_object_or_404(OrderItem.objects.select_related('order'), id=self.kwargs['item_id'])
         self.check_object_permissions(self.request, order_item)
         
-        return StatusHistory.objects.select_related('status').filter(order_item=order_item)
+        return order_item
 
     def get(self, request, item_id):
-        return get_response(data=self.get_serializer(self.get_queryset(), many=True).data)
+        order_item = self.get_object()
+
+        return get_response(data=self.get_serializer(get_status_histories([order_item.id])[order_item.id], many=True).data)
@@ -130,7 +130,6 @@ class ProductQuestionAnswerResponse(Serializer):
     class ProductQuestionAnswerResultResponse(ProductQuestionAnswerSerializer):
         classification = CharField()
 
-    count = IntegerField()
     next = URLField(allow_null=True)
     previous = URLField(allow_null=True)
     results = ProductQuestionAnswerResultResponse(many=True)
@@ -0,0 +1,17 @@
+# Generated by Django 4.0.2 on 2026-10-20 03:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('product', '0044_delete_size_alter_option_size'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='productquestionanswer',
+            index=models.Index(fields=['product', 'created_at', 'id'], name='product_qa_created_at_idx'),
+        ),
+    ]
@@ -1,6 +1,6 @@
 from django.db.models import (
     Model, ForeignKey, ManyToManyField, DO_NOTHING, AutoField, CharField, ImageField,  BooleanField, 
-    BigAutoField, IntegerField, DateTimeField, Manager
+    BigAutoField, IntegerField, DateTimeField, Manager, Index
 )
 from django.db.models.query import QuerySet
 
@@ -212,3 +212,4 @@ class ProductQuestionAnswer(Model):
     class Meta:
         db_table = 'product_question_answer'
         ordering = ['-created_at']
+        indexes = [Index(fields=['product', 'created_at', 'id'], name='product_qa_created_at_idx')]
@@ -1,5 +1,6 @@
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.pagination import CursorPagination
 
 
-class ProductQuestionAnswerPagination(PageNumberPagination):
-    page_size = 10
\ No newline at end of file
+class ProductQuestionAnswerPagination(CursorPagination):
+    page_size = 10
+    ordering = ['-created_at', '-id']
@@ -1,5 +1,7 @@
+from django.core.cache import cache
 from django.core.validators import URLValidator
 from django.db.models import Sum, Q
+from django.db.transaction import on_commit
 
 from rest_framework.serializers import (
     Serializer, ListSerializer, ModelSerializer, IntegerField, CharField, DateTimeField,
@@ -10,6 +12,7 @@ from rest_framework.exceptions import ValidationError, APIException
 from common.utils import DEFAULT_IMAGE_URL, BASE_IMAGE_URL
 from common.regular_expressions import BASIC_SPECIAL_CHARACTER_REGEX, ENG_OR_KOR_REGEX, IMAGE_URL_REGEX
 from common.validators import validate_all_required_fields_included, validate_image_url
+from common.pricing import get_sale_price, get_base_discounted_price
 from common.models import SettingItem
 from common.serializers import (
     has_duplicate_element ,is_create_data, is_update_data, get_create_attrs, get_update_attrs,
@@ -25,6 +28,8 @@ from .models import (
 
 PRODUCT_IMAGE_MAX_LENGTH = 10
 PRODUCT_COLOR_MAX_LENGTH = 10
+PRODUCT_QUESTION_ANSWERS_CACHE_KEY = 'product_question_answers:{0}:{1}'
+PRODUCT_QUESTION_ANSWERS_CACHE_TIMEOUT = 60 * 10
 
 
 class SubCategorySerializer(ModelSerializer):
@@ -395,6 +400,12 @@ class OptionWriteSerializer(OptionSerializer):
             raise ValidationError('Size data cannot be updated.')
 
 
+def get_main_image_urls(product_ids):
+    main_images = ProductImage.objects.filter(product_id__in=set(product_ids), sequence=1).values_list('product_id', 'image_url')
+
+    return {product_id: BASE_IMAGE_URL + image_url for product_id, image_url in main_images}
+
+
 class OptionInOrderItemSerializer(Serializer):
     id = IntegerField(read_only=True)
     size = CharField(read_only=True, source='size.name')
@@ -406,8 +417,9 @@ class OptionInOrderItemSerializer(Serializer):
     def to_representation(self, instance):
         result = super().to_representation(instance)
 
-        if instance.product_color.product.images.all().exists():
-            result['product_image_url'] = BASE_IMAGE_URL + instance.product_color.product.images.all()[0].image_url
+        images = instance.product_color.product.images.all()
+        if images:
+            result['product_image_url'] = BASE_IMAGE_URL + images[0].image_url
         else:
             result['product_image_url'] = DEFAULT_IMAGE_URL
 
@@ -671,12 +683,6 @@ class ProductWriteSerializer(ProductSerializer):
 
     __validation_fields_related_to_main_category = {'sub_category', 'product_additional_information', 'laundry_informations'}
 
-    __price_multiple_num_data = [
-        {'min_price': 0, 'multiple': 2.3},
-        {'min_price': 40000, 'multiple': 2},
-        {'min_price': 80000, 'multiple': 1.8},
-    ]
-
     def validate_price(self, value):
         if value % 100 != 0:
             raise ValidationError('The price must be a multiple of 100.')
@@ -716,27 +722,11 @@ class ProductWriteSerializer(ProductSerializer):
             elif self.instance is not None and original_main_category.laundry_informations_required:
                 attrs['laundry_informations'] = []
         
-    def __get_price_multiple(self, price):
-        index = 0
-        for i in range(len(self.__price_multiple_num_data)):
-            if price < self.__price_multiple_num_data[i]['min_price']:
-                break
-            index = i
-
-        return self.__price_multiple_num_data[index]['multiple']
-
-    def __get_sale_price(self, price):
-        return round(price * self.__get_price_multiple(price)) // 100 * 100
-
-    def __get_base_discounted_price(self, sale_price, base_discount_rate):
-        base_discount_price = int(sale_price * base_discount_rate / 100) // 100 * 100
-        return sale_price - base_discount_price
-
     def __update_price_data(self, instance, validated_data):
         if 'price' in validated_data:
-            sale_price = self.__get_sale_price(validated_data['price'])
+            sale_price = get_sale_price(validated_data['price'])
             validated_data['sale_price'] = sale_price
-            base_discounted_price = self.__get_base_discounted_price(
+            base_discounted_price = get_base_discounted_price(
                 sale_price, instance.base_discount_rate
             )
             validated_data['base_discounted_price'] = base_discounted_price
@@ -744,7 +734,7 @@ class ProductWriteSerializer(ProductSerializer):
             sale_price = instance.sale_price
 
         if 'base_discount_rate' in validated_data:
-            base_discounted_price = self.__get_base_discounted_price(
+            base_discounted_price = get_base_discounted_price(
                 sale_price, validated_data['base_discount_rate']
             )
             validated_data['base_discounted_price'] = base_discounted_price
@@ -756,8 +746,8 @@ class ProductWriteSerializer(ProductSerializer):
         materials = validated_data.pop('materials')
         colors = validated_data.pop('colors')
 
-        sale_price = self.__get_sale_price(validated_data['price'])
-        base_discounted_price = self.__get_base_discounted_price(sale_price, validated_data['base_discount_rate'])
+        sale_price = get_sale_price(validated_data['price'])
+        base_discounted_price = get_base_discounted_price(sale_price, validated_data['base_discount_rate'])
 
         if 'additional_information' in validated_data:
             validated_data['additional_information'] = self.fields['additional_information'].create(validated_data['additional_information'])
@@ -842,6 +832,19 @@ class ProductQuestionAnswerSerializer(ModelSerializer):
         return result
 
 
+# Q&A 리스트 첫 페이지 캐시, 비밀 글 제외 여부별로 저장
+def get_product_question_answers_cache_key(product_id, open_qa):
+    return PRODUCT_QUESTION_ANSWERS_CACHE_KEY.format(product_id, int(open_qa))
+
+
+# 커밋 전에 지우면 동시에 조회된 이전 Q&A가 다시 캐시되므로 커밋 후 삭제
+def clear_product_question_answers(product_ids):
+    cache_keys = [
+        get_product_question_answers_cache_key(product_id, open_qa) for product_id in product_ids for open_qa in [False, True]
+    ]
+    on_commit(lambda: cache.delete_many(cache_keys))
+
+
 class ProductRegistrationSerializer(Serializer):
     main_categories = MainCategorySerializer(many=True, exclude_fields=['id', 'image_url'])
     colors = ColorSerializer(many=True)
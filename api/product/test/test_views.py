@@ -1,4 +1,5 @@
 import random
+from urllib.parse import urlparse, parse_qs
 
 from django.db.models.query import Prefetch
 from django.db.models import Avg, Max, Min, Count, Q, Case, When
@@ -21,6 +22,7 @@ from .factories import (
 )
 from .test_serializers import get_product_registration_test_data
 from ..views import sort_keywords_by_levenshtein_distance
+from ..paginations import ProductQuestionAnswerPagination
 from ..models import MainCategory, SubCategory, Keyword, Color, Product, Tag, Option, ProductQuestionAnswer
 from ..serializers import (
     MainCategorySerializer, ProductReadSerializer, SubCategorySerializer, ColorSerializer, TagSerializer,
@@ -616,6 +618,18 @@ class ProductViewSetForWholesalerTestCase(ProductViewSetTestCase):
         self.assertTrue(not Option.objects.filter(product_color__product=deleted_product, on_sale=True).exists())
         self.assertTrue(not deleted_product.question_answers.all().exists())
 
+    def test_destroy_clear_question_answers(self):
+        product = Product.objects.filter(wholesaler=self._user).last()
+        ProductQuestionAnswerFactory(product=product)
+        self.client.get('/products/{0}/question-answers'.format(product.id))
+        self._url += '/{0}'.format(product.id)
+        with self.captureOnCommitCallbacks(execute=True):
+            self._delete()
+        self._url = '/products/{0}/question-answers'.format(product.id)
+        self._get()
+
+        self.assertListEqual(self._response_data['results'], [])
+
 
 class ProductQuestionAnswerViewSetTestCase(ViewTestCase):
     _url = '/products/{0}/question-answers'
@@ -644,6 +658,58 @@ class ProductQuestionAnswerViewSetTestCase(ViewTestCase):
         self._assert_success()
         self.assertListEqual(self._response_data['results'], serializer.data)
 
+    def test_get_next_page(self):
+        ProductQuestionAnswerFactory.create_batch(size=ProductQuestionAnswerPagination.page_size, product=self.__product)
+        self._get()
+        self._get(parse_qs(urlparse(self._response_data['next']).query))
+        serializer = ProductQuestionAnswerSerializer(
+            ProductQuestionAnswer.objects.order_by('-created_at', '-id')[ProductQuestionAnswerPagination.page_size:], many=True
+        )
+
+        self._assert_success()
+        self.assertListEqual(self._response_data['results'], serializer.data)
+
+    def test_get_query_count(self):
+        with self.assertNumQueries(1):
+            self._get()
+        with self.assertNumQueries(0):
+            self._get()
+
+        self._assert_success()
+        self.assertEqual(len(self._response_data['results']), 1)
+
+    def test_get_empty_list(self):
+        self.__question_answer.delete()
+        self._get()
+
+        self._assert_success()
+        self.assertListEqual(self._response_data['results'], [])
+
+    def test_get_raise_404(self):
+        self._url = '/products/{0}/question-answers'.format(self.__product.id + 1)
+        self._get()
+
+        self._assert_failure(404, 'Not found.')
+
+    def test_get_after_create(self):
+        self._get()
+        with self.captureOnCommitCallbacks(execute=True):
+            self._post()
+        question_answer_id = self._response_data['id']
+        self._get()
+
+        self._assert_success()
+        self.assertEqual(self._response_data['results'][0]['id'], question_answer_id)
+
+    def test_get_before_create_commit(self):
+        self._get()
+        with self.captureOnCommitCallbacks(execute=False):
+            self._post()
+        self._get()
+
+        self._assert_success()
+        self.assertEqual(self._response_data['results'][0]['id'], self.__question_answer.id)
+
     def test_create(self):
         self._post()
 
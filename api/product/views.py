@@ -1,3 +1,4 @@
+from django.core.cache import cache
 from django.db import connection, transaction
 from django.db.models.query import Prefetch
 from django.db.models import Q, Case, When, Count, Max
@@ -20,6 +21,7 @@ from .models import MainCategory, SubCategory, Color, Keyword, Product, Tag, Pro
 from .serializers import (
     ProductReadSerializer, ProductRegistrationSerializer, ProductWriteSerializer, MainCategorySerializer, SubCategorySerializer, 
     ColorSerializer, TagSerializer, ProductQuestionAnswerSerializer, ProductQuestionAnswerClassificationSerializer,
+    PRODUCT_QUESTION_ANSWERS_CACHE_TIMEOUT, get_product_question_answers_cache_key, clear_product_question_answers,
 )
 from .permissions import ProductPermission, ProductQuestionAnswerPermission
 from .paginations import ProductQuestionAnswerPagination
@@ -374,6 +376,7 @@ class ProductViewSet(GenericViewSet):
     def destroy(self, request, id=None):
         product = self.get_object(self.get_queryset())
         product.delete()
+        clear_product_question_answers([product.id])
 
         return get_response(data={'id': product.id})
 
@@ -387,8 +390,7 @@ class ProductQuestionAnswerViewSet(ListModelMixin, GenericViewSet):
     pagination_class = ProductQuestionAnswerPagination
 
     def get_queryset(self):
-        product = get_object_or_404(Product, id=self.kwargs['product_id'])
-        queryset = ProductQuestionAnswer.objects.filter(product=product)
+        queryset = ProductQuestionAnswer.objects.filter(product_id=self.kwargs['product_id'])
 
         if self.action == 'list':
             queryset = self.__filter_queryset(queryset).select_related('shopper', 'classification')
@@ -402,7 +404,21 @@ class ProductQuestionAnswerViewSet(ListModelMixin, GenericViewSet):
         return queryset
 
     def list(self, request, product_id):
+        is_first_page = self.paginator.cursor_query_param not in request.query_params
+        cache_key = get_product_question_answers_cache_key(product_id, 'open_qa' in request.query_params)
+        if is_first_page:
+            data = cache.get(cache_key)
+            if data is not None:
+                return get_response(data=data)
+
         response = super().list(request, product_id)
+
+        # Q&A가 조회되지 않은 경우에만 상품 존재 여부 확인
+        if is_first_page:
+            if not response.data['results']:
+                get_object_or_404(Product, id=product_id)
+            cache.set(cache_key, response.data, PRODUCT_QUESTION_ANSWERS_CACHE_TIMEOUT)
+
         return get_response(data=response.data)
 
     @transaction.atomic
@@ -411,6 +427,7 @@ class ProductQuestionAnswerViewSet(ListModelMixin, GenericViewSet):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         question_answer = serializer.save(product=product, shopper=request.user.shopper)
+        clear_product_question_answers([product.id])
 
         return get_response(status=HTTP_201_CREATED, data={'id': question_answer.id})
 
@@ -419,6 +436,7 @@ class ProductQuestionAnswerViewSet(ListModelMixin, GenericViewSet):
         serializer = self.get_serializer(self.get_object(), data=request.data, partial=True)
         serializer.is_valid(raise_exception=True)
         question_answer = serializer.save()
+        clear_product_question_answers([question_answer.product_id])
 
         return get_response(data={'id': question_answer.id})
 
@@ -426,5 +444,6 @@ class ProductQuestionAnswerViewSet(ListModelMixin, GenericViewSet):
     def destroy(self, request, product_id, question_answer_id):
         question_answer = self.get_object()
         question_answer.delete()
+        clear_product_question_answers([question_answer.product_id])
 
         return get_response(data={'id': int(question_answer_id)})
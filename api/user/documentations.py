@@ -1,10 +1,10 @@
 from django.db import transaction
 
 from drf_yasg.utils import swagger_auto_schema
-from rest_framework.serializers import Serializer, ModelSerializer, IntegerField, CharField, URLField, ListField
+from rest_framework.serializers import Serializer, ModelSerializer, IntegerField, CharField, URLField, ListField, BooleanField
 from rest_framework.decorators import action
 
-from common.documentations import UniqueResponse, Image, get_response, get_paginated_response
+from common.documentations import UniqueResponse, Image, get_response, get_cursor_paginated_response, idempotency_key_parameter
 from coupon.documentations import CouponResponse
 from .models import Shopper, Wholesaler
 from .serializers import (
@@ -13,7 +13,7 @@ from .serializers import (
 )
 from .views import (
     IssuingTokenView, RefreshingTokenView, BlacklistingTokenView, ShopperView, WholesalerView, PointHistoryView, 
-    ProductLikeView, CartViewSet, ShopperShippingAddressViewSet, ShopperCouponViewSet,
+    ProductLikeView, ProductLikeListView, CartViewSet, ShopperShippingAddressViewSet, ShopperCouponViewSet,
     upload_business_registration_image, get_buildings, change_password, is_unique,
 )
 
@@ -85,6 +85,10 @@ class CartDeleteRequest(Serializer):
     id = ListField(child=IntegerField())
 
 
+class ProductLikeListRequest(Serializer):
+    id = ListField(child=IntegerField(), help_text='상품 id 배열, 100개 이하')
+
+
 class TokenResponse(RefreshingTokenSerializer):
     access = CharField()
 
@@ -114,6 +118,8 @@ class ProductCartResponse(Serializer):
             size = CharField()
             count = IntegerField()
             option = IntegerField()
+            is_available = BooleanField(help_text='상품, 색상, 옵션 중 하나라도 판매 중지되면 false')
+            is_price_changed = BooleanField(help_text='담을 때와 상품 할인가가 다르면 true')
 
     product_id = IntegerField()
     product_name = CharField()
@@ -127,8 +133,8 @@ class CartCreateResponse(Serializer):
 
 class CartListResponse(Serializer):
     results = ProductCartResponse(many=True)
-    total_sale_price = IntegerField()
-    total_base_discounted_price = IntegerField()
+    total_sale_price = IntegerField(help_text='판매 중인 항목의 합계')
+    total_base_discounted_price = IntegerField(help_text='판매 중인 항목의 합계')
 
 
 class ProductLikeViewResponse(Serializer):
@@ -136,6 +142,10 @@ class ProductLikeViewResponse(Serializer):
     product_id = IntegerField()
 
 
+class ProductLikeListResponse(Serializer):
+    count = IntegerField(help_text='실제로 추가 또는 삭제된 좋아요 개수')
+
+
 class ShopperCouponCreateResponse(Serializer):
     coupon_id = IntegerField()
 
@@ -184,7 +194,7 @@ class DecoratedCartViewSet(CartViewSet):
     def list(self, *args, **kwargs):
         return super().list(*args, **kwargs)
 
-    @swagger_auto_schema(request_body=CartCreateRequest(many=True), **get_response(CartCreateResponse()), operation_description='장바구니 항목 등록\n최대 100개까지 등록 가능')
+    @swagger_auto_schema(request_body=CartCreateRequest(many=True), manual_parameters=[idempotency_key_parameter], **get_response(CartCreateResponse()), operation_description='장바구니 항목 등록\n최대 100개까지 등록 가능')
     @transaction.atomic
     def create(self, *args, **kwargs):
         return super().create(*args, **kwargs)
@@ -237,7 +247,7 @@ class DecoratedShopperCouponViewSet(ShopperCouponViewSet):
     def list(self, *args, **kwargs):
         return super().list(*args, **kwargs)
 
-    @swagger_auto_schema(request_body=ShopperCouponSerializer, **get_response(ShopperCouponCreateResponse(), code=201), operation_description=create_description)
+    @swagger_auto_schema(request_body=ShopperCouponSerializer, manual_parameters=[idempotency_key_parameter], **get_response(ShopperCouponCreateResponse(), code=201), operation_description=create_description)
     def create(self, *args, **kwargs):
         return super().create(*args, **kwargs)
 
@@ -291,11 +301,17 @@ decorated_wholesaler_view = swagger_auto_schema(
 )(DecoratedWholesalerView.as_view()))))
 
 decorated_point_history_view = swagger_auto_schema(
-    method='GET', query_serializer=PointHistoryQuerySerializer(), **get_paginated_response(PointHistorySerializer(many=True)), operation_description='적립금 사용 내역 정보 가져오기'
+    method='GET', query_serializer=PointHistoryQuerySerializer(), **get_cursor_paginated_response(PointHistorySerializer(many=True)), operation_description='적립금 사용 내역 정보 가져오기\nbalance는 해당 내역 반영 후 잔액'
 )(PointHistoryView.as_view())
 
 decorated_product_like_view = swagger_auto_schema(
-    method='POST', **get_response(ProductLikeViewResponse(), 201), operation_description='상품 좋아요 생성(좋아요 버튼 클릭시 요청)'
+    method='POST', **get_response(ProductLikeViewResponse(), 201), operation_description='상품 좋아요 생성(좋아요 버튼 클릭시 요청)\n이미 좋아요한 상품이면 200 반환'
 )(swagger_auto_schema(
-    method='DELETE', **get_response(ProductLikeViewResponse()), operation_description='상품 좋아요 삭제(좋아요 버튼 한번 더 클릭시 요청)'
+    method='DELETE', **get_response(ProductLikeViewResponse()), operation_description='상품 좋아요 삭제(좋아요 버튼 한번 더 클릭시 요청)\n좋아요하지 않은 상품이어도 성공 반환'
 )(ProductLikeView.as_view()))
+
+decorated_product_like_list_view = swagger_auto_schema(
+    method='POST', request_body=ProductLikeListRequest, **get_response(ProductLikeListResponse(), 201), operation_description='상품 좋아요 일괄 생성(로그인 전 찜 목록 이전)\n존재하지 않거나 이미 좋아요한 상품은 무시'
+)(swagger_auto_schema(
+    method='DELETE', request_body=ProductLikeListRequest, **get_response(ProductLikeListResponse()), operation_description='상품 좋아요 일괄 삭제\n좋아요하지 않은 상품은 무시'
+)(ProductLikeListView.as_view()))
@@ -0,0 +1,53 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q, Exists, OuterRef
+from django.db.transaction import atomic
+
+from common.utils import warn_if_process_local_cache
+from order.models import OrderItem
+from user.models import ShopperCoupon, ShopperCouponArchive
+from user.serializers import clear_owned_coupon_ids
+
+
+class Command(BaseCommand):
+    help = 'Move expired shopper coupons that can no longer be issued again into shopper_coupon_archive.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=5000, help='Number of shopper coupons archived in one transaction.')
+
+    def __get_queryset(self):
+        today = date.today()
+
+        # 주문 항목이 참조하는 쿠폰은 주문 내역 조회에 필요하므로 남김
+        # 다시 발급받을 수 있는 쿠폰을 옮기면 중복 발급이 가능해지므로 남김
+        return ShopperCoupon.objects.filter(end_date__lt=today) \
+            .filter(Q(coupon__is_auto_issue=True) | Q(coupon__end_date__lt=today)) \
+            .filter(~Exists(OrderItem.objects.filter(shopper_coupon_id=OuterRef('pk'))))
+
+    def handle(self, *args, **options):
+        warn_if_process_local_cache(self.stderr, self.style)
+
+        chunk_size = options['chunk_size']
+        queryset = self.__get_queryset()
+        last_id = 0
+        total_count = 0
+
+        while True:
+            shopper_coupons = list(queryset.filter(id__gt=last_id).order_by('id')[:chunk_size])
+            if not shopper_coupons:
+                break
+
+            with atomic():
+                ShopperCouponArchive.objects.bulk_create([ShopperCouponArchive(
+                    id=shopper_coupon.id, shopper_id=shopper_coupon.shopper_id, coupon_id=shopper_coupon.coupon_id,
+                    end_date=shopper_coupon.end_date, is_used=shopper_coupon.is_used,
+                ) for shopper_coupon in shopper_coupons], ignore_conflicts=True)
+                ShopperCoupon.objects.filter(id__in=[shopper_coupon.id for shopper_coupon in shopper_coupons]).delete()
+            clear_owned_coupon_ids(set(shopper_coupon.shopper_id for shopper_coupon in shopper_coupons))
+
+            last_id = shopper_coupons[-1].id
+            total_count += len(shopper_coupons)
+            self.stdout.write(f'{total_count} shopper coupons archived.')
+
+        self.stdout.write(self.style.SUCCESS(f'Done. {total_count} shopper coupons archived.'))
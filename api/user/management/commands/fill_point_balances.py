@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand
+from django.db.transaction import atomic
+
+from user.models import Shopper, PointHistory
+
+
+class Command(BaseCommand):
+    help = 'Fill running balances of point histories written before balances were recorded.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000, help='Number of shoppers filled in one transaction.')
+
+    def __fill(self, shopper_ids):
+        balances = dict(Shopper.objects.select_for_update().filter(pk__in=shopper_ids).values_list('pk', 'point'))
+        histories = PointHistory.objects.filter(shopper_id__in=shopper_ids).order_by('shopper_id', '-id') \
+            .only('id', 'shopper_id', 'point', 'balance')
+
+        # 현재 잔액에서 최근 내역부터 거슬러 올라가며 계산
+        point_histories = []
+        for history in histories.iterator():
+            if history.balance is None:
+                history.balance = balances[history.shopper_id]
+                point_histories.append(history)
+
+            balances[history.shopper_id] = history.balance - history.point
+
+        PointHistory.objects.bulk_update(point_histories, ['balance'], batch_size=1000)
+
+        return len(point_histories)
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        last_shopper_id = 0
+        total_shoppers = 0
+        total_rows = 0
+
+        while True:
+            shopper_ids = list(
+                PointHistory.objects.filter(balance=None, shopper_id__gt=last_shopper_id).order_by('shopper_id') \
+                    .values_list('shopper_id', flat=True).distinct()[:chunk_size]
+            )
+            if not shopper_ids:
+                break
+
+            with atomic():
+                total_rows += self.__fill(shopper_ids)
+
+            last_shopper_id = shopper_ids[-1]
+            total_shoppers += len(shopper_ids)
+            self.stdout.write(f'{total_shoppers} shoppers filled.')
+
+        self.stdout.write(self.style.SUCCESS(f'Done. {total_shoppers} shoppers, {total_rows} rows.'))
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Case, When, Value
+
+from user.models import POINT_USE_KIND, POINT_SAVE_KIND, PointHistory
+
+
+class Command(BaseCommand):
+    help = 'Fill kinds of point histories written before kinds were recorded.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000, help='Number of point histories filled in one statement.')
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        last_id = 0
+        total_rows = 0
+
+        while True:
+            ids = list(
+                PointHistory.objects.filter(kind=None, id__gt=last_id).exclude(point=0).order_by('id') \
+                    .values_list('id', flat=True)[:chunk_size]
+            )
+            if not ids:
+                break
+
+            PointHistory.objects.filter(id__in=ids).update(
+                kind=Case(When(point__lt=0, then=Value(POINT_USE_KIND)), default=Value(POINT_SAVE_KIND))
+            )
+
+            last_id = ids[-1]
+            total_rows += len(ids)
+            self.stdout.write(f'{total_rows} point histories filled.')
+
+        self.stdout.write(self.style.SUCCESS(f'Done. {total_rows} rows.'))
@@ -0,0 +1,79 @@
+import time
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Exists, OuterRef
+from django.db.transaction import atomic
+
+from common.utils import warn_if_process_local_cache
+from coupon.models import Coupon
+from order.models import Order
+from user.models import Shopper, ShopperCoupon
+from user.serializers import clear_owned_coupon_ids
+
+
+class Command(BaseCommand):
+    help = 'Issue a coupon to every active shopper matching the given conditions. Shoppers who already have the coupon are skipped.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('coupon', type=int, help='Coupon id to issue.')
+        parser.add_argument('--membership', type=int, nargs='+', help='Membership ids of shoppers.')
+        parser.add_argument('--joined-from', type=date.fromisoformat, help='Shoppers who signed up on or after this date.')
+        parser.add_argument('--joined-to', type=date.fromisoformat, help='Shoppers who signed up on or before this date.')
+        parser.add_argument('--ordered-from', type=date.fromisoformat, help='Shoppers who ordered on or after this date.')
+        parser.add_argument('--ordered-to', type=date.fromisoformat, help='Shoppers who ordered on or before this date.')
+        parser.add_argument('--chunk-size', type=int, default=5000, help='Number of shoppers issued in one transaction.')
+
+    def __get_queryset(self, options):
+        queryset = Shopper.objects.filter(is_active=True)
+
+        if options['membership']:
+            queryset = queryset.filter(membership_id__in=options['membership'])
+        if options['joined_from'] is not None:
+            queryset = queryset.filter(created_at__gte=options['joined_from'])
+        if options['joined_to'] is not None:
+            queryset = queryset.filter(created_at__lt=options['joined_to'] + timedelta(days=1))
+
+        if options['ordered_from'] is not None or options['ordered_to'] is not None:
+            orders = Order.objects.filter(shopper_id=OuterRef('pk'))
+            if options['ordered_from'] is not None:
+                orders = orders.filter(created_at__gte=options['ordered_from'])
+            if options['ordered_to'] is not None:
+                orders = orders.filter(created_at__lt=options['ordered_to'] + timedelta(days=1))
+            queryset = queryset.filter(Exists(orders))
+
+        return queryset
+
+    def handle(self, *args, **options):
+        coupon = Coupon.objects.filter(id=options['coupon']).first()
+        if coupon is None:
+            raise CommandError(f'Coupon {options["coupon"]} does not exist.')
+        elif coupon.end_date is not None and coupon.end_date < date.today():
+            raise CommandError(f'Coupon {coupon.id} has expired.')
+
+        warn_if_process_local_cache(self.stderr, self.style)
+
+        queryset = self.__get_queryset(options)
+        chunk_size = options['chunk_size']
+        last_shopper_id = 0
+        total_shoppers = 0
+        started_at = time.monotonic()
+
+        while True:
+            shopper_ids = list(queryset.filter(pk__gt=last_shopper_id).order_by('pk').values_list('pk', flat=True)[:chunk_size])
+            if not shopper_ids:
+                break
+
+            with atomic():
+                ShopperCoupon.objects.issue(coupon, shopper_ids)
+            clear_owned_coupon_ids(shopper_ids)
+
+            last_shopper_id = shopper_ids[-1]
+            total_shoppers += len(shopper_ids)
+            seconds = time.monotonic() - started_at
+            self.stdout.write(f'{total_shoppers} shoppers processed ({total_shoppers / seconds:.0f}/s).')
+
+        issued_count = ShopperCoupon.objects.filter(coupon=coupon).count()
+        self.stdout.write(self.style.SUCCESS(
+            f'Done in {time.monotonic() - started_at:.1f}s. {total_shoppers} shoppers matched, {issued_count} shoppers have coupon {coupon.id}.'
+        ))
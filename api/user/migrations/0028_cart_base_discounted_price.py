@@ -0,0 +1,18 @@
+# Generated by Django 4.0.2 on 2026-10-20 02:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0027_pointhistory_balance'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cart',
+            name='base_discounted_price',
+            field=models.IntegerField(null=True),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 4.0.2 on 2026-10-20 02:50
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('coupon', '0013_rename_minimum_order_price_coupon_minimum_product_price'),
+        ('user', '0028_cart_base_discounted_price'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ShopperCouponArchive',
+            fields=[
+                ('id', models.IntegerField(primary_key=True, serialize=False)),
+                ('end_date', models.DateField()),
+                ('is_used', models.BooleanField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'db_table': 'shopper_coupon_archive',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='shoppercoupon',
+            index=models.Index(fields=['shopper', 'is_used', 'end_date'], name='shopper_coupon_available_idx'),
+        ),
+        migrations.AddField(
+            model_name='shoppercouponarchive',
+            name='coupon',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.DO_NOTHING, to='coupon.coupon'),
+        ),
+        migrations.AddField(
+            model_name='shoppercouponarchive',
+            name='shopper',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.DO_NOTHING, to='user.shopper'),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 4.0.2 on 2026-10-20 02:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0029_shopper_coupon_archive'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pointhistory',
+            name='kind',
+            field=models.CharField(max_length=4, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='pointhistory',
+            index=models.Index(fields=['shopper', 'kind', 'id'], name='point_history_kind_idx'),
+        ),
+    ]
@@ -1,18 +1,24 @@
 import string, random
+from datetime import date, timedelta
 
+from django.db import connection
 from django.db.models import (
-    Model, AutoField, BigAutoField, CharField, BooleanField, DateTimeField, OneToOneField, 
-    ForeignKey, EmailField, DateField, IntegerField, ImageField, DO_NOTHING, ManyToManyField,
+    Model, Manager, AutoField, BigAutoField, CharField, BooleanField, DateTimeField, OneToOneField, 
+    ForeignKey, EmailField, DateField, IntegerField, ImageField, DO_NOTHING, ManyToManyField, F, Index,
 )
+from django.db.transaction import atomic
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager
 from django.utils import timezone
 from django.utils.functional import cached_property
 
-from rest_framework.exceptions import APIException
+from rest_framework.exceptions import APIException, ValidationError
 from rest_framework_simplejwt.token_blacklist.models import OutstandingToken, BlacklistedToken
 
 from common.storage import MediaStorage
 
+POINT_USE_KIND = 'USE'
+POINT_SAVE_KIND = 'SAVE'
+
 
 def is_shopper(user):
     return isinstance(user, User) and user.is_shopper
@@ -128,16 +134,32 @@ class Shopper(User):
         if point == 0:
             return
 
-        self.point += point
-        self.save(update_fields=['point'])
-
-        PointHistory.objects.bulk_create(PointHistory(
-            shopper=self,
-            point=order_item['point'] if order_item is not None else point, 
-            content=content, 
-            order_id= order_id,
-            product_name=order_item['product_name'] if order_item is not None else None,
-        ) for order_item in order_items)
+        with atomic():
+            # 잔액은 DB에서 원자적으로 변경하고, 변경된 잔액을 기준으로 각 내역의 잔액 계산
+            # 차감은 잔액이 충분한 경우에만 반영하여 동시 주문으로 잔액이 음수가 되지 않도록 함
+            queryset = Shopper.objects.filter(pk=self.pk)
+            if point < 0:
+                queryset = queryset.filter(point__gte=-point)
+            if not queryset.update(point=F('point') + point):
+                raise ValidationError('The shopper has less point than used_point.')
+            self.point = Shopper.objects.filter(pk=self.pk).values_list('point', flat=True).get()
+
+            balance = self.point - point
+            point_histories = []
+            for order_item in order_items:
+                history_point = order_item['point'] if order_item is not None else point
+                balance += history_point
+                point_histories.append(PointHistory(
+                    shopper=self,
+                    point=history_point, 
+                    kind=PointHistory.get_kind(history_point),
+                    balance=balance,
+                    content=content, 
+                    order_id= order_id,
+                    product_name=order_item['product_name'] if order_item is not None else None,
+                ))
+
+            PointHistory.objects.bulk_create(point_histories)
 
 
 class Wholesaler(User):
@@ -160,23 +182,92 @@ class Wholesaler(User):
         return '{0} {1}'.format(self.username, self.name)
 
 
+class ProductLikeManager(Manager):
+    # 존재하는 상품만 한 문장으로 추가하며 이미 좋아요한 상품은 무시, 추가된 개수 반환
+    def like(self, shopper_id, product_ids):
+        table = self.model._meta.db_table
+        product_table = self.model._meta.get_field('product').related_model._meta.db_table
+        product_placeholders = ', '.join(['%s'] * len(product_ids))
+
+        if connection.vendor == 'mysql':
+            insert_clause, conflict_clause = 'INSERT IGNORE INTO', ''
+        else:
+            insert_clause, conflict_clause = 'INSERT INTO', 'ON CONFLICT (shopper_id, product_id) DO NOTHING'
+
+        sql = (
+            '{0} {1} (shopper_id, product_id, created_at) '
+            'SELECT %s, id, %s FROM {2} WHERE id IN ({3}) '
+            '{4}'
+        ).format(insert_clause, table, product_table, product_placeholders, conflict_clause)
+        params = [shopper_id, connection.ops.adapt_datetimefield_value(timezone.now()), *product_ids]
+
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return cursor.rowcount
+
+    # 삭제된 개수 반환
+    def unlike(self, shopper_id, product_ids):
+        return self.filter(shopper_id=shopper_id, product_id__in=product_ids).delete()[0]
+
+
 class ProductLike(Model):
     id = BigAutoField(primary_key=True)
     shopper = ForeignKey('Shopper', DO_NOTHING)
     product = ForeignKey('product.Product', DO_NOTHING)
     created_at = DateTimeField(default=timezone.now)
 
+    objects = ProductLikeManager()
+
     class Meta:
         db_table = 'product_like'
         unique_together = (('shopper', 'product'),)
 
 
+class CartManager(Manager):
+    # 최대 개수 검사와 추가를 한 문장으로 실행
+    # 이미 담긴 옵션은 수량을 더하고 담을 때의 가격을 갱신하며, 추가 후 개수가 maximum_number를 넘으면 아무 행도 쓰지 않고 False 반환
+    def add(self, shopper_id, counts, prices, maximum_number):
+        table = self.model._meta.db_table
+        created_at = connection.ops.adapt_datetimefield_value(timezone.now())
+        rows = ' UNION ALL '.join([
+            'SELECT %s AS shopper_id, %s AS option_id, %s AS count, %s AS base_discounted_price, %s AS created_at'
+        ] * len(counts))
+        params = [
+            value for option_id, count in counts.items()
+            for value in (shopper_id, option_id, count, prices[option_id], created_at)
+        ]
+        option_placeholders = ', '.join(['%s'] * len(counts))
+
+        if connection.vendor == 'mysql':
+            conflict_clause = 'ON DUPLICATE KEY UPDATE count = {0}.count + new_cart.count, ' \
+                'base_discounted_price = new_cart.base_discounted_price'.format(table)
+        else:
+            conflict_clause = 'ON CONFLICT (shopper_id, option_id) DO UPDATE SET count = {0}.count + excluded.count, ' \
+                'base_discounted_price = excluded.base_discounted_price'.format(table)
+
+        sql = (
+            'INSERT INTO {0} (shopper_id, option_id, count, base_discounted_price, created_at) '
+            'SELECT * FROM ({1}) AS new_cart '
+            'WHERE (SELECT COUNT(*) FROM {0} WHERE shopper_id = %s AND option_id NOT IN ({2})) + %s <= %s '
+            '{3}'
+        ).format(table, rows, option_placeholders, conflict_clause)
+        params += [shopper_id, *counts, len(counts), maximum_number]
+
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return cursor.rowcount > 0
+
+
 class Cart(Model):
     id = AutoField(primary_key=True)
     option = ForeignKey('product.Option', DO_NOTHING, related_name='carts')
     shopper = ForeignKey('Shopper', DO_NOTHING, related_name='carts')
     created_at = DateTimeField(auto_now_add=True)
     count = IntegerField()
+    # 담을 때의 상품 할인가, 현재 가격과 다르면 장바구니 조회 시 가격 변경으로 표시
+    base_discounted_price = IntegerField(null=True)
+
+    objects = CartManager()
 
     class Meta:
         db_table = 'cart'
@@ -233,13 +324,12 @@ class ShopperShippingAddress(Model):
         db_table = 'shopper_shipping_address'
 
     def save(self, *args, **kwargs):
-        if not self.shopper.addresses.all().exists():
-            self.is_default = True
-        elif self.is_default:
-            queryset = self.shopper.addresses.exclude(id=self.id).filter(is_default=True)
-            if queryset.exists():
-                queryset.update(is_default=False)
-            
+        if self.is_default:
+            ShopperShippingAddress.objects.filter(shopper_id=self.shopper_id, is_default=True) \
+                .exclude(id=self.id).update(is_default=False)
+        elif self._state.adding:
+            # 최초로 등록하는 배송지는 기본 배송지로 지정
+            self.is_default = not ShopperShippingAddress.objects.filter(shopper_id=self.shopper_id).exists()
 
         super().save(*args, **kwargs)
 
@@ -250,12 +340,46 @@ class PointHistory(Model):
     order = ForeignKey('order.Order', DO_NOTHING, null=True)
     product_name = CharField(max_length=100, null=True)
     point = IntegerField()
+    balance = IntegerField(null=True)
+    kind = CharField(max_length=4, null=True)
     content = CharField(max_length=200)
     created_at = DateField(auto_now_add=True)
 
     class Meta:
         db_table = 'point_history'
         ordering = ['-id']
+        indexes = [Index(fields=['shopper', 'kind', 'id'], name='point_history_kind_idx')]
+
+    @staticmethod
+    def get_kind(point):
+        if point < 0:
+            return POINT_USE_KIND
+        elif point > 0:
+            return POINT_SAVE_KIND
+
+        return None
+
+    def save(self, *args, **kwargs):
+        if self.kind is None:
+            self.kind = self.get_kind(self.point)
+
+        super().save(*args, **kwargs)
+
+
+class ShopperCouponManager(Manager):
+    def get_end_date(self, coupon):
+        if coupon.end_date is not None:
+            return coupon.end_date
+
+        return date.today() + timedelta(days=coupon.available_period)
+
+    # 이미 발급받은 쇼퍼는 무시
+    def issue(self, coupon, shopper_ids):
+        end_date = self.get_end_date(coupon)
+
+        return self.bulk_create([
+            self.model(shopper_id=shopper_id, coupon=coupon, end_date=end_date) for shopper_id in shopper_ids
+        ], ignore_conflicts=True)
 
 
 class ShopperCoupon(Model):
@@ -265,9 +389,27 @@ class ShopperCoupon(Model):
     end_date = DateField()
     is_used = BooleanField(default=False)
 
+    objects = ShopperCouponManager()
+
     class Meta:
         db_table = 'shopper_coupon'
         unique_together = (('shopper', 'coupon'),)
+        indexes = [
+            Index(fields=['shopper', 'is_used', 'end_date'], name='shopper_coupon_available_idx'),
+        ]
 
     def __str__(self):
         return self.coupon.name
+
+
+# 만료되어 더 이상 사용, 재발급할 수 없는 쇼퍼 쿠폰 보관 (id는 shopper_coupon의 id 유지)
+class ShopperCouponArchive(Model):
+    id = IntegerField(primary_key=True)
+    shopper = ForeignKey('Shopper', DO_NOTHING)
+    coupon = ForeignKey('coupon.Coupon', DO_NOTHING)
+    end_date = DateField()
+    is_used = BooleanField()
+    archived_at = DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'shopper_coupon_archive'
@@ -1,5 +1,6 @@
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.pagination import CursorPagination
 
 
-class PointHistoryPagination(PageNumberPagination):
-    page_size = 20
\ No newline at end of file
+class PointHistoryPagination(CursorPagination):
+    page_size = 20
+    ordering = '-id'
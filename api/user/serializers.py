@@ -1,7 +1,8 @@
-from datetime import date, timedelta
+from datetime import date
 
+from django.core.cache import cache
 from django.utils import timezone
-from django.db.models import Q
+from django.db.models import Q, F, OuterRef, Subquery
 
 from rest_framework.serializers import (
     Serializer, ModelSerializer, ListSerializer, ValidationError, IntegerField, CharField, RegexField, DateTimeField,
@@ -18,6 +19,8 @@ from common.regular_expressions import (
     BASIC_SPECIAL_CHARACTER_REGEX, ZIP_CODE_REGEX,
 )
 from common.serializers import MAXIMUM_NUMBER_OF_ITEMS
+from common.pricing import calculate_item_prices, is_price_changed
+from product.models import Product, Option, ProductImage
 from coupon.models import Coupon, CouponClassification
 from .models import (
     is_shopper, is_wholesaler, OutstandingToken, BlacklistedToken, ShopperShippingAddress, Membership, User, Shopper,
@@ -26,6 +29,12 @@ from .models import (
 from .validators import PasswordSimilarityValidator
 
 
+OWNED_COUPONS_CACHE_KEY = 'owned_coupons:{0}'
+OWNED_COUPONS_CACHE_TIMEOUT = 60 * 60 * 24
+DEFAULT_SHIPPING_ADDRESS_CACHE_KEY = 'default_shipping_address:{0}'
+DEFAULT_SHIPPING_ADDRESS_CACHE_TIMEOUT = 60 * 60 * 24
+
+
 def get_token_time(token):
     return {
         'created_at': gmt_to_kst(token.current_time),
@@ -123,7 +132,7 @@ class ShopperSerializer(UserSerializer):
         signup_coupon_classification = CouponClassification.objects.get(id=5)
         signup_coupons = Coupon.objects.filter(classification=signup_coupon_classification)
         shopper_signup_coupons = [
-            ShopperCoupon(shopper=shopper, coupon=coupon, end_date=date.today() + timedelta(days=coupon.available_period))
+            ShopperCoupon(shopper=shopper, coupon=coupon, end_date=ShopperCoupon.objects.get_end_date(coupon))
             for coupon in signup_coupons
         ]
         ShopperCoupon.objects.bulk_create(shopper_signup_coupons)
@@ -175,37 +184,25 @@ class CartListSerializer(ListSerializer):
 
     def validate(self, attrs):
         if self.instance is None:
-            shopper = self.context['shopper']
-            options = [attr['option'] for attr in attrs]
-            if shopper.carts.exclude(option__in=options).count() + len(attrs) > MAXIMUM_NUMBER_OF_ITEMS:
-                raise ValidationError('exceeded the maximum number({}).'.format(MAXIMUM_NUMBER_OF_ITEMS))
-        
+            option_ids = set(attr['option_id'] for attr in attrs)
+            self.__prices = dict(Option.objects.filter(id__in=option_ids).values_list('id', 'product_color__product__base_discounted_price'))
+            if option_ids != set(self.__prices):
+                raise ValidationError('option {} does not exist.'.format(min(option_ids - set(self.__prices))))
+
         return attrs
 
     def create(self, validated_data):
         shopper = self.context['shopper']
+        counts = {data['option_id']: data['count'] for data in validated_data}
 
-        input_data = {}
-        for data in validated_data:
-            input_data[data['option'].id] = data
-            input_data[data['option'].id].pop('option')
+        if not self.child.Meta.model.objects.add(shopper.id, counts, self.__prices, MAXIMUM_NUMBER_OF_ITEMS):
+            raise ValidationError('exceeded the maximum number({}).'.format(MAXIMUM_NUMBER_OF_ITEMS))
 
-        existing_option_id = list(shopper.carts.all().values_list('option__id', flat=True))
-        input_option_id = input_data.keys()
-        
-        create_option_id = set(input_option_id) - set(existing_option_id)
-        update_option_id = set(input_option_id) - set(create_option_id)
-
-        for option_id in update_option_id:
-            cart = shopper.carts.get(option_id=option_id)
-            cart.count += input_data[option_id]['count']
-            cart.save()
-
-        carts = [self.child.Meta.model(shopper=shopper, option_id=option_id, **input_data[option_id]) for option_id in create_option_id]
-        return self.child.Meta.model.objects.bulk_create(carts)
+        return shopper.carts.filter(option_id__in=counts)
 
 
 class CartSerializer(ModelSerializer):
+    option = IntegerField(source='option_id')
     product_name = CharField(read_only=True, source='option.product_color.product.name')
     base_discounted_price = IntegerField(read_only=True, source='option.product_color.product.base_discounted_price')
     display_color_name = CharField(read_only=True, source='option.product_color.display_color_name')
@@ -223,7 +220,9 @@ class CartSerializer(ModelSerializer):
     def to_representation(self, instance):
         result = super().to_representation(instance)
 
-        result['base_discounted_price'] *= result['count'] 
+        result['base_discounted_price'] = calculate_item_prices(
+            [{'product': instance.option.product_color.product, 'count': instance.count}], 0
+        )[0]['base_discounted_price']
         if instance.option.product_color.product.images.all().exists():
             result['image'] = BASE_IMAGE_URL + instance.option.product_color.product.images.all()[0].image_url
         else:
@@ -232,6 +231,65 @@ class CartSerializer(ModelSerializer):
         return result
 
 
+# 장바구니 화면 조회
+# 한 번의 values() 조회 결과를 한 번 순회하며 상품별 묶음과 합계를 계산 (CartListSerializer와 같은 형태)
+# 판매 중지된 항목은 is_available=False로 표시하고 합계에서 제외하며, 담을 때와 가격이 다르면 is_price_changed=True로 표시
+def get_cart_page(shopper_id):
+    main_image_url = ProductImage.objects.filter(product_id=OuterRef('option__product_color__product_id')).values('image_url')[:1]
+    carts = Cart.objects.filter(shopper_id=shopper_id).values(
+        'id', 'option_id', 'count', 'base_discounted_price',
+        product_id=F('option__product_color__product_id'),
+        product_name=F('option__product_color__product__name'),
+        sale_price=F('option__product_color__product__sale_price'),
+        product_base_discounted_price=F('option__product_color__product__base_discounted_price'),
+        display_color_name=F('option__product_color__display_color_name'),
+        size=F('option__size__name'),
+        image_url=Subquery(main_image_url),
+        product_on_sale=F('option__product_color__product__on_sale'),
+        product_color_on_sale=F('option__product_color__on_sale'),
+        option_on_sale=F('option__on_sale'),
+    )
+
+    # 가격은 주문과 같은 계산 규칙을 사용하며, 장바구니에는 회원 할인 전 금액을 표시
+    carts = list(carts)
+    products = [Product(sale_price=cart['sale_price'], base_discounted_price=cart['product_base_discounted_price']) for cart in carts]
+    prices = calculate_item_prices([{'product': product, 'count': cart['count']} for cart, product in zip(carts, products)], 0)
+
+    results = {}
+    total_sale_price = total_base_discounted_price = None
+    for cart, product, price in zip(carts, products, prices):
+        product_id = cart['product_id']
+        if product_id not in results:
+            results[product_id] = {
+                'product_id': product_id,
+                'product_name': cart['product_name'],
+                'image': BASE_IMAGE_URL + cart['image_url'] if cart['image_url'] is not None else DEFAULT_IMAGE_URL,
+                'carts': [],
+            }
+
+        is_available = cart['product_on_sale'] and cart['product_color_on_sale'] and cart['option_on_sale']
+        results[product_id]['carts'].append({
+            'id': cart['id'],
+            'option': cart['option_id'],
+            'count': cart['count'],
+            'base_discounted_price': price['base_discounted_price'],
+            'display_color_name': cart['display_color_name'],
+            'size': cart['size'],
+            'is_available': is_available,
+            'is_price_changed': is_price_changed(cart['base_discounted_price'], product),
+        })
+
+        if is_available:
+            total_sale_price = (total_sale_price or 0) + price['sale_price']
+            total_base_discounted_price = (total_base_discounted_price or 0) + price['base_discounted_price']
+
+    return {
+        'results': list(results.values()),
+        'total_sale_price': total_sale_price,
+        'total_base_discounted_price': total_base_discounted_price,
+    }
+
+
 class BuildingSerializer(ModelSerializer):
     floors = StringRelatedField(many=True)
 
@@ -281,6 +339,34 @@ class ShopperShippingAddressSerializer(ModelSerializer):
             'shopper': {'read_only': True},
         }
 
+    def create(self, validated_data):
+        shipping_address = super().create(validated_data)
+        clear_default_shipping_address(shipping_address.shopper_id)
+
+        return shipping_address
+
+    def update(self, instance, validated_data):
+        shipping_address = super().update(instance, validated_data)
+        clear_default_shipping_address(shipping_address.shopper_id)
+
+        return shipping_address
+
+
+# 기본 배송지가 없다면 가장 최근에 등록한 배송지, 배송지가 없다면 빈 딕셔너리
+def get_default_shipping_address(shopper_id):
+    cache_key = DEFAULT_SHIPPING_ADDRESS_CACHE_KEY.format(shopper_id)
+    default_shipping_address = cache.get(cache_key)
+    if default_shipping_address is None:
+        shipping_address = ShopperShippingAddress.objects.filter(shopper_id=shopper_id).order_by('-is_default', '-id').first()
+        default_shipping_address = ShopperShippingAddressSerializer(shipping_address).data if shipping_address is not None else {}
+        cache.set(cache_key, default_shipping_address, DEFAULT_SHIPPING_ADDRESS_CACHE_TIMEOUT)
+
+    return default_shipping_address
+
+
+def clear_default_shipping_address(shopper_id):
+    cache.delete(DEFAULT_SHIPPING_ADDRESS_CACHE_KEY.format(shopper_id))
+
 
 class PointHistorySerializer(ModelSerializer):
     order_number = CharField(read_only=True,  source='order.number')
@@ -306,13 +392,28 @@ class ShopperCouponSerializer(ModelSerializer):
         if self.Meta.model.objects.filter(coupon=coupon, shopper=shopper).exists():
             raise ValidationError('already exists.')
 
-        if coupon.end_date is not None:
-            validated_data['end_date'] = coupon.end_date
-        else:
-            validated_data['end_date'] = timedelta(days=coupon.available_period) + date.today()
+        validated_data['end_date'] = self.Meta.model.objects.get_end_date(coupon)
 
-        return self.Meta.model.objects.create(**validated_data)
+        shopper_coupon = self.Meta.model.objects.create(**validated_data)
+        clear_owned_coupon_ids([shopper.id])
+
+        return shopper_coupon
 
     def update_is_used(self, order_items, is_used):
         # todo 반품에 의한 쿠폰 복구 시, 쿠폰 만료 기한 늘려주는 기능
-        return self.Meta.model.objects.filter(id__in=[order_item.shopper_coupon_id for order_item in order_items]).update(is_used=is_used)
\ No newline at end of file
+        return self.Meta.model.objects.filter(id__in=[order_item.shopper_coupon_id for order_item in order_items]).update(is_used=is_used)
+
+
+# 사용, 만료 여부와 관계없이 쇼퍼가 한 번이라도 발급받은 쿠폰 id
+def get_owned_coupon_ids(shopper_id):
+    cache_key = OWNED_COUPONS_CACHE_KEY.format(shopper_id)
+    owned_coupon_ids = cache.get(cache_key)
+    if owned_coupon_ids is None:
+        owned_coupon_ids = set(ShopperCoupon.objects.filter(shopper_id=shopper_id).values_list('coupon_id', flat=True))
+        cache.set(cache_key, owned_coupon_ids, OWNED_COUPONS_CACHE_TIMEOUT)
+
+    return owned_coupon_ids
+
+
+def clear_owned_coupon_ids(shopper_ids):
+    cache.delete_many([OWNED_COUPONS_CACHE_KEY.format(shopper_id) for shopper_id in shopper_ids])
@@ -0,0 +1,127 @@
+from io import StringIO
+from datetime import date, timedelta
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from coupon.test.factories import CouponFactory
+from order.test.factories import OrderFactory, OrderItemFactory
+from .factories import MembershipFactory, ShopperFactory, PointHistoryFactory, ShopperCouponFactory
+from ..models import PointHistory, ShopperCoupon, ShopperCouponArchive
+from ..serializers import get_owned_coupon_ids
+
+
+class FillPointBalancesTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.__shopper = ShopperFactory(point=600)
+        for point in [1000, -500]:
+            PointHistoryFactory(shopper=cls.__shopper, point=point)
+        cls.__shopper.update_point(100, 'test')
+
+    def test_fill(self):
+        call_command('fill_point_balances', chunk_size=1, stdout=StringIO())
+
+        self.assertListEqual(
+            list(PointHistory.objects.filter(shopper=self.__shopper).values_list('point', 'balance')),
+            [(100, 700), (-500, 600), (1000, 1100)]
+        )
+
+
+class FillPointHistoryKindsTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        shopper = ShopperFactory()
+        for point in [1000, -500, 0]:
+            PointHistoryFactory(shopper=shopper, point=point)
+        PointHistory.objects.update(kind=None)
+
+    def test_fill(self):
+        call_command('fill_point_history_kinds', chunk_size=1, stdout=StringIO())
+
+        self.assertListEqual(
+            list(PointHistory.objects.order_by('id').values_list('point', 'kind')),
+            [(1000, 'SAVE'), (-500, 'USE'), (0, None)]
+        )
+
+
+class IssueCouponsTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.__coupon = CouponFactory(end_date=date.today() + timedelta(days=7))
+        cls.__membership = MembershipFactory()
+        cls.__shoppers = ShopperFactory.create_batch(3, membership=cls.__membership)
+        cls.__other_shopper = ShopperFactory()
+        ShopperFactory(membership=cls.__membership, is_active=False)
+        ShopperCouponFactory(shopper=cls.__shoppers[0], coupon=cls.__coupon, end_date=date.today())
+
+    def setUp(self):
+        cache.clear()
+
+    def __get_shopper_ids(self):
+        return set(ShopperCoupon.objects.filter(coupon=self.__coupon).values_list('shopper_id', flat=True))
+
+    def test_issue_by_membership(self):
+        get_owned_coupon_ids(self.__shoppers[1].id)
+        call_command('issue_coupons', self.__coupon.id, membership=[self.__membership.id], chunk_size=2, stdout=StringIO(), stderr=StringIO())
+
+        self.assertSetEqual(self.__get_shopper_ids(), set(shopper.id for shopper in self.__shoppers))
+        self.assertEqual(ShopperCoupon.objects.get(shopper=self.__shoppers[1], coupon=self.__coupon).end_date, self.__coupon.end_date)
+        self.assertEqual(ShopperCoupon.objects.get(shopper=self.__shoppers[0], coupon=self.__coupon).end_date, date.today())
+        self.assertIn(self.__coupon.id, get_owned_coupon_ids(self.__shoppers[1].id))
+
+    def test_issue_by_order_date(self):
+        OrderFactory(shopper=self.__other_shopper)
+        OrderFactory(shopper=self.__shoppers[2], created_at=date.today() - timedelta(days=10))
+        call_command('issue_coupons', self.__coupon.id, ordered_from=date.today() - timedelta(days=1), stdout=StringIO(), stderr=StringIO())
+
+        self.assertSetEqual(self.__get_shopper_ids(), set([self.__shoppers[0].id, self.__other_shopper.id]))
+
+    def test_expired_coupon(self):
+        coupon = CouponFactory(start_date=date.today() - timedelta(days=7), end_date=date.today() - timedelta(days=1))
+
+        self.assertRaisesRegex(CommandError, 'has expired', call_command, 'issue_coupons', coupon.id, stdout=StringIO())
+
+    def test_warn_process_local_cache(self):
+        stderr = StringIO()
+        call_command('issue_coupons', self.__coupon.id, membership=[self.__membership.id], stdout=StringIO(), stderr=stderr)
+
+        self.assertIn('The cache is local to this process', stderr.getvalue())
+
+
+class ArchiveShopperCouponsTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        yesterday = date.today() - timedelta(days=1)
+        expired_coupon = CouponFactory(start_date=yesterday - timedelta(days=7), end_date=yesterday)
+        period_coupon = CouponFactory(start_date=None, end_date=None, available_period=7, is_auto_issue=False)
+
+        cls.__archived_shopper_coupons = ShopperCouponFactory.create_batch(3, coupon=expired_coupon, end_date=yesterday)
+        cls.__remaining_shopper_coupons = [
+            ShopperCouponFactory(coupon=expired_coupon, end_date=yesterday, is_used=True),
+            ShopperCouponFactory(coupon=period_coupon, end_date=yesterday),
+            ShopperCouponFactory(coupon=CouponFactory(), end_date=date.today()),
+        ]
+        OrderItemFactory(shopper_coupon=cls.__remaining_shopper_coupons[0])
+
+    def test_archive(self):
+        call_command('archive_shopper_coupons', chunk_size=2, stdout=StringIO(), stderr=StringIO())
+
+        self.assertSetEqual(
+            set(ShopperCoupon.objects.values_list('id', flat=True)),
+            set(shopper_coupon.id for shopper_coupon in self.__remaining_shopper_coupons)
+        )
+        self.assertSetEqual(
+            set(ShopperCouponArchive.objects.values_list('id', 'shopper_id', 'coupon_id', 'end_date', 'is_used')),
+            set((
+                shopper_coupon.id, shopper_coupon.shopper_id, shopper_coupon.coupon_id, shopper_coupon.end_date, shopper_coupon.is_used
+            ) for shopper_coupon in self.__archived_shopper_coupons)
+        )
+
+    def test_warn_process_local_cache(self):
+        stderr = StringIO()
+        call_command('archive_shopper_coupons', stdout=StringIO(), stderr=stderr)
+
+        self.assertIn('The cache is local to this process', stderr.getvalue())
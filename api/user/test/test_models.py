@@ -2,7 +2,7 @@ from django.forms import model_to_dict
 from django.test import TestCase
 from django.contrib.auth.models import AnonymousUser
 
-from rest_framework.exceptions import APIException
+from rest_framework.exceptions import APIException, ValidationError
 
 from freezegun import freeze_time
 
@@ -186,7 +186,25 @@ class ShopperTestCase(ModelTestCase):
         self._shopper.update_point(point, content)
 
         self.assertEqual(self._shopper.point, point)
-        self.assertTrue(PointHistory.objects.get(shopper=self._shopper, point=point, content=content))
+        self.assertTrue(PointHistory.objects.get(shopper=self._shopper, point=point, balance=point, kind='SAVE', content=content))
+
+    def test_update_point_with_stale_instance(self):
+        stale_shopper = Shopper.objects.get(id=self._shopper.id)
+        self._shopper.update_point(1000, 'test')
+        stale_shopper.update_point(-300, 'test')
+
+        self.assertEqual(stale_shopper.point, 700)
+        self.assertEqual(Shopper.objects.get(id=self._shopper.id).point, 700)
+        self.assertListEqual(list(PointHistory.objects.filter(shopper=self._shopper).values_list('balance', flat=True)), [700, 1000])
+
+    def test_update_point_with_insufficient_point(self):
+        stale_shopper = Shopper.objects.get(id=self._shopper.id)
+        self._shopper.update_point(1000, 'test')
+        self._shopper.update_point(-700, 'test')
+
+        self.assertRaisesRegex(ValidationError, 'less point than used_point', stale_shopper.update_point, -700, 'test')
+        self.assertEqual(Shopper.objects.get(id=self._shopper.id).point, 300)
+        self.assertEqual(PointHistory.objects.filter(shopper=self._shopper).count(), 2)
 
     def test_update_zero_point(self):
         point = 0
@@ -214,7 +232,8 @@ class ShopperTestCase(ModelTestCase):
             order=order, 
             product_name=order_item['product_name'], 
             point=order_item['point'],
-        ) for order_item in order_items])
+            balance=balance,
+        ) for order_item, balance in zip(order_items, [200, 500])])
 
 
 class ProductLikeTestCase(ModelTestCase):
@@ -415,6 +434,8 @@ class PointHistoryTestCase(ModelTestCase):
             'shopper': self._test_data['shopper'].user_id,
             'order': None,
             'product_name': None,
+            'balance': None,
+            'kind': 'USE',
         })
 
     def test_create_including_order(self):
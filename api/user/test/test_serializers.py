@@ -291,6 +291,15 @@ class CartListSerializerTestCase(ListSerializerTestCase):
 
         self._test_serializer_raise_validation_error(
             'exceeded'.format(MAXIMUM_NUMBER_OF_ITEMS),
+            data=data, context={'shopper': self.__shopper}, function=self._save
+        )
+        self.assertEqual(self.__shopper.carts.count(), 4)
+
+    def test_validate_nonexistent_option(self):
+        data = [{'option': OptionFactory(product_color=self.__product_color_1).id + 1, 'count': 1}]
+
+        self._test_serializer_raise_validation_error(
+            'option {} does not exist.'.format(data[0]['option']),
             data=data, context={'shopper': self.__shopper}
         )
 
@@ -306,6 +315,7 @@ class CartListSerializerTestCase(ListSerializerTestCase):
         self.assertEqual(cart.option.id, data[0]['option']),
         self.assertEqual(cart.shopper, self.__shopper)
         self.assertEqual(cart.count, data[0]['count'])
+        self.assertEqual(cart.base_discounted_price, self.__product_1.base_discounted_price)
 
     def test_create_option_already_exists(self):
         cart = self.__shopper.carts.first()
@@ -319,6 +329,17 @@ class CartListSerializerTestCase(ListSerializerTestCase):
 
         self.assertEqual(updated_cart, cart)
         self.assertEqual(updated_cart.count, cart.count + data[0]['count'])
+        self.assertEqual(updated_cart.base_discounted_price, cart.option.product_color.product.base_discounted_price)
+
+    def test_create_query_count(self):
+        product_color = ProductColorFactory(product=self.__product_1)
+        data = [{'option': OptionFactory(product_color=product_color).id, 'count': 1} for _ in range(20)]
+        data[0]['option'] = self.__shopper.carts.first().option_id
+
+        with self.assertNumQueries(2):
+            self._save(data=data, context={'shopper': self.__shopper})
+
+        self.assertEqual(self.__shopper.carts.count(), 4 + 19)
 
 
 class BuildingSerializerTestCase(SerializerTestCase):
@@ -408,6 +429,8 @@ class PointHistorySerializerTestCase(SerializerTestCase):
             'order_number': point_history.order.number,
             'product_name': point_history.product_name,
             'point': point_history.point,
+            'balance': point_history.balance,
+            'kind': point_history.kind,
             'content': point_history.content,
             'created_at': datetime_to_iso(point_history.created_at),
         })
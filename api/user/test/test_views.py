@@ -1,3 +1,4 @@
+from urllib.parse import urlparse, parse_qs
 from datetime import date, timedelta
 
 from django.forms import model_to_dict
@@ -11,6 +12,7 @@ from common.test.test_cases import ViewTestCase, FREEZE_TIME
 from common.utils import datetime_to_iso
 from coupon.test.factories import CouponFactory, CouponClassificationFactory
 from coupon.serializers import CouponSerializer
+from product.models import Option
 from product.test.factories import ProductFactory, ProductColorFactory, OptionFactory
 from .factories import (
     MembershipFactory, get_factory_password, get_factory_authentication_data, 
@@ -388,20 +390,40 @@ class PointHistoryViewTestCase(ViewTestCase):
     def test_pagination_class(self):
         self._test_pagination_class(PointHistoryPagination, 20)
 
+    def __assert_cursor_pagination_success(self, queryset):
+        self._assert_success()
+        self.assertIsNone(self._response_data['previous'])
+        self.assertListEqual(self._response_data['results'], PointHistorySerializer(queryset, many=True).data)
+
     def test_get(self):
         self._get()
 
-        self._assert_pagination_success(PointHistorySerializer(self._user.point_histories.all(), many=True).data)
+        self.__assert_cursor_pagination_success(self._user.point_histories.all())
+
+    def test_get_next_page(self):
+        PointHistoryFactory.create_batch(PointHistoryPagination.page_size, shopper=self._user)
+        self._get()
+        self._get(parse_qs(urlparse(self._response_data['next']).query))
+
+        self._assert_success()
+        self.assertListEqual(
+            self._response_data['results'], 
+            PointHistorySerializer(self._user.point_histories.all()[PointHistoryPagination.page_size:], many=True).data
+        )
 
     def test_type_use_filter_get(self):
         self._get({'type': 'USE'})
 
-        self._assert_pagination_success(PointHistorySerializer(self._user.point_histories.filter(point__lt=0), many=True).data)
+        self.__assert_cursor_pagination_success(self._user.point_histories.filter(point__lt=0))
 
     def test_type_save_filter_get(self):
         self._get({'type': 'SAVE'})
 
-        self._assert_pagination_success(PointHistorySerializer(self._user.point_histories.filter(point__gt=0), many=True).data)
+        self.__assert_cursor_pagination_success(self._user.point_histories.filter(point__gt=0))
+
+    def test_get_query_count(self):
+        with self.assertNumQueries(2):
+            self._get({'type': 'USE'})
 
 
 class ProductLikeViewTestCase(ViewTestCase):
@@ -434,15 +456,86 @@ class ProductLikeViewTestCase(ViewTestCase):
     def test_post_duplicated_like(self):
         self._user.like_products.add(self.__product)
         self._set_authentication()
-        self._post()
+        self._post(status_code=200)
 
-        self._assert_failure(400, 'Duplicated user and product')
+        self._assert_success()
+        self.assertEqual(self._user.like_products.count(), 1)
+
+    def test_post_query_count(self):
+        self._set_authentication()
+        with self.assertNumQueries(2):
+            self._post()
+
+        self.assertTrue(self._user.like_products.filter(id=self.__product.id).exists())
+
+    def test_post_non_existent_product(self):
+        self._url = '/users/shoppers/like/products/{}'.format(self.__product.id + 1)
+        self._set_authentication()
+        self._post(status_code=404)
+
+        self.assertEqual(self._response.status_code, 404)
     
     def test_delete_non_eixist_like(self):
         self._set_authentication()
         self._delete()
 
-        self._assert_failure(400, 'You are deleting non exist likes')
+        self._assert_success()
+        self.assertEqual(self._response_data['product_id'], self.__product.id)
+
+    def test_delete_query_count(self):
+        self._user.like_products.add(self.__product)
+        self._set_authentication()
+        with self.assertNumQueries(2):
+            self._delete()
+
+        self.assertFalse(self._user.like_products.exists())
+
+
+class ProductLikeListViewTestCase(ViewTestCase):
+    _url = '/users/shoppers/like/products'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls._set_shopper()
+        cls.__products = ProductFactory.create_batch(3)
+
+    def setUp(self):
+        self._set_authentication()
+
+    def test_post(self):
+        self._user.like_products.add(self.__products[0])
+        self._test_data = {'id': [product.id for product in self.__products] + [self.__products[-1].id + 1]}
+        self._post(format='json')
+
+        self._assert_success()
+        self.assertEqual(self._response_data['count'], 2)
+        self.assertSetEqual(set(self._user.like_products.values_list('id', flat=True)), set(product.id for product in self.__products))
+
+    def test_delete(self):
+        self._user.like_products.add(*self.__products[:2])
+        self._test_data = {'id': [product.id for product in self.__products]}
+        self._delete(format='json')
+
+        self._assert_success()
+        self.assertEqual(self._response_data['count'], 2)
+        self.assertFalse(self._user.like_products.exists())
+
+    def test_post_without_id(self):
+        self._post(format='json')
+
+        self._assert_failure(400, 'list of id is required.')
+
+    def test_post_non_integer_id(self):
+        self._test_data = {'id': ['id']}
+        self._post(format='json')
+
+        self._assert_failure(400, 'values in the list must be integers.')
+
+    def test_post_boolean_id(self):
+        self._test_data = {'id': [True]}
+        self._post(format='json')
+
+        self._assert_failure(400, 'values in the list must be integers.')
 
 
 class CartViewSetTestCase(ViewTestCase):
@@ -464,13 +557,45 @@ class CartViewSetTestCase(ViewTestCase):
             total_sale_price=Sum(F('option__product_color__product__sale_price') * F('count')),
             total_base_discounted_price=Sum(F('option__product_color__product__base_discounted_price') * F('count'))
         )
-        serializer = CartSerializer(queryset, many=True)
+        expected_data = CartSerializer(queryset, many=True).data
+        for product in expected_data:
+            for cart in product['carts']:
+                cart.update({'is_available': True, 'is_price_changed': False})
         self._get()
 
-        self.assertListEqual(self._response_data['results'], serializer.data)
+        self.assertListEqual(self._response_data['results'], expected_data)
         self.assertEqual(self._response_data['total_sale_price'], aggregate_data['total_sale_price'])
         self.assertEqual(self._response_data['total_base_discounted_price'], aggregate_data['total_base_discounted_price'])
 
+    def test_list_revalidation(self):
+        unavailable_cart, price_changed_cart = self.__carts
+        Option.objects.filter(id=unavailable_cart.option_id).update(on_sale=False)
+        product = price_changed_cart.option.product_color.product
+        Cart.objects.filter(id=price_changed_cart.id).update(base_discounted_price=product.base_discounted_price + 100)
+        self._get()
+
+        carts = {cart['id']: cart for product in self._response_data['results'] for cart in product['carts']}
+        self.assertFalse(carts[unavailable_cart.id]['is_available'])
+        self.assertFalse(carts[unavailable_cart.id]['is_price_changed'])
+        self.assertTrue(carts[price_changed_cart.id]['is_available'])
+        self.assertTrue(carts[price_changed_cart.id]['is_price_changed'])
+        self.assertEqual(self._response_data['total_sale_price'], product.sale_price * price_changed_cart.count)
+        self.assertEqual(self._response_data['total_base_discounted_price'], product.base_discounted_price * price_changed_cart.count)
+
+    def test_list_query_count(self):
+        CartFactory.create_batch(3, shopper=self._user)
+        with self.assertNumQueries(2):
+            self._get()
+
+        self._assert_success()
+        self.assertEqual(sum(len(product['carts']) for product in self._response_data['results']), 5)
+
+    def test_list_empty(self):
+        self._user.carts.all().delete()
+        self._get()
+
+        self.assertDictEqual(self._response_data, {'results': [], 'total_sale_price': None, 'total_base_discounted_price': None})
+
     def test_create(self):
         self._test_data = [{
             'option': OptionFactory(product_color=self.__product_color).id,
@@ -533,6 +658,15 @@ class CartViewSetTestCase(ViewTestCase):
 
         self._assert_failure(400, 'values in the list must be integers.')
 
+    def test_remove_with_boolean_values_list(self):
+        self._test_data = {
+            'id': [True],
+        }
+        self._url += '/remove'
+        self._post(format='json')
+
+        self._assert_failure(400, 'values in the list must be integers.')
+
     def test_remove_with_non_list_id(self):
         self._test_data = {
             'id': self.__carts[0].id
@@ -677,6 +811,42 @@ class ShopperShippingAddressViewSetTestCase(ViewTestCase):
         self._assert_success()
         self.assertDictEqual(self._response_data, {})
 
+    def test_get_default_address_query_count(self):
+        self._set_authentication()
+        self._url += '/default'
+        with self.assertNumQueries(2):
+            self._get()
+        with self.assertNumQueries(0):
+            self._get()
+
+        self._assert_success()
+        self.assertEqual(self._response_data['id'], self.__default_shipping_address.id)
+
+    def test_get_default_address_after_create(self):
+        url = self._url
+        self._set_authentication()
+        self._url = url + '/default'
+        self._get()
+
+        self._url = url
+        self._test_data = {
+            'receiver_name': '홍길동',
+            'receiver_mobile_number': '01011111111',
+            'zip_code': '12345',
+            'base_address': '서울시 광진구 능동로19길 47',
+            'detail_address': '518호',
+            'is_default': True
+        }
+        self._post()
+        shipping_address_id = self._response_data['id']
+
+        self._url = url + '/default'
+        self._get()
+
+        self._assert_success()
+        self.assertEqual(self._response_data['id'], shipping_address_id)
+        self.assertEqual(self._user.addresses.filter(is_default=True).count(), 1)
+
 
 class ShopperCouponViewSetTestCase(ViewTestCase):
     _url = '/users/shoppers/coupons'
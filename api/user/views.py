@@ -2,8 +2,8 @@ from datetime import date
 
 from django.db.models.query import Prefetch
 from django.shortcuts import get_object_or_404
-from django.db import connection, transaction
-from django.db.models import Sum, F, Case, When
+from django.db import connection
+from django.db.models import Case, When
 
 from rest_framework.decorators import api_view, permission_classes, action
 from rest_framework.views import APIView
@@ -18,17 +18,21 @@ from rest_framework_simplejwt.views import TokenViewBase
 from common.utils import get_response, get_response_body
 from common.views import upload_image_view
 from common.permissions import IsAuthenticatedShopper, IsAuthenticatedWholesaler
+from common.idempotency import idempotent
+from common.serializers import MAXIMUM_NUMBER_OF_ITEMS
 from product.models import Product
+from product.serializers import clear_product_question_answers
 from coupon.serializers import CouponSerializer
 from coupon.models import Coupon
 from .models import (
-    ShopperShippingAddress, User, Shopper, Wholesaler, Building, ProductLike, PointHistory, Cart,
+    POINT_USE_KIND, POINT_SAVE_KIND, User, Shopper, Wholesaler, Building, ProductLike, PointHistory, Cart,
     ShopperCoupon,
 )
 from .serializers import (
     IssuingTokenSerializer, RefreshingTokenSerializer, TokenBlacklistSerializer,
     UserPasswordSerializer, ShopperSerializer, WholesalerSerializer, BuildingSerializer,
-    ShopperShippingAddressSerializer, PointHistorySerializer, CartSerializer, ShopperCouponSerializer,
+    ShopperShippingAddressSerializer, PointHistorySerializer, CartSerializer, ShopperCouponSerializer, get_cart_page,
+    get_default_shipping_address, clear_default_shipping_address,
 )
 from .paginations import PointHistoryPagination
 from .permissions import AllowAny, IsAuthenticated, IsAuthenticatedExceptCreate
@@ -146,6 +150,14 @@ class ShopperView(UserView):
     def get_queryset(self):
         return Shopper.objects.filter(is_active=True)
 
+    # 탈퇴 시 삭제되는 Q&A의 상품 Q&A 캐시 삭제
+    def delete(self, request):
+        product_ids = set(self._get_user().question_answers.values_list('product_id', flat=True))
+        response = super().delete(request)
+        clear_product_question_answers(product_ids)
+
+        return response
+
 
 class WholesalerView(UserView):
     serializer_class = WholesalerSerializer
@@ -164,16 +176,13 @@ class PointHistoryView(GenericAPIView):
     serializer_class = PointHistorySerializer
 
     def filter_queryset(self, queryset):
-        if 'type' in self.request.query_params:
-            if self.request.query_params['type'] == 'USE':
-                queryset = queryset.filter(point__lt=0)
-            elif self.request.query_params['type'] == 'SAVE':
-                queryset = queryset.filter(point__gt=0)
+        if self.request.query_params.get('type') in [POINT_USE_KIND, POINT_SAVE_KIND]:
+            queryset = queryset.filter(kind=self.request.query_params['type'])
     
         return queryset
 
     def get_queryset(self):
-        queryset = PointHistory.objects.select_related('order').filter(shopper=self.request.user.shopper)
+        queryset = PointHistory.objects.select_related('order').filter(shopper_id=self.request.user.id)
 
         return self.filter_queryset(queryset)
 
@@ -186,32 +195,51 @@ class PointHistoryView(GenericAPIView):
 class ProductLikeView(APIView):
     permission_classes = [IsAuthenticatedShopper]
 
-    def get_queryset(self):
-        return ProductLike.objects.all()
-
-    @transaction.atomic
+    # 이미 좋아요한 상품이면 200 반환
     def post(self, request, product_id):
-        shopper = request.user.shopper
-        product = get_object_or_404(Product, id=product_id)
+        response_data = {'shopper_id': request.user.id, 'product_id': product_id}
+        if ProductLike.objects.like(request.user.id, [product_id]):
+            return get_response(status=HTTP_201_CREATED, data=response_data)
 
-        if self.get_queryset().filter(shopper=shopper, product=product).exists():
-            return get_response(status=HTTP_400_BAD_REQUEST, message='Duplicated user and product')
+        get_object_or_404(Product, id=product_id)
 
-        ProductLike.objects.create(shopper=shopper, product=product)
-        return get_response(status=HTTP_201_CREATED, data={'shopper_id': shopper.user_id, 'product_id': product.id})
+        return get_response(data=response_data)
 
-    @transaction.atomic
     def delete(self, request, product_id):
-        shopper = request.user.shopper
-        product = get_object_or_404(Product, id=product_id)
+        if not ProductLike.objects.unlike(request.user.id, [product_id]):
+            get_object_or_404(Product, id=product_id)
+
+        return get_response(data={'shopper_id': request.user.id, 'product_id': product_id})
+
+
+# 로그인 전 찜 목록 이전 등 여러 상품 좋아요 일괄 처리
+class ProductLikeListView(APIView):
+    permission_classes = [IsAuthenticatedShopper]
+
+    def __get_product_ids(self, request):
+        product_ids = request.data.get('id', None)
+        if product_ids is None:
+            return None, get_response(status=HTTP_400_BAD_REQUEST, message='list of id is required.')
+        elif not isinstance(product_ids, list) or not product_ids or not all(type(id) is int for id in product_ids):
+            return None, get_response(status=HTTP_400_BAD_REQUEST, message='values in the list must be integers.')
+        elif len(product_ids) > MAXIMUM_NUMBER_OF_ITEMS:
+            return None, get_response(status=HTTP_400_BAD_REQUEST, message='The number of id must not be more than {}.'.format(MAXIMUM_NUMBER_OF_ITEMS))
+
+        return set(product_ids), None
+
+    def post(self, request):
+        product_ids, error_response = self.__get_product_ids(request)
+        if error_response is not None:
+            return error_response
 
-        if not self.get_queryset().filter(shopper=shopper, product=product).exists():
-            return get_response(status=HTTP_400_BAD_REQUEST, message='You are deleting non exist likes')
+        return get_response(status=HTTP_201_CREATED, data={'count': ProductLike.objects.like(request.user.id, product_ids)})
 
-        product_like = ProductLike.objects.get(shopper=shopper, product=product)
-        product_like.delete()
+    def delete(self, request):
+        product_ids, error_response = self.__get_product_ids(request)
+        if error_response is not None:
+            return error_response
 
-        return get_response(data={'shopper_id': shopper.user_id, 'product_id': product_id})
+        return get_response(data={'count': ProductLike.objects.unlike(request.user.id, product_ids)})
 
 
 class CartViewSet(GenericViewSet):
@@ -224,27 +252,12 @@ class CartViewSet(GenericViewSet):
     pagination_class = None
 
     def get_queryset(self):
-        queryset = self.request.user.shopper.carts.all()
-        if self.action == 'list':
-            queryset = queryset.select_related(
-                'option__product_color__product'
-            ).prefetch_related('option__product_color__product__images')
-
-        return queryset
+        return self.request.user.shopper.carts.all()
 
     def list(self, request):
-        queryset = self.get_queryset()
-        serializer = self.get_serializer(queryset, many=True)
-        aggregate_data = queryset.aggregate(
-            total_sale_price=Sum(F('option__product_color__product__sale_price') * F('count')),
-            total_base_discounted_price=Sum(F('option__product_color__product__base_discounted_price') * F('count'))
-        )
-
-        response_data = {'results': serializer.data}
-        response_data.update(aggregate_data)
-
-        return get_response(data=response_data)
+        return get_response(data=get_cart_page(request.user.id))
 
+    @idempotent
     def create(self, request):
         serializer = self.get_serializer(data=request.data, context={'shopper': request.user.shopper}, many=True)
         serializer.is_valid(raise_exception=True)
@@ -267,7 +280,7 @@ class CartViewSet(GenericViewSet):
         delete_id_list = request.data.get('id', None)
         if delete_id_list is None:
             return get_response(status=HTTP_400_BAD_REQUEST, message='list of id is required.')
-        elif not isinstance(delete_id_list, list) or not all(isinstance(id, int) for id in delete_id_list):
+        elif not isinstance(delete_id_list, list) or not all(type(id) is int for id in delete_id_list):
             return get_response(status=HTTP_400_BAD_REQUEST, message='values in the list must be integers.')
 
         queryset = self.get_queryset()
@@ -314,25 +327,12 @@ class ShopperShippingAddressViewSet(GenericViewSet):
     def destroy(self, request, shipping_address_id):
         shipping_address = self.get_object()
         shipping_address.delete()
+        clear_default_shipping_address(shipping_address.shopper_id)
 
         return get_response(data={'id': int(shipping_address_id)})
 
     def get_default_address(self, request):
-        queryset = self.get_queryset()
-
-        if not queryset.exists():
-            return get_response(data={})
-        elif queryset.filter(is_default=True).exists():
-            try:
-                shipping_address = queryset.get(is_default=True)
-            except ShopperShippingAddress.MultipleObjectsReturned:
-                shipping_address = queryset.filter(is_default=True).first()
-        else:
-            shipping_address = queryset.first()
-
-        serializer = self.get_serializer(shipping_address)
-
-        return get_response(data=serializer.data)
+        return get_response(data=get_default_shipping_address(request.user.id))
 
 
 class ShopperCouponViewSet(ListModelMixin, GenericViewSet):
@@ -356,6 +356,7 @@ class ShopperCouponViewSet(ListModelMixin, GenericViewSet):
         response = super().list(request)
         return get_response(data=response.data)
 
+    @idempotent
     def create(self, request):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)